@@ -0,0 +1,249 @@
+"""
+Async versions of the index, action and state views for ASGI servers.
+
+They behave like the views in views.py, but read and write game state with
+the async cache API, so a worker can hold many idle connections without a
+thread each. Django 4.2 sessions have no async API, so session reads run
+through sync_to_async. They are routed in place of the sync views when
+BLACKJACK_ASYNC_VIEWS is set.
+
+The event stream is always async and needs an ASGI server: it sends the
+game state whenever the game is saved, to the player and any spectators.
+"""
+import asyncio
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.middleware.csrf import get_token
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.shortcuts import render, redirect
+from .game_logic.game import BlackjackGame
+from .game_logic.events import HIT, STAND, SPLIT, deal, play as play_action
+from .game_store import (get_game_store, decode_game, GameConflict, SESSION_KEY,
+                         LEGACY_SESSION_KEY)
+from .pubsub import get_broker, state_event
+from .history import get_history_writer
+from .game_logic.timing import timed
+from .views import (new_shoe, client_base_state, state_response, get_account_id,
+                    account_balance, insufficient_funds_response)
+from . import bankroll
+
+
+# Seconds between comments sent to keep idle event streams open
+KEEPALIVE_SECONDS = 15
+
+# Seconds before an event stream ends and the browser reconnects
+STREAM_SECONDS = 300
+
+
+def require_http_methods(request_method_list):
+    """Async view version of django.views.decorators.http.require_http_methods."""
+    def decorator(func):
+        @wraps(func)
+        async def inner(request, *args, **kwargs):
+            if request.method not in request_method_list:
+                return HttpResponseNotAllowed(request_method_list)
+            return await func(request, *args, **kwargs)
+        return inner
+    return decorator
+
+
+async def session_get(request, key):
+    """Read a session key, loading the session outside the event loop."""
+    return await sync_to_async(request.session.get)(key)
+
+
+async def get_or_create_game(request):
+    """Retrieve or create a game from the game store."""
+    with timed('session'):
+        game_id = await session_get(request, SESSION_KEY)
+    try:
+        if game_id:
+            with timed('load'):
+                return await get_game_store().aload(game_id)
+        game_data = await session_get(request, LEGACY_SESSION_KEY)
+        return decode_game(game_data) if game_data else None
+    except ValueError:
+        # Start over under a new id
+        request.session.pop(SESSION_KEY, None)
+        game = BlackjackGame(new_shoe())
+        await save_game(request, game, game_events=deal(game))
+        return game
+
+
+async def save_game(request, game, base_version=None, game_events=()):
+    """
+    Save game state to the game store, keeping only its id in the session,
+    publish it to the game's event stream, post the round's wagers and
+    record the round if it just finished.
+    """
+    store = get_game_store()
+    game_id = await session_get(request, SESSION_KEY)
+    if not game_id:
+        game_id = store.new_id()
+        request.session[SESSION_KEY] = game_id
+        request.session.pop(LEGACY_SESSION_KEY, None)
+        # Nothing is stored under a new id yet, so store the whole game
+        base_version = None
+    with timed('save'):
+        await store.asave(game_id, game, base_version, game_events)
+    with timed('publish'):
+        get_broker().publish(game_id, state_event(game.get_game_state()))
+    if game.bet:
+        account_id = await sync_to_async(get_account_id)(request)
+        with timed('ledger'):
+            await sync_to_async(bankroll.post_round)(account_id, game_id, game, game_events)
+    if game.game_over:
+        writer = get_history_writer()
+        with timed('history'):
+            if writer.asynchronous:
+                writer.record(game_id, game)
+            else:
+                await sync_to_async(writer.record)(game_id, game)
+
+
+async def conflict_response(request):
+    """Respond to a conflicting action with the game state that won."""
+    game = await get_or_create_game(request)
+    return JsonResponse({
+        'error': 'Game changed by another request',
+        'state': game.get_game_state() if game else None
+    }, status=409)
+
+
+async def play(request, kind, error):
+    """Apply a player action (an event kind) to the session's game and respond with the result."""
+    game = await get_or_create_game(request)
+
+    if not game:
+        return JsonResponse({'error': 'No active game'}, status=400)
+
+    base_state = client_base_state(request, game)
+    base_version = game.version
+    with timed('action'):
+        game_events = play_action(game, kind)
+    if game_events is None:
+        return JsonResponse({'error': error}, status=400)
+
+    if kind == SPLIT and game.bet:
+        # The split hand is staked with the same bet again
+        balance = (await sync_to_async(account_balance)(request))[1]
+        if game.bet > balance:
+            return insufficient_funds_response(balance)
+
+    try:
+        await save_game(request, game, base_version, game_events)
+    except GameConflict:
+        return await conflict_response(request)
+
+    return state_response(game, base_state)
+
+
+@require_http_methods(["GET"])
+async def index(request):
+    """Main game view."""
+    game = await get_or_create_game(request)
+    if not game:
+        # No active game, redirect to new game
+        return redirect('new_game')
+
+    # The page script posts actions with the CSRF cookie
+    get_token(request)
+    balance = (await sync_to_async(account_balance)(request))[1]
+    with timed('render'):
+        return render(request, 'game.html', {'game_state': game.get_game_state(),
+                                             'balance': balance})
+
+
+@require_http_methods(["POST"])
+async def hit(request):
+    """Player hits (takes another card)."""
+    return await play(request, HIT, 'Cannot hit')
+
+
+@require_http_methods(["POST"])
+async def stand(request):
+    """Player stands (ends their turn)."""
+    return await play(request, STAND, 'Cannot stand')
+
+
+@require_http_methods(["POST"])
+async def split(request):
+    """Player splits their hand."""
+    return await play(request, SPLIT, 'Cannot split')
+
+
+@require_http_methods(["GET"])
+async def game_state(request):
+    """Get current game state as JSON (for AJAX updates)."""
+    game = await get_or_create_game(request)
+
+    if not game:
+        return JsonResponse({'error': 'No active game'}, status=400)
+
+    return JsonResponse(game.get_game_state())
+
+
+class StateStream:
+    """
+    The current state, then each published state, as server-sent events,
+    for at most lifetime seconds. Django 4.2 doesn't tell a streaming
+    response when the client goes away, so a stream left by a closed tab is
+    only unsubscribed when it ends; open pages reconnect through EventSource
+    and are sent the current state again. The response also closes it if
+    sending fails.
+    """
+
+    def __init__(self, subscription, state, lifetime=STREAM_SECONDS):
+        self.subscription = subscription
+        self.state = state
+        self.lifetime = lifetime
+
+    async def __aiter__(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lifetime
+        try:
+            yield state_event(self.state)
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                message = await self.subscription.get(min(KEEPALIVE_SECONDS, remaining))
+                if message is not None:
+                    yield message
+                elif loop.time() < deadline:
+                    yield ': keepalive\n\n'
+        finally:
+            self.close()
+
+    def close(self):
+        self.subscription.close()
+
+
+@require_http_methods(["GET"])
+async def events(request, game_id=None):
+    """
+    Stream state changes for a game as server-sent events. Without a
+    game_id the stream is for the session's own game; with one, anyone
+    holding the id can watch.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'Event streams need an ASGI server'}, status=501)
+
+    if game_id is None:
+        game_id = await session_get(request, SESSION_KEY)
+    if not game_id:
+        return JsonResponse({'error': 'No active game'}, status=400)
+
+    # Subscribe before reading the state so no update is missed in between
+    subscription = get_broker().subscribe(game_id)
+    game = await get_game_store().aload(game_id)
+    if not game:
+        subscription.close()
+        return JsonResponse({'error': 'No active game'}, status=400)
+
+    response = StreamingHttpResponse(StateStream(subscription, game.get_game_state()),
+                                     content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
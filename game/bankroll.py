@@ -0,0 +1,202 @@
+"""
+Player balances and wagers, kept in an append-only ledger.
+
+Each session plays from an Account opened with STARTING_BALANCE chips. Every
+change to a balance is posted as a LedgerEntry keyed by the round it belongs
+to (the game id and the version the round was dealt at) and its kind: the
+bet when a round is dealt, the same again when the player splits, and the
+payout when the round is over. Posting inserts the entry and moves the
+balance in one short transaction, with a single conditional UPDATE
+(balance = balance + amount, only where balance covers a debit) instead of
+reading the balance and saving it back. Nothing is read first or locked
+ahead of time, each account only holds its own row's lock from the UPDATE to
+the commit straight after it, and two posts can't lose each other's change.
+Entries are posted once the game is saved, so a request that lost the race
+to save a change posts nothing, and a round posts each kind of entry at most
+once, so posting the same change again moves nothing. A payout is only
+posted alongside the round's stakes.
+
+Account.balance is the live balance and reads in one query. The ledger holds
+every change behind it; rollup() periodically writes a BalanceSnapshot per
+account of the sum of its entries so far, so ledger_balance() only adds up
+the entries since the last rollup however long the history grows.
+"""
+import datetime
+import logging
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Now
+from django.utils import timezone
+from .game_logic import events
+from .models import Account, BalanceSnapshot, LedgerEntry
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'STARTING_BALANCE': 1000,
+    'DEFAULT_BET': 10,
+    'MAX_BET': 500,
+    'ROLLUP_DELAY': 60,
+}
+
+# Session key holding the player's Account id
+ACCOUNT_SESSION_KEY = 'account_id'
+
+# Ledger entries shown with the balance
+RECENT_ENTRIES = 20
+
+# Snapshots written per INSERT by rollup()
+ROLLUP_BATCH_SIZE = 1000
+
+
+class InsufficientFunds(Exception):
+    """Raised when an account can't cover a debit."""
+
+
+def options():
+    """Return the bankroll settings merged over DEFAULTS."""
+    return {**DEFAULTS, **getattr(settings, 'BLACKJACK_BANKROLL', {})}
+
+
+def open_account():
+    """Open an account with the starting balance, posted as its first entry."""
+    starting = options()['STARTING_BALANCE']
+    with transaction.atomic():
+        account = Account.objects.create(balance=starting)
+        LedgerEntry.objects.create(account=account, round_id=f'account:{account.pk}',
+                                   kind=LedgerEntry.DEPOSIT, amount=starting)
+    return account
+
+
+def balance(account_id):
+    """Return an account's balance, or None if there is no such account."""
+    return Account.objects.filter(pk=account_id).values_list('balance', flat=True).first()
+
+
+def parse_bet(value, available):
+    """
+    Return the bet for a new round from a submitted value, or the default
+    bet (no more than the available balance) when none was given. Raises
+    ValueError for bets that aren't whole chips between 0 and MAX_BET.
+    """
+    config = options()
+    if value in (None, ''):
+        return min(config['DEFAULT_BET'], available)
+    try:
+        bet = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("Bet must be a whole number of chips") from None
+    if not 0 <= bet <= config['MAX_BET']:
+        raise ValueError(f"Bet must be between 0 and {config['MAX_BET']}")
+    return bet
+
+
+def round_id(game_id, game):
+    """Return the ledger key of a game's current round."""
+    return f'{game_id}:{game.dealt_version}'
+
+
+def post(account_id, round_key, kind, amount):
+    """
+    Post an entry and move the balance by amount, returning False if the
+    round already has an entry of this kind. Raises InsufficientFunds, posting
+    nothing, if the account doesn't exist or can't cover a debit.
+    """
+    accounts = Account.objects.filter(pk=account_id)
+    if amount < 0:
+        accounts = accounts.filter(balance__gte=-amount)
+    try:
+        with transaction.atomic():
+            LedgerEntry.objects.create(account_id=account_id, round_id=round_key,
+                                       kind=kind, amount=amount)
+            if not accounts.update(balance=F('balance') + amount, updated_at=Now()):
+                raise InsufficientFunds(f"Account {account_id} can't cover {-amount} chips")
+    except IntegrityError:
+        return False
+    return True
+
+
+def post_round(account_id, game_id, game, game_events=()):
+    """
+    Post the entries for a saved change to a game, in one transaction: the
+    bet when the change dealt the round, the bet again when it split, and
+    the payout once the round is over. The payout is posted together with
+    the round's stakes (a no-op for those already posted), so a round whose
+    stake never went through can't be paid out; if the account can't cover
+    them, nothing is posted and the round goes unpaid. Rounds dealt without
+    a bet post nothing.
+    """
+    if not game.bet:
+        return
+    kinds = {event.kind for event in game_events}
+    entries = []
+    if events.DEAL in kinds or game.game_over:
+        entries.append((LedgerEntry.BET, -game.bet))
+    if events.SPLIT in kinds or (game.game_over and game.split_hand):
+        entries.append((LedgerEntry.SPLIT, -game.bet))
+    if game.game_over:
+        entries.append((LedgerEntry.PAYOUT, game.payout()))
+    if not entries:
+        return
+    key = round_id(game_id, game)
+    try:
+        with transaction.atomic():
+            for kind, amount in entries:
+                post(account_id, key, kind, amount)
+    except InsufficientFunds:
+        logger.warning("Round %s was played without its stake", key)
+
+
+def ledger_balance(account_id):
+    """Return an account's balance from its latest snapshot and the entries since."""
+    last_entry, total = (BalanceSnapshot.objects.filter(account_id=account_id)
+                         .order_by('-last_entry')
+                         .values_list('last_entry', 'balance').first() or (0, 0))
+    since = (LedgerEntry.objects.filter(account_id=account_id, id__gt=last_entry)
+             .aggregate(total=Sum('amount'))['total'])
+    return total + (since or 0)
+
+
+def rollup(delay=None):
+    """
+    Snapshot the balance of every account with entries since the last
+    rollup and return how many snapshots were written. Entries newer than
+    delay seconds (ROLLUP_DELAY by default) are left for the next rollup, so
+    a post still committing when the rollup reads can't be skipped. Every
+    snapshot written covers the same last entry, and the rollup is one
+    transaction, so the newest snapshot of any account covers all of its
+    entries up to the newest snapshot of all. Run one rollup at a time.
+    """
+    if delay is None:
+        delay = options()['ROLLUP_DELAY']
+    cutoff = timezone.now() - datetime.timedelta(seconds=delay)
+    with transaction.atomic():
+        done = BalanceSnapshot.objects.aggregate(last=Max('last_entry'))['last'] or 0
+        last = (LedgerEntry.objects.filter(id__gt=done, created_at__lte=cutoff)
+                .aggregate(last=Max('id'))['last'])
+        if last is None:
+            return 0
+
+        previous = (BalanceSnapshot.objects.filter(account=OuterRef('account'))
+                    .order_by('-last_entry').values('balance')[:1])
+        totals = (LedgerEntry.objects.filter(id__gt=done, id__lte=last)
+                  .values('account')
+                  .annotate(total=Sum('amount'), previous=Coalesce(Subquery(previous), Value(0)))
+                  .order_by())
+        snapshots = [BalanceSnapshot(account_id=row['account'], last_entry=last,
+                                     balance=row['previous'] + row['total'])
+                     for row in totals.iterator()]
+        BalanceSnapshot.objects.bulk_create(snapshots, batch_size=ROLLUP_BATCH_SIZE)
+    return len(snapshots)
+
+
+def mismatched_accounts():
+    """Return (account id, balance, ledger balance) for accounts that disagree with their ledger."""
+    mismatched = []
+    for account_id, current in Account.objects.order_by('pk').values_list('pk', 'balance').iterator():
+        ledger = ledger_balance(account_id)
+        if ledger != current:
+            mismatched.append((account_id, current, ledger))
+    return mismatched
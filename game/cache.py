@@ -0,0 +1,48 @@
+"""
+Redis cache backend with a swappable client library.
+
+This is Django's RedisCache, except that the 'library' option names the module
+providing the Redis client: redis-py by default, or any library with the same
+Redis, ConnectionPool and connection.DefaultParser, such as a Redis-compatible
+server's own client. The tests point it at game.tests.fake_redis, an
+in-process server that several cache connections (standing in for separate
+workers) share.
+"""
+from importlib import import_module
+from django.core.cache.backends import redis
+from django.utils.module_loading import import_string
+
+
+class RedisCacheClient(redis.RedisCacheClient):
+    """Django's Redis client wrapper, importing the client library by name."""
+
+    def __init__(self, servers, library='redis', serializer=None, pool_class=None,
+                 parser_class=None, **options):
+        self._lib = import_module(library)
+        self._servers = servers
+        self._pools = {}
+        self._client = self._lib.Redis
+
+        if isinstance(pool_class, str):
+            pool_class = import_string(pool_class)
+        self._pool_class = pool_class or self._lib.ConnectionPool
+
+        if isinstance(serializer, str):
+            serializer = import_string(serializer)
+        if callable(serializer):
+            serializer = serializer()
+        self._serializer = serializer or redis.RedisSerializer()
+
+        if isinstance(parser_class, str):
+            parser_class = import_string(parser_class)
+        parser_class = parser_class or self._lib.connection.DefaultParser
+
+        self._pool_options = {'parser_class': parser_class, **options}
+
+
+class RedisCache(redis.RedisCache):
+    """Redis cache whose OPTIONS may name the client library module as 'library'."""
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self._class = RedisCacheClient
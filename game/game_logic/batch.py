@@ -0,0 +1,103 @@
+"""
+Vectorized evaluation of batches of pre-dealt rounds with NumPy.
+
+A batch of n rounds is two integer arrays of card values (Card.value, so Aces
+are 11) padded with zeros:
+
+    player_cards  (n, p)  the player's final cards, first two as dealt
+    dealer_cards  (n, d)  the dealer's two cards followed by the cards the
+                          dealer would draw, in order
+
+Results are the outcome codes from settlement (indexes into RESULTS)
+and match what BlackjackGame produces for the same cards when the player
+stands on (or busts with) the given hand.
+
+NumPy is only needed for this module; the web game does not import it.
+"""
+import numpy as np
+from .constants import BLACKJACK, DEALER_STAND_VALUE
+from .settlement import (
+    PLAYER_BLACKJACK, DEALER_BLACKJACK, PLAYER_BUST, DEALER_BUST, PLAYER_WINS, DEALER_WINS, PUSH
+)
+
+ACE_VALUE = 11
+
+# Card values and totals fit in small integers, which keeps batches compact
+CARD_DTYPE = np.int8
+
+
+def hand_totals(cards):
+    """
+    Return the value of each hand in a (n, k) array of card values.
+    Mirrors Hand.get_value: at most one Ace counts as 11 without busting.
+    """
+    cards = np.asfortranarray(cards, dtype=CARD_DTYPE)
+    aces = (cards == ACE_VALUE).sum(axis=1, dtype=np.int16)
+    hard = cards.sum(axis=1, dtype=np.int16) - 10 * aces
+    return _soft_totals(hard, aces > 0)
+
+
+def _soft_totals(hard, has_ace):
+    """Count one Ace as 11 where that doesn't bust the hand."""
+    return np.where(has_ace & (hard + 10 <= BLACKJACK), hard + 10, hard)
+
+
+def _dealer_play(dealer_cards):
+    """
+    Return each dealer's final value and whether the dealer reached it.
+    Draws column by column, only adding cards for dealers still below
+    DEALER_STAND_VALUE, and stops once every dealer is standing.
+    """
+    dealer_cards = np.asfortranarray(dealer_cards)
+    is_ace = dealer_cards == ACE_VALUE
+    hard_cards = np.where(is_ace, CARD_DTYPE(1), dealer_cards)
+    hard = hard_cards[:, 0] + hard_cards[:, 1].astype(np.int16)
+    has_ace = is_ace[:, 0] | is_ace[:, 1]
+    values = _soft_totals(hard, has_ace)
+
+    for column in range(2, dealer_cards.shape[1]):
+        drawing = values < DEALER_STAND_VALUE
+        if not drawing.any():
+            break
+        hard += hard_cards[:, column] * drawing
+        has_ace |= drawing & is_ace[:, column]
+        values = _soft_totals(hard, has_ace)
+
+    return values, values >= DEALER_STAND_VALUE
+
+
+def dealer_totals(dealer_cards):
+    """
+    Return the dealer's final value for each round, drawing until reaching
+    DEALER_STAND_VALUE as in BlackjackGame._dealer_play.
+    """
+    values, finished = _dealer_play(np.asarray(dealer_cards, dtype=CARD_DTYPE))
+    if not finished.all():
+        raise ValueError("Not enough dealer cards to finish every round")
+    return values
+
+
+def evaluate_rounds(player_cards, dealer_cards):
+    """Return the result code of every round in a batch."""
+    player_cards = np.asarray(player_cards, dtype=CARD_DTYPE)
+    dealer_cards = np.asarray(dealer_cards, dtype=CARD_DTYPE)
+
+    player_natural = player_cards[:, 0] + player_cards[:, 1] == BLACKJACK
+    dealer_natural = dealer_cards[:, 0] + dealer_cards[:, 1] == BLACKJACK
+
+    player_value = hand_totals(player_cards)
+    dealer_value, finished = _dealer_play(dealer_cards)
+    # Rounds settled by a natural end before the dealer draws
+    if not (finished | player_natural | dealer_natural).all():
+        raise ValueError("Not enough dealer cards to finish every round")
+
+    # Same order of checks as settlement.hand_outcome, then naturals
+    results = np.select(
+        [player_value > BLACKJACK, dealer_value > BLACKJACK,
+         player_value > dealer_value, dealer_value > player_value],
+        [PLAYER_BUST, DEALER_BUST, PLAYER_WINS, DEALER_WINS],
+        default=PUSH
+    ).astype(np.int8)
+    results = np.where(dealer_natural, DEALER_BLACKJACK, results)
+    results = np.where(player_natural, np.where(dealer_natural, PUSH, PLAYER_BLACKJACK), results)
+    return results
@@ -0,0 +1,169 @@
+"""
+Micro-benchmarks of the game logic hot paths.
+
+Each benchmark is a function that sets up its objects and returns a
+callable doing one operation. run_benchmarks times each callable and
+reports the best time per call, divided by the time of a fixed pure-Python
+calibration loop timed alongside it, so results from different machines
+and under different load can be compared.
+Baselines are stored in benchmark_baselines.json next to this module and
+regressions() reports the paths that became slower than the threshold.
+"""
+import json
+import timeit
+from pathlib import Path
+from .card import Card
+from .deck import Deck
+from .hand import Hand
+from .game import BlackjackGame
+from .shoe import Shoe
+from .simulation import play_round
+from .strategy import basic_strategy
+
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'benchmark_baselines.json'
+
+# Slowdown relative to the baseline that counts as a regression
+DEFAULT_THRESHOLD = 0.25
+
+SEED = 12345
+
+
+def _calibration():
+    def run():
+        total = 0
+        for number in range(1000):
+            total += number * number
+        return total
+    return run
+
+
+def _deck_reset_shuffle():
+    deck = Deck()
+
+    def run():
+        # A seeded shuffle only starts once the first card is dealt
+        deck.reset()
+        deck.shuffle(SEED)
+        return deck.deal()
+    return run
+
+
+def _deck_deal():
+    shoe = Shoe()
+    shoe.shuffle(SEED)
+
+    def run():
+        if not shoe.cards_remaining():
+            shoe.reset()
+            shoe.shuffle(SEED)
+        return shoe.deal()
+    return run
+
+
+def _hand_get_value():
+    hand = Hand()
+    for rank in ('A', '7', '5'):
+        hand.add_card(Card('Hearts', rank))
+    return hand.get_value
+
+
+def _game_start_new_game():
+    game = BlackjackGame(Shoe())
+    return game.start_new_game
+
+
+def _game_dict_round_trip():
+    game = BlackjackGame(Shoe())
+    game.start_new_game()
+    return lambda: BlackjackGame.from_dict(game.to_dict())
+
+
+def _game_session_round_trip():
+    game = BlackjackGame(Shoe())
+    game.start_new_game()
+    return lambda: BlackjackGame.from_session(game.to_session())
+
+
+def _play_round():
+    game = BlackjackGame(Shoe())
+    game.deck.shuffle(SEED)
+    return lambda: play_round(game, basic_strategy)
+
+
+BENCHMARKS = {
+    'deck_reset_shuffle': _deck_reset_shuffle,
+    'deck_deal': _deck_deal,
+    'hand_get_value': _hand_get_value,
+    'game_start_new_game': _game_start_new_game,
+    'game_dict_round_trip': _game_dict_round_trip,
+    'game_session_round_trip': _game_session_round_trip,
+    'play_round': _play_round,
+}
+
+
+def _timer(func, min_time):
+    """Return a timeit.Timer for func and the calls per run to take min_time."""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    return timer, max(1, int(number * min_time / max(elapsed, 1e-9)))
+
+
+def time_pair(func, repeat=5, min_time=0.2):
+    """
+    Return the best seconds per call of the calibration loop and of func.
+    Their runs alternate, so both see the same machine load.
+    """
+    calibration, calibration_number = _timer(_calibration(), min_time)
+    timer, number = _timer(func, min_time)
+    calibration_best = best = float('inf')
+    for _ in range(repeat):
+        calibration_best = min(calibration_best, calibration.timeit(calibration_number))
+        best = min(best, timer.timeit(number))
+    return calibration_best / calibration_number, best / number
+
+
+def run_benchmarks(names=None, repeat=5, min_time=0.2):
+    """
+    Return {'calibration': seconds, 'results': {name: {'seconds', 'relative'}}}
+    for the named benchmarks, or all of them.
+    """
+    calibrations = []
+    results = {}
+    for name in names or BENCHMARKS:
+        calibration, seconds = time_pair(BENCHMARKS[name](), repeat, min_time)
+        calibrations.append(calibration)
+        results[name] = {'seconds': seconds, 'relative': seconds / calibration}
+    return {'calibration': min(calibrations), 'results': results}
+
+
+def load_baselines(path=BASELINE_PATH):
+    """Return the stored baselines, or None if there are none."""
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+
+
+def write_baselines(report, path=BASELINE_PATH):
+    """Store a run_benchmarks report as the baselines."""
+    with open(path, 'w') as handle:
+        json.dump(report, handle, indent=2, sort_keys=True)
+        handle.write('\n')
+
+
+def regressions(report, baselines, threshold=DEFAULT_THRESHOLD):
+    """
+    Return {name: slowdown} for benchmarks whose relative time grew by more
+    than threshold (0.25 is 25% slower) over the baseline.
+    """
+    slower = {}
+    for name, result in report['results'].items():
+        baseline = baselines['results'].get(name)
+        if baseline is None:
+            continue
+        slowdown = result['relative'] / baseline['relative'] - 1
+        if slowdown > threshold:
+            slower[name] = slowdown
+    return slower
@@ -1,27 +1,70 @@
-from .constants import CARD_VALUES, FACE_CARD_NAMES
+from functools import total_ordering
+from .constants import SUITS, RANKS, CARD_VALUES, FACE_CARD_NAMES
 
 
+@total_ordering
 class Card:
-    """Represents a single playing card."""
+    """
+    Represents a single playing card.
+
+    Cards are immutable flyweights: there is exactly one instance per suit and
+    rank, so Card('Hearts', 'A') returns the shared Ace of Hearts. Each card has
+    an integer code (suit index * 13 + rank index) used for lookups, ordering
+    and compact serialization.
+    """
+
+    __slots__ = ('suit', 'rank', 'value', 'code')
+
+    def __new__(cls, suit, rank):
+        try:
+            return _CARDS_BY_KEY[(suit, rank)]
+        except KeyError:
+            raise ValueError(f"Invalid card: {rank} of {suit}") from None
+
+    @classmethod
+    def _create(cls, suit, rank, code):
+        card = object.__new__(cls)
+        object.__setattr__(card, 'suit', suit)
+        object.__setattr__(card, 'rank', rank)
+        object.__setattr__(card, 'value', CARD_VALUES[rank])
+        object.__setattr__(card, 'code', code)
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card instances are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Card instances are immutable")
+
+    def __reduce__(self):
+        return (Card.from_code, (self.code,))
+
+    def __eq__(self, other):
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.code == other.code
+
+    def __lt__(self, other):
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.code < other.code
+
+    def __hash__(self):
+        return self.code
 
-    def __init__(self, suit, rank):
-        self.suit = suit
-        self.rank = rank
-        self.value = CARD_VALUES[rank]
-   
     def __str__(self):
         rank = self.rank
         if (self.rank in FACE_CARD_NAMES):
             rank = FACE_CARD_NAMES[self.rank]
         return f"{rank} of {self.suit}"
-   
+
     def __repr__(self):
         return f"Card('{self.suit}', '{self.rank}')"
-   
+
     def is_ace(self):
         """Check if the card is an Ace."""
         return self.rank == 'A'
-   
+
     def to_dict(self):
         """Convert card to dictionary for JSON serialization."""
         return {
@@ -29,8 +72,25 @@ class Card:
             'rank': self.rank,
             'value': self.value
         }
-   
+
     @classmethod
     def from_dict(cls, data):
-        """Create a Card instance from a dictionary."""
-        return cls(data['suit'], data['rank'])
\ No newline at end of file
+        """Return the Card instance described by a dictionary."""
+        return cls(data['suit'], data['rank'])
+
+    @classmethod
+    def from_code(cls, code):
+        """Return the Card instance for an integer code."""
+        if not 0 <= code < len(CARDS):
+            raise ValueError(f"Invalid card code: {code}")
+        return CARDS[code]
+
+
+# The 52 shared card instances, indexed by code
+CARDS = tuple(
+    Card._create(suit, rank, suit_index * len(RANKS) + rank_index)
+    for suit_index, suit in enumerate(SUITS)
+    for rank_index, rank in enumerate(RANKS)
+)
+
+_CARDS_BY_KEY = {(card.suit, card.rank): card for card in CARDS}
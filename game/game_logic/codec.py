@@ -0,0 +1,210 @@
+"""
+Compact binary encoding of a BlackjackGame for session storage.
+
+Layout (version 6):
+    format version (1 byte) | flags (1 byte) | result code (1 byte)
+    game version (4 bytes) | round start, Unix time or 0 (4 bytes)
+    bet on each hand (4 bytes)
+    action count (1 byte) | one ASCII ACTION_CODES letter per action
+    player hand | dealer hand | split hand (only if FLAG_HAS_SPLIT)
+    deck mode (1 byte) | deck
+
+A hand is a card count (1 byte) followed by one byte per card. A card byte is
+its Card.code (suit index * 13 + rank index). A seeded deck (DECK_SEEDED) is its
+seed (8 bytes), draw position (2 bytes) and the cards left of each rank
+(2 bytes per rank, in rank index order); any other deck (DECK_CARDS) is a
+card count (2 bytes) followed by one byte per remaining card. A shoe sets
+DECK_SHOE in the mode byte and adds its deck count (1 byte) and cut card
+position (2 bytes) before the deck.
+
+Version 5 had no bet (read as 0). Version 4 had no round start or actions
+(read as None and none). Version 3 had no rank counts (derived from the dealt
+cards). Version 2 had no game version (read as 0). Version 1 also had no deck
+mode byte and always stored the deck as cards.
+"""
+import struct
+from .card import Card
+from .deck import Deck
+from .hand import Hand
+from .shoe import Shoe
+from .constants import RESULTS, RANKS
+from .settlement import RESULT_CODES
+
+
+FORMAT_VERSION = 6
+
+DECK_CARDS = 0
+DECK_SEEDED = 1
+DECK_SHOE = 0x80
+
+FLAG_GAME_OVER = 0x01
+FLAG_DEALER_TURN = 0x02
+FLAG_SPLIT_ACTIVE = 0x04
+FLAG_HAS_SPLIT = 0x08
+
+_HEADER = struct.Struct('>BBB')
+_GAME_VERSION = struct.Struct('>I')
+_STARTED_AT = struct.Struct('>I')
+_BET = struct.Struct('>I')
+_DECK_COUNT = struct.Struct('>H')
+_DECK_SEED = struct.Struct('>QH')
+_SHOE = struct.Struct('>BH')
+_RANK_COUNTS = struct.Struct(f'>{len(RANKS)}H')
+
+
+def encode_card(card):
+    """Return the one-byte code for a card."""
+    return card.code
+
+
+def decode_card(code):
+    """Return the card for a one-byte code."""
+    return Card.from_code(code)
+
+
+def encode_cards(cards):
+    """Return a sequence of cards as one code byte per card."""
+    return bytes(encode_card(card) for card in cards)
+
+
+def decode_cards(data):
+    """Return the cards for bytes written by encode_cards."""
+    return [decode_card(code) for code in data]
+
+
+def _pack_hand(hand):
+    return bytes([len(hand.cards)]) + encode_cards(hand.cards)
+
+
+def _unpack_hand(hand, data, offset):
+    count = data[offset]
+    offset += 1
+    if offset + count > len(data):
+        raise ValueError("Malformed game state")
+    for code in data[offset:offset + count]:
+        hand.add_card(decode_card(code))
+    return offset + count
+
+
+def _pack_deck(deck):
+    shoe_flag = 0
+    prefix = b''
+    if isinstance(deck, Shoe):
+        shoe_flag = DECK_SHOE
+        prefix = _SHOE.pack(deck.num_decks, deck.cut_card)
+
+    if deck.seed is not None:
+        return (bytes([DECK_SEEDED | shoe_flag]) + prefix
+                + _DECK_SEED.pack(deck.seed, deck.position)
+                + _RANK_COUNTS.pack(*deck.rank_counts))
+    cards = deck.cards
+    return (bytes([DECK_CARDS | shoe_flag]) + prefix + _DECK_COUNT.pack(len(cards))
+            + bytes(encode_card(card) for card in cards))
+
+
+def _unpack_deck(data, offset, version):
+    """Read the deck section and return the restored Deck or Shoe."""
+    mode = DECK_CARDS
+    if version > 1:
+        mode = data[offset]
+        offset += 1
+
+    if mode & DECK_SHOE:
+        num_decks, cut_card = _SHOE.unpack_from(data, offset)
+        offset += _SHOE.size
+        deck = Shoe(num_decks)
+        deck.cut_card = cut_card
+        mode &= ~DECK_SHOE
+    else:
+        deck = Deck()
+
+    if mode == DECK_SEEDED:
+        seed, position = _DECK_SEED.unpack_from(data, offset)
+        offset += _DECK_SEED.size
+        rank_counts = None
+        if version > 3:
+            rank_counts = _RANK_COUNTS.unpack_from(data, offset)
+            offset += _RANK_COUNTS.size
+        if offset != len(data):
+            raise ValueError("Malformed game state")
+        deck.restore(seed, position, rank_counts)
+        return deck
+
+    if mode != DECK_CARDS:
+        raise ValueError(f"Unknown deck mode: {mode}")
+    (count,) = _DECK_COUNT.unpack_from(data, offset)
+    offset += _DECK_COUNT.size
+    if offset + count != len(data):
+        raise ValueError("Malformed game state")
+    deck.cards = [decode_card(code) for code in data[offset:offset + count]]
+    return deck
+
+
+def pack_game(game):
+    """Encode a game into bytes."""
+    flags = 0
+    if game.game_over:
+        flags |= FLAG_GAME_OVER
+    if game.dealer_turn:
+        flags |= FLAG_DEALER_TURN
+    if game.active_hand == 'split':
+        flags |= FLAG_SPLIT_ACTIVE
+    if game.split_hand:
+        flags |= FLAG_HAS_SPLIT
+
+    parts = [
+        _HEADER.pack(FORMAT_VERSION, flags, RESULT_CODES[game.result]),
+        _GAME_VERSION.pack(game.version),
+        _STARTED_AT.pack(game.started_at or 0),
+        _BET.pack(game.bet),
+        bytes([len(game.actions)]) + game.actions.encode('ascii'),
+        _pack_hand(game.player_hand),
+        _pack_hand(game.dealer_hand),
+    ]
+    if game.split_hand:
+        parts.append(_pack_hand(game.split_hand))
+
+    parts.append(_pack_deck(game.deck))
+    return b''.join(parts)
+
+
+def unpack_game(game, data):
+    """Restore a game encoded by pack_game into an empty game instance."""
+    try:
+        return _unpack_game(game, data)
+    except (struct.error, IndexError) as exc:
+        raise ValueError("Malformed game state") from exc
+
+
+def _unpack_game(game, data):
+    version, flags, result = _HEADER.unpack_from(data, 0)
+    if version not in (1, 2, 3, 4, 5, FORMAT_VERSION):
+        raise ValueError(f"Unsupported game state version: {version}")
+
+    offset = _HEADER.size
+    if version > 2:
+        (game.version,) = _GAME_VERSION.unpack_from(data, offset)
+        offset += _GAME_VERSION.size
+    if version > 4:
+        (started_at,) = _STARTED_AT.unpack_from(data, offset)
+        game.started_at = started_at or None
+        offset += _STARTED_AT.size
+        if version > 5:
+            (game.bet,) = _BET.unpack_from(data, offset)
+            offset += _BET.size
+        count = data[offset]
+        game.actions = data[offset + 1:offset + 1 + count].decode('ascii')
+        offset += 1 + count
+    offset = _unpack_hand(game.player_hand, data, offset)
+    offset = _unpack_hand(game.dealer_hand, data, offset)
+    if flags & FLAG_HAS_SPLIT:
+        game.split_hand = Hand()
+        offset = _unpack_hand(game.split_hand, data, offset)
+
+    game.deck = _unpack_deck(data, offset, version)
+
+    game.game_over = bool(flags & FLAG_GAME_OVER)
+    game.dealer_turn = bool(flags & FLAG_DEALER_TURN)
+    game.active_hand = 'split' if flags & FLAG_SPLIT_ACTIVE else 'main'
+    game.result = RESULTS[result]
+    return game
@@ -7,8 +7,29 @@ CARD_VALUES = {
     'J': 10, 'Q': 10, 'K': 10, 'A': 11 
 }
 
+# Hi-Lo card counting values; a full deck sums to zero
+HI_LO = {
+    '2': 1, '3': 1, '4': 1, '5': 1, '6': 1, '7': 0, '8': 0, '9': 0, '10': -1,
+    'J': -1, 'Q': -1, 'K': -1, 'A': -1
+}
+
 BLACKJACK = 21
 
 DEALER_STAND_VALUE = 17
 
-FACE_CARD_NAMES = {'J': 'Jack', 'Q': 'Queen', 'K': 'King', 'A': 'Ace'}
\ No newline at end of file
+FACE_CARD_NAMES = {'J': 'Jack', 'Q': 'Queen', 'K': 'King', 'A': 'Ace'}
+
+# Result codes in a fixed order; the index is the code used by the binary game codec
+RESULTS = [
+    None, 'player_blackjack', 'dealer_blackjack', 'player_bust', 'dealer_bust',
+    'player_wins', 'dealer_wins', 'push', 'both_win', 'both_lose', 'both_push',
+    'win_and_lose', 'win_and_push', 'lose_and_push'
+]
+
+# One-letter codes for the player's actions in a round's action history
+ACTION_CODES = {'hit': 'H', 'stand': 'S', 'split': 'P'}
+
+DEFAULT_NUM_DECKS = 6
+
+# Fraction of the shoe dealt before the cut card is reached
+DEFAULT_PENETRATION = 0.75
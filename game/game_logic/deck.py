@@ -1,48 +1,251 @@
 import random
-from .card import Card
-from .constants import SUITS, RANKS
- 
- 
+import secrets
+from .card import Card, CARDS
+from .constants import RANKS, CARD_VALUES, DEALER_STAND_VALUE, HI_LO
+
+
+# Unshuffled order shared by every deck
+FULL_DECK = CARDS
+
+# Hi-Lo value and composition index (Ace 0, twos 1, ... tens and faces 9)
+# of each rank, by rank index (Card.code % 13)
+_RANK_HI_LO = tuple(HI_LO[rank] for rank in RANKS)
+_RANK_VALUE_INDEX = tuple(0 if rank == 'A' else CARD_VALUES[rank] - 1 for rank in RANKS)
+
+# Rank indexes from the lowest hard value (Ace 1) to the highest
+_RANKS_BY_VALUE = tuple(sorted(range(len(RANKS)), key=lambda rank: _RANK_VALUE_INDEX[rank]))
+
+# A player's hand can take another card until its total passes 21 and the
+# dealer's until it reaches DEALER_STAND_VALUE, so apart from the last card of
+# each of a round's hands (the player's two after a split, and the dealer's)
+# the cards a round deals add up to at most ROUND_HARD_TOTAL, counting aces
+# as one, and a round never deals more than MAX_ROUND_CARDS.
+ROUND_HANDS = 3
+ROUND_HARD_TOTAL = 21 + 21 + DEALER_STAND_VALUE - 1
+MAX_ROUND_CARDS = ROUND_HARD_TOTAL + ROUND_HANDS
+
+
 class Deck:
-    """Represents a deck of 52 playing cards."""
-   
+    """
+    Represents a deck of 52 playing cards.
+
+    A plain deck is replaced every round; see Shoe for a multi-deck shoe that
+    is kept between rounds.
+
+    A shuffled deck is defined by a seed and a draw position. The shuffle is a
+    Fisher-Yates pass driven by random.Random(seed) that fixes one card per
+    step from the end of the deck, so only the cards dealt so far have to be
+    derived when a deck is restored.
+
+    The deck also keeps the number of cards left of each rank (rank_counts,
+    indexed by rank index) and the Hi-Lo running count of the cards dealt,
+    both updated as each card is dealt.
+    """
+
+    num_decks = 1
+
     def __init__(self):
-        self.cards = []
+        self.seed = None
+        self.position = 0
+        self._order = []
+        self._in_order = False
+        self._rng = None
+        self._fixed = 0
+        self.rank_counts = [0] * len(RANKS)
+        self.running_count = 0
         self.reset()
-   
+
     def reset(self):
         """Create a fresh deck of 52 cards."""
-        self.cards = [Card(suit, rank) for suit in SUITS for rank in RANKS]
-   
-    def shuffle(self):
-        """Shuffle the deck."""
-        random.shuffle(self.cards)
-   
+        self._set_order(list(FULL_DECK) * self.num_decks, self._full_counts(), 0)
+        self._in_order = True
+
+    def _set_order(self, cards, counts=None, running_count=None):
+        """
+        Use an explicit card order (top of the deck is the end of the list),
+        counting its ranks unless the counts are given.
+        """
+        self.seed = None
+        self.position = 0
+        self._order = cards
+        self._in_order = False
+        self._rng = None
+        self._fixed = len(cards)
+        if counts is None:
+            counts = [0] * len(RANKS)
+            for card in cards:
+                counts[card.code % 13] += 1
+        self._set_counts(counts, running_count)
+
+    def _set_counts(self, counts, running_count=None):
+        """Set the cards left of each rank and derive the running count unless given."""
+        self.rank_counts = counts
+        if running_count is None:
+            # The full shoe sums to zero, so the dealt cards sum to minus the rest
+            running_count = -sum(count * weight for count, weight in zip(counts, _RANK_HI_LO))
+        self.running_count = running_count
+
+    def _full_counts(self):
+        return [len(FULL_DECK) // len(RANKS) * self.num_decks] * len(RANKS)
+
+    def _fix(self, count):
+        """Run the seeded shuffle far enough to fix the next `count` cards."""
+        if self._fixed >= count:
+            return
+        if self._rng is None:
+            # Seeding is most of the cost of a restore, so wait for the first card
+            self._rng = random.Random(self.seed)
+        order = self._order
+        while self._fixed < count:
+            i = len(order) - 1 - self._fixed
+            j = self._rng.randrange(i + 1)
+            order[i], order[j] = order[j], order[i]
+            self._fixed += 1
+
+    @property
+    def cards(self):
+        """The cards left in the deck; the next card dealt is the last one."""
+        self._fix(len(self._order))
+        return self._order[:len(self._order) - self.position]
+
+    @cards.setter
+    def cards(self, cards):
+        self._set_order(list(cards))
+
+    @property
+    def size(self):
+        """The number of cards in a complete deck."""
+        return len(FULL_DECK) * self.num_decks
+
+    def shuffle(self, seed=None):
+        """Shuffle the deck, optionally from a known seed."""
+        if self.cards_remaining() != self.size:
+            # A partially dealt deck can't be described by a seed alone
+            cards = self.cards
+            random.Random(seed).shuffle(cards)
+            self._set_order(cards)
+            return
+
+        if seed is None:
+            seed = secrets.randbits(64)
+        self._seed_order(seed, 0)
+        self._set_counts(self._full_counts(), 0)
+
+    def _seed_order(self, seed, position):
+        """Start the seeded shuffle, reusing the order of a fresh deck."""
+        if not self._in_order:
+            self._order = list(FULL_DECK) * self.num_decks
+        self._in_order = False
+        self.seed = seed
+        self.position = position
+        self._rng = None
+        self._fixed = 0
+
+    def restore(self, seed, position, rank_counts=None):
+        """
+        Restore a seeded deck at a draw position. Without rank_counts the
+        counts are derived from the cards dealt so far.
+        """
+        size = self.size
+        if not 0 <= position <= size:
+            raise ValueError("Deck position out of range")
+        if rank_counts is None:
+            self._seed_order(seed, position)
+            self._fix(position)
+            rank_counts = self._full_counts()
+            for card in self._order[size - position:]:
+                rank_counts[card.code % 13] -= 1
+            self._set_counts(rank_counts)
+            return
+        if (len(rank_counts) != len(RANKS) or sum(rank_counts) != size - position
+                or min(rank_counts) < 0 or max(rank_counts) > size // len(RANKS)):
+            raise ValueError("Deck rank counts don't match the deck")
+        self._seed_order(seed, position)
+        self._set_counts(list(rank_counts))
+
     def deal(self):
         """Deal one card from the top of the deck."""
-        if not self.cards:
+        if self.position >= len(self._order):
             raise ValueError("Cannot deal from an empty deck")
-        return self.cards.pop()
-   
+        self._fix(self.position + 1)
+        card = self._order[len(self._order) - 1 - self.position]
+        self.position += 1
+        rank = card.code % 13
+        self.rank_counts[rank] -= 1
+        self.running_count += _RANK_HI_LO[rank]
+        return card
+
+    def dealt_since(self, position):
+        """Return the cards dealt since an earlier draw position, in deal order."""
+        top = len(self._order) - 1
+        return [self._order[top - index] for index in range(position, self.position)]
+
+    def needs_shuffle(self):
+        """Check if the deck should be replaced before the next round."""
+        return True
+
+    def round_cards_needed(self):
+        """
+        Return the most cards one round could deal from the cards left: the
+        lowest of them up to ROUND_HARD_TOTAL, plus each hand's last card.
+        """
+        budget = ROUND_HARD_TOTAL
+        cards = ROUND_HANDS
+        for rank in _RANKS_BY_VALUE:
+            value = _RANK_VALUE_INDEX[rank] + 1
+            taken = min(self.rank_counts[rank], budget // value)
+            cards += taken
+            budget -= taken * value
+        return cards
+
     def cards_remaining(self):
         """Return the number of cards left in the deck."""
-        return len(self.cards)
-   
+        return len(self._order) - self.position
+
+    def true_count(self):
+        """Return the running count per deck left in the deck."""
+        remaining = self.cards_remaining()
+        if not remaining:
+            return 0.0
+        return self.running_count * len(FULL_DECK) / remaining
+
+    def composition(self):
+        """Return the cards left as a probability composition tuple (see probability.py)."""
+        counts = [0] * 10
+        for rank, count in enumerate(self.rank_counts):
+            counts[_RANK_VALUE_INDEX[rank]] += count
+        return tuple(counts)
+
     def __len__(self):
-        return len(self.cards)
-   
+        return self.cards_remaining()
+
     def __str__(self):
-        return f"Deck with {len(self.cards)} cards"
-   
+        return f"Deck with {self.cards_remaining()} cards"
+
     def to_dict(self):
-        """Convert deck to dictionary for JSON serialization."""
+        """
+        Convert deck to dictionary for JSON serialization.
+        A seeded deck is stored as its seed and position, which must stay server-side.
+        """
+        if self.seed is not None:
+            return {
+                'seed': self.seed,
+                'position': self.position,
+                'rank_counts': list(self.rank_counts)
+            }
         return {
             'cards': [card.to_dict() for card in self.cards]
         }
-   
+
     @classmethod
     def from_dict(cls, data):
         """Create a Deck instance from a dictionary."""
         deck = cls()
-        deck.cards = [Card.from_dict(card_data) for card_data in data['cards']]
-        return deck
\ No newline at end of file
+        deck._load_dict(data)
+        return deck
+
+    def _load_dict(self, data):
+        if 'seed' in data:
+            self.restore(data['seed'], data['position'], data.get('rank_counts'))
+        else:
+            self.cards = [Card.from_dict(card_data) for card_data in data['cards']]
@@ -0,0 +1,60 @@
+"""
+Differences between two game states from BlackjackGame.get_game_state().
+
+A delta maps each changed key to its new value, except hands, which only send
+what changed:
+
+    {'append': [cards], 'value': 18}   cards added to the end of the hand plus
+                                       any changed hand fields
+    {'replace': hand}                  the whole hand (or None), used when a
+                                       hand appears, disappears or loses cards
+"""
+
+HAND_KEYS = ('player_hand', 'split_hand', 'dealer_hand')
+
+
+def _diff_hand(old, new):
+    """Return the change between two serialized hands, or None if equal."""
+    if old == new:
+        return None
+    if old is None or new is None or new['cards'][:len(old['cards'])] != old['cards']:
+        return {'replace': new}
+
+    change = {}
+    added = new['cards'][len(old['cards']):]
+    if added:
+        change['append'] = added
+    for key, value in new.items():
+        if key != 'cards' and old.get(key) != value:
+            change[key] = value
+    return change
+
+
+def diff_states(old, new):
+    """Return the changes that turn the old state into the new state."""
+    changes = {}
+    for key, value in new.items():
+        if key in HAND_KEYS:
+            change = _diff_hand(old.get(key), value)
+            if change is not None:
+                changes[key] = change
+        elif key not in old or old[key] != value:
+            changes[key] = value
+    return changes
+
+
+def apply_delta(state, changes):
+    """Return a new state with the changes applied."""
+    state = dict(state)
+    for key, value in changes.items():
+        if key not in HAND_KEYS:
+            state[key] = value
+        elif 'replace' in value:
+            state[key] = value['replace']
+        else:
+            hand = dict(state[key])
+            hand['cards'] = hand['cards'] + value.get('append', [])
+            hand.update((field, field_value) for field, field_value in value.items()
+                        if field != 'append')
+            state[key] = hand
+    return state
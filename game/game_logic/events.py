@@ -0,0 +1,121 @@
+"""
+Game events: what each change to a game did, with the cards it dealt.
+
+Every change to a BlackjackGame raises its version by one and is recorded as
+the events for that version: a deal, or a player action followed by a dealer
+draw if the action ended the player's turn. Decks deal deterministically from
+their seed or card order, so applying the player actions to an earlier copy
+of the game deals the same cards again; replaying checks that it does. A deal
+may reshuffle the shoe from a fresh seed, so it can only be checked against a
+copy of the game taken just before it and is stored with a snapshot instead.
+
+Encoded, an event is its kind (1 ASCII byte), a card count (1 byte) and one
+Card.code byte per card, and the events of a version are concatenated.
+"""
+from .card import Card
+from .constants import ACTION_CODES
+
+
+DEAL = 'D'
+HIT = ACTION_CODES['hit']
+STAND = ACTION_CODES['stand']
+SPLIT = ACTION_CODES['split']
+DEALER_DRAW = 'R'
+
+KINDS = (DEAL, HIT, STAND, SPLIT, DEALER_DRAW)
+
+PLAYER_ACTIONS = {
+    HIT: 'player_hit',
+    STAND: 'player_stand',
+    SPLIT: 'player_split',
+}
+
+
+class ReplayError(ValueError):
+    """Raised when replaying events doesn't reproduce what was recorded."""
+
+
+class Event:
+    """One thing that happened to a game and the cards it dealt, in deal order."""
+
+    __slots__ = ('kind', 'cards')
+
+    def __init__(self, kind, cards=()):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown event kind: {kind!r}")
+        self.kind = kind
+        self.cards = tuple(cards)
+
+    def __eq__(self, other):
+        if not isinstance(other, Event):
+            return NotImplemented
+        return self.kind == other.kind and self.cards == other.cards
+
+    def __repr__(self):
+        return f"Event({self.kind!r}, [{', '.join(str(card) for card in self.cards)}])"
+
+
+def encode_events(events):
+    """Return the events of one version as bytes."""
+    data = bytearray()
+    for event in events:
+        data.append(ord(event.kind))
+        data.append(len(event.cards))
+        data.extend(card.code for card in event.cards)
+    return bytes(data)
+
+
+def decode_events(data):
+    """Return the events written by encode_events."""
+    if not isinstance(data, bytes):
+        raise ValueError("Malformed game events")
+    events = []
+    offset = 0
+    while offset < len(data):
+        if offset + 2 > len(data):
+            raise ValueError("Malformed game events")
+        kind, count = chr(data[offset]), data[offset + 1]
+        offset += 2
+        if offset + count > len(data):
+            raise ValueError("Malformed game events")
+        events.append(Event(kind, [Card.from_code(code) for code in data[offset:offset + count]]))
+        offset += count
+    return events
+
+
+def deal(game, bet=0):
+    """Deal a new round with bet chips on the hand and return its events."""
+    game.start_new_game(bet)
+    player, dealer = game.player_hand.cards, game.dealer_hand.cards
+    return [Event(DEAL, (player[0], dealer[0], player[1], dealer[1]))]
+
+
+def play(game, kind):
+    """
+    Apply a player action (HIT, STAND or SPLIT) and return its events, or
+    None if the action isn't allowed.
+    """
+    position = game.deck.position
+    dealer_cards = len(game.dealer_hand.cards)
+    if not getattr(game, PLAYER_ACTIONS[kind])():
+        return None
+
+    dealt = game.deck.dealt_since(position)
+    drawn = len(game.dealer_hand.cards) - dealer_cards
+    events = [Event(kind, dealt[:len(dealt) - drawn])]
+    if drawn:
+        events.append(Event(DEALER_DRAW, dealt[len(dealt) - drawn:]))
+    return events
+
+
+def replay(game, events):
+    """
+    Apply the recorded events of the next version to a game, raising
+    ReplayError if they can't be replayed or deal different cards.
+    """
+    if not events or events[0].kind not in PLAYER_ACTIONS:
+        raise ReplayError("Only player actions can be replayed")
+    replayed = play(game, events[0].kind)
+    if replayed != events:
+        raise ReplayError(f"Recorded {events}, replayed {replayed}")
+
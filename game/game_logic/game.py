@@ -1,13 +1,39 @@
+import base64
+import time
+from . import codec
 from .deck import Deck
 from .hand import Hand
-from .constants import BLACKJACK, DEALER_STAND_VALUE
+from .shoe import Shoe
+from . import strategy
+from . import probability
+from . import settlement
+from .timing import timed, record_size
+from .constants import DEALER_STAND_VALUE, ACTION_CODES, RESULTS
  
  
+# Message shown for each round result
+RESULT_MESSAGES = {
+    'player_blackjack': 'Blackjack! You win!',
+    'dealer_blackjack': 'Dealer has Blackjack. You lose.',
+    'player_bust': 'Bust! You lose.',
+    'dealer_bust': 'Dealer busts! You win!',
+    'player_wins': 'You win!',
+    'both_win': 'You won both hands!',
+    'both_lose': 'You lost both hands.',
+    'both_push': 'Both hands push (tie).',
+    'win_and_lose': 'Split result: One hand won, one hand lost.',
+    'win_and_push': 'Split result: One hand won, one hand pushed.',
+    'lose_and_push': 'Split result: One hand lost, one hand pushed.',
+    'dealer_wins': 'Dealer wins.',
+    'push': "It's a push (tie)."
+}
+
+
 class BlackjackGame:
     """Manages the core Blackjack game logic and rules."""
    
-    def __init__(self):
-        self.deck = Deck()
+    def __init__(self, deck=None):
+        self.deck = deck if deck is not None else Deck()
         self.player_hand = Hand()
         self.dealer_hand = Hand()
         self.game_over = False
@@ -15,18 +41,37 @@ class BlackjackGame:
         self.dealer_turn = False
         self.split_hand = None
         self.active_hand = 'main' # 'main' or 'split'
+        self.version = 0 # Increases with every change to the game
+        self.actions = '' # ACTION_CODES of the player's actions this round
+        self.started_at = None # Unix time the round was dealt
+        self.bet = 0 # Chips staked on each hand this round
+
+    @property
+    def dealt_version(self):
+        """The version the current round was dealt at (every action adds one)."""
+        return self.version - len(self.actions)
+
+    @property
+    def stake(self):
+        """Chips staked this round: the bet on each hand, so a split doubles it."""
+        return self.bet * (2 if self.split_hand else 1)
    
-    def start_new_game(self):
-        """Initialize a new game with shuffled deck and dealt cards."""
-        self.deck = Deck()
-        self.deck.shuffle()
-        self.player_hand = Hand()
-        self.dealer_hand = Hand()
+    def start_new_game(self, bet=0):
+        """Deal a new round with bet chips staked, reshuffling the deck first if it is due."""
+        if self.deck.needs_shuffle():
+            self.deck.reset()
+            self.deck.shuffle()
+        self.version += 1
+        self.player_hand.clear()
+        self.dealer_hand.clear()
         self.game_over = False
         self.result = None
         self.dealer_turn = False
         self.split_hand = None
         self.active_hand = 'main'
+        self.actions = ''
+        self.started_at = int(time.time())
+        self.bet = bet
        
         # Deal initial cards (player, dealer, player, dealer)
         self.player_hand.add_card(self.deck.deal())
@@ -35,24 +80,20 @@ class BlackjackGame:
         self.dealer_hand.add_card(self.deck.deal())
        
         # Check for immediate blackjack
-        if self.player_hand.is_blackjack():
-            self.dealer_turn = True
-            if self.dealer_hand.is_blackjack():
-                self.game_over = True
-                self.result = 'push'
-            else:
-                self.game_over = True
-                self.result = 'player_blackjack'
-        elif self.dealer_hand.is_blackjack():
+        outcome = settlement.natural_outcome(self.player_hand.is_blackjack(),
+                                             self.dealer_hand.is_blackjack())
+        if outcome != settlement.NO_RESULT:
             self.dealer_turn = True
             self.game_over = True
-            self.result = 'dealer_blackjack'
+            self.result = RESULTS[outcome]
    
     def player_hit(self):
         """Player takes another card."""
         if self.game_over or self.dealer_turn:
             return False
 
+        self.version += 1
+        self.actions += ACTION_CODES['hit']
         current_hand = self.split_hand if self.active_hand == 'split' else self.player_hand
         current_hand.add_card(self.deck.deal())
        
@@ -72,6 +113,8 @@ class BlackjackGame:
         if self.game_over or self.dealer_turn:
             return False
 
+        self.version += 1
+        self.actions += ACTION_CODES['stand']
         if self.active_hand == 'main' and self.split_hand:
             self.active_hand = 'split'
             return True
@@ -88,9 +131,11 @@ class BlackjackGame:
         if not self.player_hand.can_split():
             return False
        
+        self.version += 1
+        self.actions += ACTION_CODES['split']
         # Create split hand with second card
         self.split_hand = Hand()
-        self.split_hand.add_card(self.player_hand.cards.pop())
+        self.split_hand.add_card(self.player_hand.pop_card())
        
         # Deal new cards to both hands
         self.player_hand.add_card(self.deck.deal())
@@ -108,75 +153,78 @@ class BlackjackGame:
         self._determine_winner()
    
     def _determine_winner(self):
-        """Determine the game outcome."""
-        player_value = self.player_hand.get_value()
+        """Settle every hand against the dealer and set the round result."""
         dealer_value = self.dealer_hand.get_value()
-       
-        # Handle split hands
-        if self.split_hand:
-            split_value = self.split_hand.get_value()
-            main_result = self._compare_hands(player_value, dealer_value, self.player_hand.is_bust())
-            split_result = self._compare_hands(split_value, dealer_value, self.split_hand.is_bust())
-           
-            # Check for wins, losses, and pushes
-            main_wins = 'wins' in main_result or 'dealer_bust' in main_result
-            split_wins = 'wins' in split_result or 'dealer_bust' in split_result
-            main_loses = 'player_bust' in main_result or 'dealer_wins' in main_result
-            split_loses = 'player_bust' in split_result or 'dealer_wins' in split_result
-            main_push = 'push' in main_result
-            split_push = 'push' in split_result
-            
-            # Determine overall result based on all combinations
-            if main_wins and split_wins:
-                self.result = 'both_win'
-            elif main_loses and split_loses:
-                self.result = 'both_lose'
-            elif main_push and split_push:
-                self.result = 'both_push'
-            elif main_wins and split_push:
-                self.result = 'win_and_push'
-            elif main_push and split_wins:
-                self.result = 'win_and_push'
-            elif main_loses and split_push:
-                self.result = 'lose_and_push'
-            elif main_push and split_loses:
-                self.result = 'lose_and_push'
-            else:
-                # One wins, one loses
-                self.result = 'win_and_lose'
-        else:
-            self.result = self._compare_hands(player_value, dealer_value, self.player_hand.is_bust())
-       
+        dealer_bust = self.dealer_hand.is_bust()
+        hands = (self.player_hand, self.split_hand) if self.split_hand else (self.player_hand,)
+        outcomes = [settlement.hand_outcome(hand.get_value(), dealer_value, hand.is_bust(), dealer_bust)
+                    for hand in hands]
+        self.result = RESULTS[settlement.round_result(outcomes)]
         self.game_over = True
    
-    def _compare_hands(self, player_value, dealer_value, player_bust):
-        """Compare a single hand against dealer."""
-        if player_bust:
-            return 'player_bust'
-        elif self.dealer_hand.is_bust():
-            return 'dealer_bust'
-        elif player_value > dealer_value:
-            return 'player_wins'
-        elif dealer_value > player_value:
-            return 'dealer_wins'
-        else:
-            return 'push'
-   
     def get_game_state(self):
-        """Return the current game state as a dictionary."""
+        """Return the current game state, as the player may see it, as a dictionary."""
         return {
+            'version': self.version,
             'player_hand': self.player_hand.to_dict(),
             'split_hand': self.split_hand.to_dict() if self.split_hand else None,
             'active_hand': self.active_hand,
-            'dealer_hand': self.dealer_hand.to_dict(),
+            'dealer_hand': self._get_dealer_hand(),
             'dealer_showing': self._get_dealer_showing(),
             'game_over': self.game_over,
             'dealer_turn': self.dealer_turn,
             'result': self.result,
             'result_message': self._get_result_message(),
-            'can_split': self.player_hand.can_split() and not self.split_hand and not self.dealer_turn
+            'can_split': self.player_hand.can_split() and not self.split_hand and not self.dealer_turn,
+            'bet': self.bet,
+            'stake': self.stake,
+            'hint': self.get_hint(),
+            'bust_probability': self.get_bust_probability()
         }
+
+    def payout(self):
+        """Return the chips paid back for the round: nothing until it is over."""
+        if not self.game_over:
+            return 0
+        hands = 2 if self.split_hand else 1
+        return settlement.chips_returned(settlement.RESULT_CODES[self.result], self.bet, hands)
+
+    def get_hint(self):
+        """Return the basic strategy action for the active hand, or None if the player can't act."""
+        if self.game_over or self.dealer_turn or not self.dealer_hand.cards:
+            return None
+        current_hand = self.split_hand if self.active_hand == 'split' else self.player_hand
+        can_split = not self.split_hand and self.player_hand.can_split()
+        return strategy.hint(current_hand, self.dealer_hand.cards[0], can_split)
    
+    def get_bust_probability(self):
+        """
+        Return the chance the active hand busts if it hits, from the cards the
+        player hasn't seen, or None if the player can't act.
+        """
+        if self.game_over or self.dealer_turn or len(self.dealer_hand.cards) < 2:
+            return None
+        current_hand = self.split_hand if self.active_hand == 'split' else self.player_hand
+        counts = list(self.deck.composition())
+        # The hole card is still unseen, so it could be the next card
+        counts[probability.card_index(self.dealer_hand.cards[1])] += 1
+        return probability.bust_probability(current_hand, counts)
+
+    def _get_dealer_hand(self):
+        """
+        Get the dealer's hand as the player may see it: until the dealer's
+        turn only the upcard, with no value, so the hole card never reaches
+        the page or event streams.
+        """
+        if self.dealer_turn:
+            return self.dealer_hand.to_dict()
+        return {
+            'cards': [card.to_dict() for card in self.dealer_hand.cards[:1]],
+            'value': None,
+            'is_bust': False,
+            'is_blackjack': False
+        }
+
     def _get_dealer_showing(self):
         """Get dealer's visible card information (only first card before dealer's turn)."""
         if not self.dealer_turn and len(self.dealer_hand.cards) > 0:
@@ -189,22 +237,7 @@ class BlackjackGame:
    
     def _get_result_message(self):
         """Convert result code to a human-readable message."""
-        messages = {
-            'player_blackjack': 'Blackjack! You win!',
-            'dealer_blackjack': 'Dealer has Blackjack. You lose.',
-            'player_bust': 'Bust! You lose.',
-            'dealer_bust': 'Dealer busts! You win!',
-            'player_wins': 'You win!',
-            'both_win': 'You won both hands!',
-            'both_lose': 'You lost both hands.',
-            'both_push': 'Both hands push (tie).',
-            'win_and_lose': 'Split result: One hand won, one hand lost.',
-            'win_and_push': 'Split result: One hand won, one hand pushed.',
-            'lose_and_push': 'Split result: One hand lost, one hand pushed.',
-            'dealer_wins': 'Dealer wins.',
-            'push': "It's a push (tie)."
-        }
-        return messages.get(self.result, '')
+        return RESULT_MESSAGES.get(self.result, '')
    
     def to_dict(self):
         """Serialize the entire game state for session storage."""
@@ -216,14 +249,19 @@ class BlackjackGame:
             'dealer_hand': self.dealer_hand.to_dict(),
             'game_over': self.game_over,
             'dealer_turn': self.dealer_turn,
-            'result': self.result
+            'result': self.result,
+            'version': self.version,
+            'actions': self.actions,
+            'started_at': self.started_at,
+            'bet': self.bet
         }
    
     @classmethod
     def from_dict(cls, data):
         """Restore a game from serialized state."""
         game = cls()
-        game.deck = Deck.from_dict(data['deck'])
+        deck_cls = Shoe if 'num_decks' in data['deck'] else Deck
+        game.deck = deck_cls.from_dict(data['deck'])
         game.player_hand = Hand.from_dict(data['player_hand'])
         game.split_hand = Hand.from_dict(data['split_hand']) if data.get('split_hand') else None
         game.active_hand = data.get('active_hand', 'main')
@@ -231,4 +269,34 @@ class BlackjackGame:
         game.game_over = data['game_over']
         game.dealer_turn = data['dealer_turn']
         game.result = data['result']
-        return game
\ No newline at end of file
+        game.version = data.get('version', 0)
+        game.actions = data.get('actions', '')
+        game.started_at = data.get('started_at')
+        game.bet = data.get('bet', 0)
+        return game
+
+    def to_bytes(self):
+        """Serialize the game state into the compact binary format."""
+        return codec.pack_game(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Restore a game from the compact binary format."""
+        return codec.unpack_game(cls(), data)
+
+    def to_session(self):
+        """Serialize the game state as a base64 string for session storage."""
+        with timed('encode'):
+            value = base64.b64encode(self.to_bytes()).decode('ascii')
+        record_size('state', len(value))
+        return value
+
+    @classmethod
+    def from_session(cls, value):
+        """Restore a game from session storage, accepting the older dict format."""
+        if isinstance(value, dict):
+            with timed('decode'):
+                return cls.from_dict(value)
+        record_size('state', len(value))
+        with timed('decode'):
+            return cls.from_bytes(base64.b64decode(value))
@@ -6,34 +6,64 @@ class Hand:
     """Represents a hand of cards in Blackjack."""
    
     def __init__(self):
-        self.cards = []
-   
+        self._cards = []
+        self._hard_total = 0  # Aces counted as 1
+        self._aces = 0
+
+    @property
+    def cards(self):
+        """
+        The cards in the hand. Use add_card/pop_card to change them so the
+        running totals stay in step; assigning a new list is also supported.
+        """
+        return self._cards
+
+    @cards.setter
+    def cards(self, cards):
+        self.clear()
+        for card in cards:
+            self.add_card(card)
+
     def add_card(self, card):
         """Add a card to the hand."""
-        self.cards.append(card)
-   
+        self._cards.append(card)
+        if card.is_ace():
+            self._aces += 1
+            self._hard_total += 1
+        else:
+            self._hard_total += card.value
+
+    def pop_card(self):
+        """Remove and return the last card in the hand."""
+        card = self._cards.pop()
+        if card.is_ace():
+            self._aces -= 1
+            self._hard_total -= 1
+        else:
+            self._hard_total -= card.value
+        return card
+
+    def clear(self):
+        """Remove all cards from the hand."""
+        self._cards = []
+        self._hard_total = 0
+        self._aces = 0
+
     def get_value(self):
         """
         Calculate the value of the hand, properly handling Aces.
         Aces count as 11 unless that would cause a bust, then they count as 1.
+        At most one Ace can count as 11, so the value follows from the running
+        hard total and whether the hand holds an Ace.
         """
-        value = 0
-        aces = 0
-       
-        for card in self.cards:
-            if card.is_ace():
-                aces += 1
-                value += 11
-            else:
-                value += card.value
-       
-        # Adjust for Aces if we're over 21
-        while value > BLACKJACK and aces > 0:
-            value -= 10  # Convert an Ace from 11 to 1
-            aces -= 1
-       
-        return value
-   
+        if self.is_soft():
+            return self._hard_total + 10
+        return self._hard_total
+
+    def is_soft(self):
+        """Check if the hand has an Ace counted as 11."""
+        return self._aces > 0 and self._hard_total + 10 <= BLACKJACK
+
     def is_bust(self):
         """Check if the hand is over 21."""
         return self.get_value() > BLACKJACK
@@ -66,5 +96,6 @@ class Hand:
     def from_dict(cls, data):
         """Create a Hand instance from a dictionary."""
         hand = cls()
-        hand.cards = [Card.from_dict(card_data) for card_data in data['cards']]
+        for card_data in data['cards']:
+            hand.add_card(Card.from_dict(card_data))
         return hand
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+Exact dealer outcome probabilities for a known shoe composition.
+
+A composition is a tuple of ten counts of the cards left in the shoe, indexed
+by hard value - 1: index 0 is Aces, index 1 is twos and index 9 is every
+ten-valued card. The dealer's play is the same as BlackjackGame._dealer_play:
+draw until reaching DEALER_STAND_VALUE, with at most one Ace counted as 11.
+"""
+from functools import lru_cache
+from .constants import BLACKJACK, DEALER_STAND_VALUE
+
+
+# Order of the probabilities returned by the calculator
+DEALER_OUTCOMES = (17, 18, 19, 20, 21, 'bust')
+
+ACE_INDEX = 0
+TEN_INDEX = 9
+
+
+def card_index(card):
+    """Return the composition index of a card."""
+    return 0 if card.is_ace() else card.value - 1
+
+
+def composition(cards):
+    """Return the composition tuple of a list of cards."""
+    counts = [0] * 10
+    for card in cards:
+        counts[card_index(card)] += 1
+    return tuple(counts)
+
+
+def bust_probability(hand, counts):
+    """Return the chance that one more card from counts busts a hand."""
+    if hand.is_soft():
+        # The Ace can drop to 1, so no single card busts a soft hand
+        return 0.0
+    total = sum(counts)
+    if not total:
+        return None
+    # Cards worth more than this bust; composition index = value - 1
+    margin = BLACKJACK - hand.get_value()
+    return sum(counts[max(margin, 0):]) / total
+
+
+def _final(value):
+    """Return a distribution with all of the probability on one outcome."""
+    dist = [0.0] * len(DEALER_OUTCOMES)
+    dist[DEALER_OUTCOMES.index(value) if value <= BLACKJACK else -1] = 1.0
+    return tuple(dist)
+
+
+@lru_cache(maxsize=200000)
+def _dealer_distribution(hard, has_ace, counts):
+    """Distribution over DEALER_OUTCOMES from a hard total, Ace flag and composition."""
+    value = hard + 10 if has_ace and hard + 10 <= BLACKJACK else hard
+    if value >= DEALER_STAND_VALUE:
+        return _final(value)
+
+    total = sum(counts)
+    if not total:
+        raise ValueError("The shoe ran out before the dealer finished")
+
+    dist = [0.0] * len(DEALER_OUTCOMES)
+    for index, count in enumerate(counts):
+        if not count:
+            continue
+        remaining = counts[:index] + (count - 1,) + counts[index + 1:]
+        sub = _dealer_distribution(hard + index + 1, has_ace or index == ACE_INDEX, remaining)
+        weight = count / total
+        for outcome, probability in enumerate(sub):
+            dist[outcome] += weight * probability
+    return tuple(dist)
+
+
+def dealer_probabilities(upcard, counts, no_blackjack=False):
+    """
+    Return {outcome: probability} for the dealer's final hand given the
+    upcard and the composition of the unseen cards (which includes the hole
+    card). With no_blackjack the result is conditioned on the dealer not
+    holding a natural, which is the case whenever the player is still acting.
+    """
+    up_index = card_index(upcard)
+    dist = [0.0] * len(DEALER_OUTCOMES)
+    weight_total = 0
+
+    # Deal the hole card by hand so naturals can be left out
+    for index, count in enumerate(counts):
+        if not count:
+            continue
+        if no_blackjack and {index, up_index} == {ACE_INDEX, TEN_INDEX}:
+            continue
+        remaining = counts[:index] + (count - 1,) + counts[index + 1:]
+        sub = _dealer_distribution(
+            up_index + index + 2, ACE_INDEX in (index, up_index), remaining
+        )
+        weight_total += count
+        for outcome, probability in enumerate(sub):
+            dist[outcome] += count * probability
+
+    if not weight_total:
+        raise ValueError("No cards left for the dealer's hole card")
+    return {outcome: probability / weight_total
+            for outcome, probability in zip(DEALER_OUTCOMES, dist)}
+
+
+def deck_probabilities(upcard, deck, hidden_cards=(), no_blackjack=False):
+    """
+    Return dealer_probabilities for the cards left in a Deck or Shoe.
+    Cards already dealt but not yet shown, such as the dealer's hole card,
+    are passed as hidden_cards and counted as unseen.
+    """
+    counts = list(deck.composition())
+    for card in hidden_cards:
+        counts[card_index(card)] += 1
+    return dealer_probabilities(upcard, tuple(counts), no_blackjack)
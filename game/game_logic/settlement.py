@@ -0,0 +1,144 @@
+"""
+Settlement of finished rounds with integer outcome codes.
+
+Outcome codes are indexes into RESULTS, the same codes the session codec
+stores. Each hand settles to a single-hand code. A round with several hands
+(after a split) is combined with COMBINATIONS, indexed by a bitmask of which of
+win, loss and push occurred among its hands. The mask is the same size for any
+number of hands, so combining is one lookup. The 'both_' results read as
+'every hand' when there are more than two.
+
+Payout tables hold the net units won for each code with a one unit bet on
+every hand: 1:1 for a win, the blackjack payout (3:2 by default) for a
+natural, and 0 for a push. A round's net units are the sum over its hands.
+Chips are whole, so a 3:2 blackjack on an odd bet pays the half chip down.
+"""
+import math
+from .constants import RESULTS
+
+
+RESULT_CODES = {result: code for code, result in enumerate(RESULTS)}
+
+NO_RESULT = RESULT_CODES[None]
+PLAYER_BLACKJACK = RESULT_CODES['player_blackjack']
+DEALER_BLACKJACK = RESULT_CODES['dealer_blackjack']
+PLAYER_BUST = RESULT_CODES['player_bust']
+DEALER_BUST = RESULT_CODES['dealer_bust']
+PLAYER_WINS = RESULT_CODES['player_wins']
+DEALER_WINS = RESULT_CODES['dealer_wins']
+PUSH = RESULT_CODES['push']
+BOTH_WIN = RESULT_CODES['both_win']
+BOTH_LOSE = RESULT_CODES['both_lose']
+BOTH_PUSH = RESULT_CODES['both_push']
+WIN_AND_LOSE = RESULT_CODES['win_and_lose']
+WIN_AND_PUSH = RESULT_CODES['win_and_push']
+LOSE_AND_PUSH = RESULT_CODES['lose_and_push']
+
+WIN = 1
+LOSS = 2
+PUSHED = 4
+
+# Whether each single-hand outcome is a win, loss or push (0 for round results)
+_HAND_OUTCOMES = {
+    PLAYER_BLACKJACK: WIN,
+    DEALER_BLACKJACK: LOSS,
+    PLAYER_BUST: LOSS,
+    DEALER_BUST: WIN,
+    PLAYER_WINS: WIN,
+    DEALER_WINS: LOSS,
+    PUSH: PUSHED,
+}
+HAND_OUTCOMES = tuple(_HAND_OUTCOMES.get(code, 0) for code in range(len(RESULTS)))
+
+# Round result for each combination of outcomes among several hands
+_COMBINATIONS = {
+    WIN: BOTH_WIN,
+    LOSS: BOTH_LOSE,
+    PUSHED: BOTH_PUSH,
+    WIN | LOSS: WIN_AND_LOSE,
+    WIN | PUSHED: WIN_AND_PUSH,
+    LOSS | PUSHED: LOSE_AND_PUSH,
+    WIN | LOSS | PUSHED: WIN_AND_LOSE,
+}
+COMBINATIONS = tuple(_COMBINATIONS.get(mask, NO_RESULT) for mask in range(8))
+
+# Wins, losses and pushes behind each two-hand round result
+_SPLIT_HANDS = {
+    BOTH_WIN: (PLAYER_WINS, PLAYER_WINS),
+    BOTH_LOSE: (DEALER_WINS, DEALER_WINS),
+    BOTH_PUSH: (PUSH, PUSH),
+    WIN_AND_LOSE: (PLAYER_WINS, DEALER_WINS),
+    WIN_AND_PUSH: (PLAYER_WINS, PUSH),
+    LOSE_AND_PUSH: (DEALER_WINS, PUSH),
+}
+
+
+def natural_outcome(player_blackjack, dealer_blackjack):
+    """Return the outcome of a round settled by naturals on the deal, or NO_RESULT."""
+    if player_blackjack:
+        return PUSH if dealer_blackjack else PLAYER_BLACKJACK
+    return DEALER_BLACKJACK if dealer_blackjack else NO_RESULT
+
+
+def hand_outcome(player_value, dealer_value, player_bust, dealer_bust):
+    """Return the outcome of one finished hand against the dealer."""
+    if player_bust:
+        return PLAYER_BUST
+    if dealer_bust:
+        return DEALER_BUST
+    if player_value > dealer_value:
+        return PLAYER_WINS
+    if dealer_value > player_value:
+        return DEALER_WINS
+    return PUSH
+
+
+def round_result(outcomes):
+    """Return the round result code for the outcomes of its hands."""
+    if len(outcomes) == 1:
+        return outcomes[0]
+    mask = 0
+    for outcome in outcomes:
+        mask |= HAND_OUTCOMES[outcome]
+    return COMBINATIONS[mask]
+
+
+def payout_table(blackjack_payout=1.5):
+    """
+    Return the net units won for each single-hand outcome code, for a one
+    unit bet (None for codes that aren't a single hand).
+    """
+    units = {WIN: 1, LOSS: -1, PUSHED: 0}
+    table = [units.get(outcome) for outcome in HAND_OUTCOMES]
+    table[PLAYER_BLACKJACK] = blackjack_payout
+    return tuple(table)
+
+
+def round_payout_table(blackjack_payout=1.5):
+    """
+    Return the net units won for each round result code with a one unit bet
+    on each hand (None for no result). Two-hand results are the sum of the
+    outcomes they stand for.
+    """
+    hands = payout_table(blackjack_payout)
+    table = list(hands)
+    for code, outcomes in _SPLIT_HANDS.items():
+        table[code] = sum(hands[outcome] for outcome in outcomes)
+    return tuple(table)
+
+
+PAYOUTS = payout_table()
+ROUND_PAYOUTS = round_payout_table()
+
+
+def net_units(outcomes, payouts=PAYOUTS):
+    """Return the net units won by a round from the outcomes of its hands."""
+    return sum(payouts[outcome] for outcome in outcomes)
+
+
+def chips_returned(result, bet, hands=1, payouts=ROUND_PAYOUTS):
+    """
+    Return the chips paid back for a round result code with bet chips on
+    each of its hands: the stakes plus the net winnings, rounded down.
+    """
+    return bet * hands + math.floor(payouts[result] * bet)
@@ -0,0 +1,48 @@
+from .deck import Deck, MAX_ROUND_CARDS
+from .constants import DEFAULT_NUM_DECKS, DEFAULT_PENETRATION
+
+
+class Shoe(Deck):
+    """
+    Represents a multi-deck shoe with a cut card.
+
+    The shoe is kept between rounds and only reshuffled once the cut card has
+    been reached, or sooner if the cards left might not finish a round. Like a Deck, a shuffled shoe is stored as its seed and draw
+    position, plus the deck count and cut card position.
+    """
+
+    def __init__(self, num_decks=DEFAULT_NUM_DECKS, penetration=DEFAULT_PENETRATION):
+        if num_decks < 1:
+            raise ValueError("A shoe needs at least one deck")
+        if not 0 < penetration < 1:
+            raise ValueError("Penetration must be between 0 and 1")
+        self.num_decks = num_decks
+        super().__init__()
+        self.cut_card = int(self.size * penetration)
+
+    def needs_shuffle(self):
+        """
+        Check if the shoe is unshuffled, the cut card has been reached or a
+        round could run out of cards before it finishes.
+        """
+        remaining = self.cards_remaining()
+        return (self.seed is None or self.size - remaining >= self.cut_card
+                or remaining < MAX_ROUND_CARDS and remaining < self.round_cards_needed())
+
+    def __str__(self):
+        return f"{self.num_decks}-deck shoe with {self.cards_remaining()} cards"
+
+    def to_dict(self):
+        """Convert shoe to dictionary for JSON serialization."""
+        data = super().to_dict()
+        data['num_decks'] = self.num_decks
+        data['cut_card'] = self.cut_card
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create a Shoe instance from a dictionary."""
+        shoe = cls(data['num_decks'])
+        shoe.cut_card = data['cut_card']
+        shoe._load_dict(data)
+        return shoe
@@ -0,0 +1,174 @@
+"""
+Headless simulation of many rounds with the BlackjackGame rules.
+
+A single BlackjackGame and Shoe are reused for every round, so a simulation
+plays through exactly the same dealing, dealer and settlement code as the web
+game without allocating new objects per hand.
+
+simulate_parallel splits a run into fixed-size chunks, each with its own
+seed derived from the master seed, so the totals only depend on the master
+seed and chunk size and never on how many worker processes play the chunks.
+"""
+import random
+import secrets
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from .game import BlackjackGame
+from .shoe import Shoe
+from . import settlement
+from .constants import DEFAULT_NUM_DECKS, DEFAULT_PENETRATION, DEALER_STAND_VALUE, RESULTS
+
+
+CHUNK_HANDS = 10000
+
+
+# Net units won per round for each result, for a one unit bet on each hand
+PAYOUTS = {RESULTS[code]: units for code, units in enumerate(settlement.ROUND_PAYOUTS)
+           if units is not None}
+
+
+class Rules:
+    """Table rules used by a simulation, checked when they are made."""
+
+    def __init__(self, num_decks=DEFAULT_NUM_DECKS, penetration=DEFAULT_PENETRATION,
+                 blackjack_payout=1.5):
+        # Raises ValueError here rather than in the worker processes
+        Shoe(num_decks, penetration)
+        if blackjack_payout < 0:
+            raise ValueError("Blackjack payout can't be negative")
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.blackjack_payout = blackjack_payout
+        self.payouts = settlement.round_payout_table(blackjack_payout)
+
+    def payout(self, result):
+        """Return the net units won for a round result."""
+        return self.payouts[settlement.RESULT_CODES[result]]
+
+
+class SimulationResult:
+    """Aggregate outcome counts and net winnings of a simulation."""
+
+    def __init__(self):
+        self.hands = 0
+        self.outcomes = Counter()
+        self.net_units = 0
+
+    def record(self, result, units):
+        """Add one finished round."""
+        self.hands += 1
+        self.outcomes[result] += 1
+        self.net_units += units
+
+    def merge(self, other):
+        """Add the totals of another result into this one."""
+        self.hands += other.hands
+        self.outcomes.update(other.outcomes)
+        self.net_units += other.net_units
+        return self
+
+    @property
+    def house_edge(self):
+        """The house's expected gain per unit of initial bet."""
+        if not self.hands:
+            return 0.0
+        return -self.net_units / self.hands
+
+    def to_dict(self):
+        """Convert the result to a dictionary for reporting."""
+        return {
+            'hands': self.hands,
+            'outcomes': dict(self.outcomes),
+            'net_units': self.net_units,
+            'house_edge': self.house_edge
+        }
+
+
+def dealer_strategy(hand, dealer_card, can_split):
+    """Play like the dealer: hit below DEALER_STAND_VALUE, never split."""
+    return 'hit' if hand.get_value() < DEALER_STAND_VALUE else 'stand'
+
+
+def play_round(game, strategy):
+    """Deal and play one round on a game, returning the result code."""
+    game.start_new_game()
+    dealer_card = game.dealer_hand.cards[0]
+
+    while not game.game_over:
+        hand = game.split_hand if game.active_hand == 'split' else game.player_hand
+        can_split = game.split_hand is None and hand.can_split()
+        action = strategy(hand, dealer_card, can_split)
+
+        if action == 'hit':
+            played = game.player_hit()
+        elif action == 'stand':
+            played = game.player_stand()
+        elif action == 'split':
+            played = game.player_split()
+        else:
+            raise ValueError(f"Unknown action: {action}")
+        if not played:
+            raise ValueError(f"Strategy chose an invalid action: {action}")
+
+    return game.result
+
+
+def simulate(n_hands, strategy=dealer_strategy, rules=None, seed=None):
+    """
+    Play n_hands rounds and return a SimulationResult.
+
+    strategy is called as strategy(hand, dealer_card, can_split) for each
+    player decision and returns 'hit', 'stand' or 'split'. The same seed
+    always produces the same rounds.
+    """
+    rules = rules or Rules()
+    rng = random.Random(seed)
+    game = BlackjackGame(Shoe(rules.num_decks, rules.penetration))
+    result = SimulationResult()
+
+    for _ in range(n_hands):
+        if game.deck.needs_shuffle():
+            game.deck.reset()
+            game.deck.shuffle(rng.getrandbits(64))
+        outcome = play_round(game, strategy)
+        result.record(outcome, rules.payout(outcome))
+
+    return result
+
+
+def chunk_seed(seed, index):
+    """Return the seed for one chunk of a parallel run."""
+    # String seeds are hashed with SHA-512, so they are stable across processes
+    return f"{seed}:{index}"
+
+
+def _simulate_chunk(args):
+    return simulate(*args)
+
+
+def simulate_parallel(n_hands, strategy=dealer_strategy, rules=None, seed=None,
+                      workers=None, chunk_size=CHUNK_HANDS):
+    """
+    Play n_hands rounds across a pool of worker processes and return the
+    merged SimulationResult. strategy must be picklable (a module-level
+    function). With the same seed and chunk_size the result is identical for
+    any number of workers; workers=1 runs in the current process.
+    """
+    if seed is None:
+        seed = secrets.randbits(64)
+    chunks = (
+        (min(chunk_size, n_hands - start), strategy, rules, chunk_seed(seed, index))
+        for index, start in enumerate(range(0, n_hands, chunk_size))
+    )
+
+    result = SimulationResult()
+    if workers == 1:
+        for chunk in chunks:
+            result.merge(_simulate_chunk(chunk))
+        return result
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map yields in chunk order, so merging is deterministic
+        for part in pool.map(_simulate_chunk, chunks):
+            result.merge(part)
+    return result
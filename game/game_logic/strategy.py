@@ -0,0 +1,153 @@
+"""
+Basic strategy lookup for hit, stand and split decisions.
+
+The table is built offline by build_strategy_table (run through the
+build_strategy management command) and stored in basic_strategy.json next to
+this module. At import it is loaded into tuples indexed by hand total, so a
+hint is a couple of index lookups with no per-request computation.
+
+Columns are the dealer's upcard in the order 2-10, Ace. Cells are 'H' (hit),
+'S' (stand) or 'P' (split).
+"""
+import json
+from pathlib import Path
+from .constants import BLACKJACK, DEFAULT_NUM_DECKS
+from .probability import dealer_probabilities, ACE_INDEX
+from .card import Card
+
+
+TABLE_PATH = Path(__file__).resolve().parent / 'basic_strategy.json'
+
+COLUMNS = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'A')
+
+ACTIONS = {'H': 'hit', 'S': 'stand', 'P': 'split'}
+
+
+def _column(card):
+    """Return the table column for a dealer upcard."""
+    return len(COLUMNS) - 1 if card.is_ace() else card.value - 2
+
+
+def _pair_row(card):
+    """Return the pair row key for a card."""
+    return 'A' if card.is_ace() else str(card.value)
+
+
+def build_strategy_table(num_decks=DEFAULT_NUM_DECKS):
+    """
+    Compute the basic strategy table for the game rules.
+
+    Player draws use the full shoe composition (card removal is ignored), the
+    dealer's outcome is exact for the shoe and conditioned on no dealer
+    natural, as play only reaches a decision when neither side has one.
+    Split hands receive one card each and are then played independently.
+    """
+    counts = (4 * num_decks,) * 9 + (16 * num_decks,)
+    total_cards = sum(counts)
+    draws = [(index, count / total_cards) for index, count in enumerate(counts)]
+
+    table = {'num_decks': num_decks, 'columns': list(COLUMNS), 'hard': {}, 'soft': {}, 'pairs': {}}
+
+    for column, rank in enumerate(COLUMNS):
+        dealer = dealer_probabilities(Card('Spades', rank), counts, no_blackjack=True)
+        stand_cache = {}
+        best_cache = {}
+
+        def stand_ev(value):
+            if value not in stand_cache:
+                if value > BLACKJACK:
+                    stand_cache[value] = -1.0
+                else:
+                    win = dealer['bust'] + sum(dealer[final] for final in range(17, min(value, 22)))
+                    lose = sum(dealer[final] for final in range(max(value + 1, 17), 22))
+                    stand_cache[value] = win - lose
+            return stand_cache[value]
+
+        def value_of(hard, has_ace):
+            return hard + 10 if has_ace and hard + 10 <= BLACKJACK else hard
+
+        def hit_ev(hard, has_ace):
+            ev = 0.0
+            for index, probability in draws:
+                new_hard = hard + index + 1
+                if new_hard > BLACKJACK:
+                    ev -= probability
+                else:
+                    ev += probability * best_ev(new_hard, has_ace or index == ACE_INDEX)
+            return ev
+
+        def best_ev(hard, has_ace):
+            key = (hard, has_ace)
+            if key not in best_cache:
+                best_cache[key] = max(stand_ev(value_of(hard, has_ace)), hit_ev(hard, has_ace))
+            return best_cache[key]
+
+        def action(hard, has_ace):
+            if hit_ev(hard, has_ace) > stand_ev(value_of(hard, has_ace)):
+                return 'H'
+            return 'S'
+
+        for total in range(4, BLACKJACK + 1):
+            table['hard'].setdefault(str(total), []).append(action(total, False))
+        for total in range(12, BLACKJACK + 1):
+            table['soft'].setdefault(str(total), []).append(action(total - 10, True))
+
+        for index in range(10):
+            pair_card = index + 1
+            has_ace = index == ACE_INDEX
+            no_split = max(stand_ev(value_of(2 * pair_card, has_ace)), hit_ev(2 * pair_card, has_ace))
+            split = 2 * sum(probability * best_ev(pair_card + draw + 1, has_ace or draw == ACE_INDEX)
+                            for draw, probability in draws)
+            key = 'A' if has_ace else str(pair_card)
+            if split > no_split:
+                table['pairs'].setdefault(key, []).append('P')
+            else:
+                table['pairs'].setdefault(key, []).append(action(2 * pair_card, has_ace))
+
+    for section in ('hard', 'soft', 'pairs'):
+        table[section] = {key: ''.join(row) for key, row in table[section].items()}
+    return table
+
+
+def write_strategy_table(table, path=TABLE_PATH):
+    """Write a strategy table to disk as JSON."""
+    with open(path, 'w') as handle:
+        json.dump(table, handle, indent=2)
+        handle.write('\n')
+
+
+def load_strategy_table(path=TABLE_PATH):
+    """Load a strategy table into tuples indexed by hand total."""
+    with open(path) as handle:
+        table = json.load(handle)
+    hard = [None] * (BLACKJACK + 1)
+    soft = [None] * (BLACKJACK + 1)
+    for total, row in table['hard'].items():
+        hard[int(total)] = row
+    for total, row in table['soft'].items():
+        soft[int(total)] = row
+    return tuple(hard), tuple(soft), dict(table['pairs'])
+
+
+HARD, SOFT, PAIRS = load_strategy_table()
+
+
+def hint(hand, dealer_card, can_split=False):
+    """Return the basic strategy action for a hand, or None for a finished hand."""
+    value = hand.get_value()
+    if value >= BLACKJACK:
+        return 'stand' if value == BLACKJACK else None
+
+    column = _column(dealer_card)
+    if can_split:
+        code = PAIRS[_pair_row(hand.cards[0])][column]
+        if code == 'P':
+            return 'split'
+    rows = SOFT if hand.is_soft() else HARD
+    row = rows[value]
+    return ACTIONS[row[column]] if row else 'hit'
+
+
+def basic_strategy(hand, dealer_card, can_split):
+    """Simulation strategy that follows the basic strategy table."""
+    return hint(hand, dealer_card, can_split)
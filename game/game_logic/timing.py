@@ -0,0 +1,158 @@
+"""
+Per-request timing hooks.
+
+Code on the request path wraps its phases in timed() and reports payload
+sizes with record_size(). Both only record while a Timings collector is
+active in the current context (TimingMiddleware starts one per request),
+so outside a request, such as in simulations, they do nothing.
+"""
+import bisect
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+
+_current = ContextVar('blackjack_timings', default=None)
+
+
+class Timings:
+    """Phase durations in seconds and payload sizes in bytes for one request."""
+
+    __slots__ = ('phases', 'sizes')
+
+    def __init__(self):
+        self.phases = {}
+        self.sizes = {}
+
+    def add(self, phase, seconds):
+        """Add time spent in a phase; a repeated phase accumulates."""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def size(self, name, nbytes):
+        """Record the size of a payload."""
+        self.sizes[name] = nbytes
+
+
+def start():
+    """Start collecting timings in this context; return them and a reset token."""
+    timings = Timings()
+    return timings, _current.set(timings)
+
+
+def stop(token):
+    """Stop collecting the timings started with token."""
+    _current.reset(token)
+
+
+@contextmanager
+def timed(phase):
+    """Time the enclosed block as a phase of the current request."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    began = perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, perf_counter() - began)
+
+
+def record_size(name, nbytes):
+    """Record a payload size for the current request."""
+    timings = _current.get()
+    if timings is not None:
+        timings.size(name, nbytes)
+
+
+class Histogram:
+    """
+    Counts of values in geometric buckets between low and high, so
+    percentiles are approximate to within one bucket (factor - 1).
+    """
+
+    def __init__(self, low, high, factor=1.2):
+        bounds = [low]
+        while bounds[-1] < high:
+            bounds.append(bounds[-1] * factor)
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        """Count a value."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q):
+        """Return the upper bound of the bucket holding the q-th percentile."""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self, scale=1.0):
+        """Return count, mean, p50, p95, p99 and max, multiplied by scale."""
+        return {
+            'count': self.count,
+            'mean': self.total / self.count * scale if self.count else None,
+            'p50': self._scaled(50, scale),
+            'p95': self._scaled(95, scale),
+            'p99': self._scaled(99, scale),
+            'max': self.max * scale,
+        }
+
+    def _scaled(self, q, scale):
+        value = self.percentile(q)
+        return value * scale if value is not None else None
+
+
+class TimingStats:
+    """Histograms of request timings and payload sizes, per view, for this process."""
+
+    def __init__(self):
+        self._phases = {}
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def record(self, view, timings):
+        """Add one request's timings for a view."""
+        with self._lock:
+            for phase, seconds in timings.phases.items():
+                histogram = self._phases.get((view, phase))
+                if histogram is None:
+                    histogram = self._phases[(view, phase)] = Histogram(1e-6, 60)
+                histogram.add(seconds)
+            for name, nbytes in timings.sizes.items():
+                histogram = self._sizes.get((view, name))
+                if histogram is None:
+                    histogram = self._sizes[(view, name)] = Histogram(1, 1e8)
+                histogram.add(nbytes)
+
+    def summary(self):
+        """Return {view: {'ms': {phase: stats}, 'bytes': {name: stats}}}."""
+        result = {}
+        with self._lock:
+            for (view, phase), histogram in sorted(self._phases.items()):
+                view_stats = result.setdefault(view, {'ms': {}, 'bytes': {}})
+                view_stats['ms'][phase] = histogram.summary(1000)
+            for (view, name), histogram in sorted(self._sizes.items()):
+                view_stats = result.setdefault(view, {'ms': {}, 'bytes': {}})
+                view_stats['bytes'][name] = histogram.summary()
+        return result
+
+    def reset(self):
+        """Forget all recorded timings."""
+        with self._lock:
+            self._phases.clear()
+            self._sizes.clear()
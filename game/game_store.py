@@ -0,0 +1,387 @@
+"""
+Game state storage outside the session.
+
+The session only holds a game id. Games live in a Django cache
+(BLACKJACK_GAME_STORE['CACHE'], local memory on a single node or Redis when
+several nodes share games) as an append-only event log: a snapshot of the
+encoded game, written when a round is dealt and every SNAPSHOT_EVERY
+versions, and the events of each version after it (see
+game_logic/events.py). A save in the middle of a round only adds a few bytes
+of events, and a load replays the events after the snapshot, fetched in one
+get_many. Both expire after STATE_TIMEOUT; a snapshot is always older than
+the events after it, so it expires first.
+
+Snapshots and events are queued and written behind to SavedGame and
+GameEvent in bulk statements when FLUSH_INTERVAL has passed at the end of a
+request, when MAX_PENDING are queued, or at exit. If the database can't be
+written they go back on the queue for the next flush. A game missing from the
+cache, or whose cached events don't replay, is rebuilt from the queue or the
+database. Deals are stored with a snapshot, so replay_game can check every
+round from the database.
+
+Saves are compare-and-swap on the game version: the save of version N + 1
+adds its events with an atomic cache add, so of two requests that loaded the
+same version only the first saves and the other gets GameConflict. No lock
+is held between loading and saving.
+
+The cache and the write-behind queue must be shared by every process saving
+games, or one process can load a version another has already replaced and
+save over it. Where several processes only have caches of their own, set
+CACHE to None: games are then read from and written to the database on
+every request, and a save claims its version with a conditional UPDATE of
+SavedGame.version instead.
+"""
+import atexit
+import logging
+import threading
+import time
+import uuid
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import request_finished, setting_changed
+from django.db import DatabaseError, transaction
+from django.db.models.functions import Now
+from django.dispatch import receiver
+from .game_logic import codec, events
+from .game_logic.game import BlackjackGame
+from .models import GameEvent, SavedGame
+
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY = 'game_id'
+
+# Game state stored in the session before the game store existed
+LEGACY_SESSION_KEY = 'game_state'
+
+# Seconds cached snapshots and events are kept, well beyond any request that
+# could still be saving from a version
+STATE_TIMEOUT = 24 * 60 * 60
+
+DEFAULTS = {
+    'CACHE': 'game_state',
+    'FLUSH_INTERVAL': 5.0,
+    'MAX_PENDING': 500,
+    'SNAPSHOT_EVERY': 8,
+}
+
+
+class GameConflict(Exception):
+    """Raised when a game was saved by another request since it was loaded."""
+
+
+def decode_game(state):
+    """Decode a stored game, raising ValueError if it is malformed."""
+    try:
+        return BlackjackGame.from_session(state)
+    except ValueError:
+        raise
+    except Exception as exc:
+        raise ValueError("Malformed game state") from exc
+
+
+def event_order(row):
+    """Sort key putting a version's player action before the dealer's draw."""
+    return (row.version, row.kind == events.DEALER_DRAW)
+
+
+def row_events(rows):
+    """Return the events of GameEvent rows for one version."""
+    return [events.Event(row.kind, codec.decode_cards(bytes(row.cards))) for row in rows]
+
+
+def replay_rows(game, rows):
+    """Replay GameEvent rows after a game's version until a version is missing."""
+    by_version = {}
+    for row in sorted(rows, key=event_order):
+        by_version.setdefault(row.version, []).append(row)
+    while game.version + 1 in by_version:
+        events.replay(game, row_events(by_version[game.version + 1]))
+    return game
+
+
+class GameStore:
+    """
+    Cache-backed game event log with write-behind persistence, or a store
+    writing straight to the database when cache_alias is None.
+    """
+
+    def __init__(self, cache_alias=DEFAULTS['CACHE'], flush_interval=DEFAULTS['FLUSH_INTERVAL'],
+                 max_pending=DEFAULTS['MAX_PENDING'], snapshot_every=DEFAULTS['SNAPSHOT_EVERY']):
+        self.cache = caches[cache_alias] if cache_alias is not None else None
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.snapshot_every = snapshot_every
+        self._pending = {}
+        self._pending_events = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def _key(self, game_id):
+        return f"game:{game_id}"
+
+    def _event_key(self, game_id, version):
+        return f"game:{game_id}:events:{version}"
+
+    def _claim_key(self, game_id, base_version):
+        # Saving from a version claims it by adding the next version's events
+        return self._event_key(game_id, base_version + 1)
+
+    def _event_keys(self, game_id, version):
+        """Keys of the events that can follow a snapshot at a version."""
+        return [self._event_key(game_id, version + step) for step in range(1, self.snapshot_every)]
+
+    def new_id(self):
+        """Return a new game id."""
+        return uuid.uuid4().hex
+
+    def _replay_cached(self, game, keys, cached):
+        """Apply the cached events after a snapshot, raising ValueError on a gap."""
+        for index, key in enumerate(keys):
+            if key not in cached:
+                if any(later in cached for later in keys[index + 1:]):
+                    raise ValueError("Missing game events")
+                break
+            events.replay(game, events.decode_events(cached[key]))
+        return game
+
+    def _stored_game(self, game_id):
+        """Rebuild a game from the latest queued or saved snapshot and the events after it."""
+        with self._lock:
+            snapshot = self._pending.get(game_id)
+            queued = list(self._pending_events.get(game_id, ()))
+        rows = {}
+        if snapshot is None:
+            snapshot = (SavedGame.objects.filter(game_id=game_id)
+                        .values_list('state', 'version').first())
+            if snapshot is None:
+                return None
+            # Events after a queued snapshot are all still queued too
+            rows = {(row.version, row.kind): row
+                    for row in GameEvent.objects.filter(game_id=game_id, version__gt=snapshot[1])}
+        state, version = snapshot
+        rows.update(((row.version, row.kind), row) for row in queued if row.version > version)
+        game = replay_rows(decode_game(state), rows.values())
+        return game, (state if game.version == version else game.to_session())
+
+    def load(self, game_id):
+        """
+        Return the game for an id, or None if there is none. Raises
+        ValueError if the stored game is malformed.
+        """
+        if self.cache is None:
+            stored = self._stored_game(game_id)
+            return stored[0] if stored else None
+        state = self.cache.get(self._key(game_id))
+        if state is not None:
+            game = decode_game(state)
+            keys = self._event_keys(game_id, game.version)
+            try:
+                return self._replay_cached(game, keys, self.cache.get_many(keys))
+            except ValueError:
+                # Rebuild from the queue or database
+                pass
+
+        stored = self._stored_game(game_id)
+        if stored is None:
+            return None
+        game, state = stored
+        self.cache.set(self._key(game_id), state, STATE_TIMEOUT)
+        return game
+
+    async def aload(self, game_id):
+        """Async version of load."""
+        if self.cache is None:
+            return await sync_to_async(self.load)(game_id)
+        state = await self.cache.aget(self._key(game_id))
+        if state is not None:
+            game = decode_game(state)
+            keys = self._event_keys(game_id, game.version)
+            try:
+                return self._replay_cached(game, keys, await self.cache.aget_many(keys))
+            except ValueError:
+                pass
+
+        stored = await sync_to_async(self._stored_game)(game_id)
+        if stored is None:
+            return None
+        game, state = stored
+        await self.cache.aset(self._key(game_id), state, STATE_TIMEOUT)
+        return game
+
+    def _needs_snapshot(self, game, base_version, game_events):
+        """Check whether a save writes the whole game rather than its events."""
+        return (base_version is None or game.version != base_version + 1 or not game_events
+                or game_events[0].kind == events.DEAL or game.version % self.snapshot_every == 0)
+
+    def _event_rows(self, game_id, game, game_events, state):
+        """Return the GameEvent rows of a save, keeping the snapshot with a deal."""
+        return [GameEvent(game_id=game_id, version=game.version, kind=event.kind,
+                          cards=codec.encode_cards(event.cards),
+                          snapshot=state if event.kind == events.DEAL else None)
+                for event in game_events]
+
+    def _queue(self, game_id, game, game_events, state):
+        """Queue a save for the database and return True if the queue is full."""
+        rows = self._event_rows(game_id, game, game_events, state)
+        with self._lock:
+            if state is not None:
+                self._pending[game_id] = (state, game.version)
+            if rows:
+                self._pending_events.setdefault(game_id, []).extend(rows)
+            return self._pending_size() >= self.max_pending
+
+    def _pending_size(self):
+        return len(self._pending) + sum(len(rows) for rows in self._pending_events.values())
+
+    def save(self, game_id, game, base_version=None, game_events=()):
+        """
+        Store a game and queue it for the database. With base_version, the
+        version the game was loaded at, raise GameConflict if another save
+        from that version got there first; then, between snapshots, only
+        game_events, the events of the change, are stored.
+        """
+        if self.cache is None:
+            self._save_to_database(game_id, game, base_version, game_events)
+            return
+        payload = events.encode_events(game_events)
+        if base_version is not None and not self.cache.add(
+                self._claim_key(game_id, base_version), payload, STATE_TIMEOUT):
+            raise GameConflict(game_id)
+        state = None
+        if self._needs_snapshot(game, base_version, game_events):
+            state = game.to_session()
+            self.cache.set(self._key(game_id), state, STATE_TIMEOUT)
+        if self._queue(game_id, game, game_events, state):
+            self._flush_logged()
+
+    async def asave(self, game_id, game, base_version=None, game_events=()):
+        """Async version of save."""
+        if self.cache is None:
+            await sync_to_async(self._save_to_database)(game_id, game, base_version, game_events)
+            return
+        payload = events.encode_events(game_events)
+        if base_version is not None and not await self.cache.aadd(
+                self._claim_key(game_id, base_version), payload, STATE_TIMEOUT):
+            raise GameConflict(game_id)
+        state = None
+        if self._needs_snapshot(game, base_version, game_events):
+            state = game.to_session()
+            await self.cache.aset(self._key(game_id), state, STATE_TIMEOUT)
+        if self._queue(game_id, game, game_events, state):
+            await sync_to_async(self._flush_logged)()
+
+    def _save_to_database(self, game_id, game, base_version, game_events):
+        """
+        Write a whole game and its events to the database. With base_version,
+        the save only updates the game's row while it is still at that version.
+        """
+        state = game.to_session()
+        rows = self._event_rows(game_id, game, game_events, state)
+        with transaction.atomic():
+            if base_version is None:
+                SavedGame.objects.update_or_create(
+                    game_id=game_id, defaults={'state': state, 'version': game.version})
+            elif not (SavedGame.objects.filter(game_id=game_id, version=base_version)
+                      .update(state=state, version=game.version, updated_at=Now())):
+                raise GameConflict(game_id)
+            if rows:
+                GameEvent.objects.bulk_create(rows, ignore_conflicts=True)
+
+    def pending_count(self):
+        """Return how many snapshots and events are waiting to be written."""
+        with self._lock:
+            return self._pending_size()
+
+    def flush(self):
+        """
+        Write queued snapshots and events to the database and return how many
+        were written. If the database raises, everything taken from the queue
+        goes back on it before the error propagates; writing it again is
+        harmless, as snapshots are upserts and events skip rows already saved.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            pending_events, self._pending_events = self._pending_events, {}
+            self._last_flush = time.monotonic()
+        rows = [row for game_rows in pending_events.values() for row in game_rows]
+        try:
+            if pending:
+                SavedGame.objects.bulk_create(
+                    [SavedGame(game_id=game_id, state=state, version=version)
+                     for game_id, (state, version) in pending.items()],
+                    update_conflicts=True,
+                    unique_fields=['game_id'],
+                    update_fields=['state', 'version', 'updated_at'],
+                )
+            if rows:
+                GameEvent.objects.bulk_create(rows, ignore_conflicts=True)
+        except DatabaseError:
+            self._requeue(pending, pending_events)
+            raise
+        return len(pending) + len(rows)
+
+    def _requeue(self, pending, pending_events):
+        """Put snapshots and events back on the queue, behind any queued since."""
+        with self._lock:
+            for game_id, snapshot in pending.items():
+                newer = self._pending.get(game_id)
+                if newer is None or newer[1] < snapshot[1]:
+                    self._pending[game_id] = snapshot
+            for game_id, rows in pending_events.items():
+                self._pending_events[game_id] = rows + self._pending_events.get(game_id, [])
+
+    def _flush_logged(self):
+        """Flush, logging instead of raising if the database can't be written."""
+        try:
+            self.flush()
+        except DatabaseError:
+            logger.exception("Could not write %d queued games and events", self.pending_count())
+
+    def flush_if_due(self):
+        """Flush if anything is queued and the flush interval has passed."""
+        with self._lock:
+            queued = bool(self._pending or self._pending_events)
+            due = queued and time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self._flush_logged()
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_game_store():
+    """Return the process-wide game store built from settings."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                options = {**DEFAULTS, **getattr(settings, 'BLACKJACK_GAME_STORE', {})}
+                _store = GameStore(options['CACHE'], options['FLUSH_INTERVAL'],
+                                   options['MAX_PENDING'], options['SNAPSHOT_EVERY'])
+    return _store
+
+
+@receiver(setting_changed)
+def _reset_store(setting, **kwargs):
+    """Rebuild the store when tests change its settings."""
+    global _store
+    if setting in ('BLACKJACK_GAME_STORE', 'CACHES'):
+        if _store is not None:
+            _store.flush()
+        _store = None
+
+
+@receiver(request_finished)
+def _flush_after_request(**kwargs):
+    """Write queued games behind once the flush interval has passed, never failing the request."""
+    if _store is not None:
+        _store.flush_if_due()
+
+
+@atexit.register
+def _flush_at_exit():
+    """Write any queued games before the process exits."""
+    if _store is not None:
+        _store.flush()
@@ -0,0 +1,206 @@
+"""
+Hand history written off the request path.
+
+When a save leaves a game over, the finished round is turned into a
+HandHistory row in memory and put on a bounded queue. A background thread
+takes rows off the queue and inserts them with one bulk_create per batch of
+up to BATCH_SIZE rows, collected for at most FLUSH_INTERVAL seconds, so an
+action never waits on an INSERT. When the queue holds MAX_QUEUE rows new rounds
+are dropped and counted rather than blocking the request. The queue is
+drained at exit.
+
+With ASYNC off rows are inserted as they are recorded, which tests set with
+override_settings so each test sees the rows it created.
+"""
+import atexit
+import datetime
+import logging
+import queue
+import threading
+import time
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DatabaseError, close_old_connections, connections
+from django.dispatch import receiver
+from .game_logic import codec
+from .models import HandHistory
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ASYNC': True,
+    'MAX_QUEUE': 10000,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 1.0,
+}
+
+# Seconds to wait for the queue to drain when shutting down
+SHUTDOWN_TIMEOUT = 10.0
+
+# Put on the queue to stop the writer thread
+_STOP = object()
+
+
+def _timestamp(seconds):
+    if seconds is None:
+        return None
+    return datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc)
+
+
+def hand_history(game_id, game):
+    """Return an unsaved HandHistory row for a finished game."""
+    return HandHistory(
+        game_id=game_id,
+        round=game.version,
+        player_cards=codec.encode_cards(game.player_hand.cards),
+        dealer_cards=codec.encode_cards(game.dealer_hand.cards),
+        split_cards=codec.encode_cards(game.split_hand.cards) if game.split_hand else None,
+        actions=game.actions,
+        result=game.result,
+        started_at=_timestamp(game.started_at),
+        finished_at=_timestamp(time.time()),
+    )
+
+
+class HistoryWriter:
+    """Batches HandHistory rows into bulk inserts from a background thread."""
+
+    def __init__(self, max_queue=DEFAULTS['MAX_QUEUE'], batch_size=DEFAULTS['BATCH_SIZE'],
+                 flush_interval=DEFAULTS['FLUSH_INTERVAL'], asynchronous=DEFAULTS['ASYNC']):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.asynchronous = asynchronous
+        self.queue = queue.Queue(max_queue)
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def record(self, game_id, game):
+        """Queue a finished round; return False if it was dropped."""
+        row = hand_history(game_id, game)
+        if not self.asynchronous:
+            self._write([row])
+            return True
+
+        self._ensure_thread()
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name='hand-history-writer', daemon=True
+                    )
+                    self._thread.start()
+
+    def _next_batch(self):
+        """Block for a row, then collect more until the batch is full or time is up."""
+        batch = []
+        item = self.queue.get()
+        deadline = time.monotonic() + self.flush_interval
+        while item is not _STOP:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                break
+            try:
+                item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+        return batch, item is _STOP
+
+    def _run(self):
+        try:
+            stop = False
+            while not stop:
+                batch, stop = self._next_batch()
+                if batch:
+                    close_old_connections()
+                    self._write(batch)
+        finally:
+            connections.close_all()
+
+    def _write(self, batch):
+        try:
+            HandHistory.objects.bulk_create(batch)
+        except DatabaseError:
+            logger.exception("Could not write %d hand histories", len(batch))
+            with self._lock:
+                self.failed += len(batch)
+            return
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        """Write everything queued and stop the writer thread."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Hand history queue did not drain before shutdown")
+            return
+        thread.join(timeout)
+
+    def metrics(self):
+        """Return queue depth and write counters."""
+        with self._lock:
+            return {
+                'asynchronous': self.asynchronous,
+                'queue_depth': self.queue.qsize(),
+                'max_queue': self.max_queue,
+                'enqueued': self.enqueued,
+                'dropped': self.dropped,
+                'written': self.written,
+                'failed': self.failed,
+                'batches': self.batches,
+            }
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_history_writer():
+    """Return the process-wide history writer built from settings."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                options = {**DEFAULTS, **getattr(settings, 'BLACKJACK_HISTORY', {})}
+                _writer = HistoryWriter(options['MAX_QUEUE'], options['BATCH_SIZE'],
+                                        options['FLUSH_INTERVAL'], options['ASYNC'])
+    return _writer
+
+
+@receiver(setting_changed)
+def _reset_writer(setting, **kwargs):
+    """Rebuild the writer when tests change its settings."""
+    global _writer
+    if setting == 'BLACKJACK_HISTORY':
+        if _writer is not None:
+            _writer.shutdown()
+        _writer = None
+
+
+@atexit.register
+def _shutdown_at_exit():
+    """Write any queued rounds before the process exits."""
+    if _writer is not None:
+        _writer.shutdown()
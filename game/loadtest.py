@@ -0,0 +1,232 @@
+"""
+Load generator that plays realistic sessions against the game views.
+
+Each virtual player opens the page, then plays rounds: new game, the page
+load it redirects to, then hits, stands and splits chosen by the hint in
+the game state, sending the version it holds like the page script does.
+Requests go either through Django's test client, which runs the full
+middleware stack in this process, or over HTTP to a running server.
+"""
+import json
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.cookiejar import CookieJar
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+from .game_logic.delta import apply_delta
+
+
+STATE_SCRIPT = re.compile(r'<script id="game-state" type="application/json">(.*?)</script>', re.S)
+
+ENDPOINTS = ('index', 'new_game', 'hit', 'stand', 'split')
+
+
+# The in-memory SQLite test database locks tables between connections without
+# waiting, so one thread's write transaction fails another's queries there
+_memory_db_lock = threading.Lock()
+
+
+def _in_memory_db():
+    return (connection.vendor == 'sqlite'
+            and connection.creation.is_in_memory_db(connection.settings_dict['NAME']))
+
+
+class ClientTransport:
+    """
+    Sends requests through Django's test client in this process. Against an
+    in-memory SQLite database the requests take turns.
+    """
+
+    def __init__(self, host='127.0.0.1'):
+        # Use a host in ALLOWED_HOSTS, as the test runner's 'testserver' isn't
+        self.client = Client(HTTP_HOST=host)
+
+    def request(self, method, path, headers=None):
+        """Return the status and body of a request."""
+        headers = {f"HTTP_{name.upper().replace('-', '_')}": value
+                   for name, value in (headers or {}).items()}
+        send = getattr(self.client, method.lower())
+        if _in_memory_db():
+            with _memory_db_lock:
+                response = send(path, **headers)
+        else:
+            response = send(path, **headers)
+        return response.status_code, response.content
+
+    def close(self):
+        connections.close_all()
+
+
+class HTTPTransport:
+    """Sends requests to a running server, keeping cookies like a browser."""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect
+        )
+
+    def request(self, method, path, headers=None):
+        """Return the status and body of a request."""
+        headers = dict(headers or {})
+        if method == 'POST':
+            token = next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+            headers['X-CSRFToken'] = token
+            headers['Referer'] = self.base_url + '/'
+        request = urllib.request.Request(self.base_url + path, method=method, headers=headers,
+                                         data=b'' if method == 'POST' else None)
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as error:
+            return error.code, error.read()
+
+    def close(self):
+        pass
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Report redirects instead of following them, like the test client."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def percentile(sorted_values, q):
+    """Return the nearest-rank q-th percentile of sorted values."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class LoadStats:
+    """Latencies and errors per endpoint, shared by the virtual players."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.rounds = 0
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, error=False):
+        """Record one request."""
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            if error:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def finish_round(self):
+        """Count a completed round."""
+        with self._lock:
+            self.rounds += 1
+
+    def summary(self, elapsed):
+        """Return requests, throughput and latency percentiles in ms per endpoint."""
+        endpoints = {}
+        total = 0
+        for endpoint, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            total += len(values)
+            endpoints[endpoint] = {
+                'requests': len(values),
+                'errors': self.errors.get(endpoint, 0),
+                'per_second': len(values) / elapsed if elapsed else None,
+                'mean_ms': sum(values) / len(values) * 1000,
+                'p50_ms': percentile(values, 50) * 1000,
+                'p95_ms': percentile(values, 95) * 1000,
+                'p99_ms': percentile(values, 99) * 1000,
+            }
+        return {
+            'seconds': elapsed,
+            'rounds': self.rounds,
+            'requests': total,
+            'requests_per_second': total / elapsed if elapsed else None,
+            'errors': sum(self.errors.values()),
+            'endpoints': endpoints,
+        }
+
+
+class VirtualPlayer:
+    """Plays rounds through a transport, recording each request."""
+
+    def __init__(self, transport, stats):
+        self.transport = transport
+        self.stats = stats
+        self.paths = {name: reverse(name) for name in ENDPOINTS}
+        self.state = None
+
+    def _request(self, endpoint, method, headers=None):
+        began = time.perf_counter()
+        status, body = self.transport.request(method, self.paths[endpoint], headers)
+        self.stats.record(endpoint, time.perf_counter() - began, status >= 400 and status != 409)
+        return status, body
+
+    def _load_page(self):
+        status, body = self._request('index', 'GET')
+        match = STATE_SCRIPT.search(body.decode()) if status == 200 else None
+        self.state = json.loads(match.group(1)) if match else None
+
+    def _act(self, action):
+        status, body = self._request(action, 'POST', {'X-Game-Version': str(self.state['version'])})
+        data = json.loads(body) if body else {}
+        if status == 409:
+            self.state = data.get('state')
+        elif status != 200:
+            self.state = None
+        elif 'changes' in data:
+            self.state = apply_delta(self.state, data['changes'])
+        else:
+            self.state = data
+
+    def play_round(self, max_actions=10):
+        """Start a game and play it to the end, following the hints."""
+        self._request('new_game', 'POST')
+        self._load_page()
+        for _ in range(max_actions):
+            if self.state is None or self.state['game_over']:
+                break
+            action = self.state.get('hint') or 'stand'
+            if action == 'split' and not self.state['can_split']:
+                action = 'hit'
+            self._act(action)
+        self.stats.finish_round()
+
+    def run(self, rounds=None, deadline=None):
+        """Play until rounds are played or the deadline passes."""
+        played = 0
+        try:
+            # Arrive like a browser: the page redirects to a new game
+            self._load_page()
+            if self.state is None:
+                self._request('new_game', 'GET')
+                self._load_page()
+            while (rounds is None or played < rounds) and (deadline is None or time.monotonic() < deadline):
+                self.play_round()
+                played += 1
+        finally:
+            self.transport.close()
+
+
+def run_load(transport_factory, users, rounds=None, duration=None):
+    """
+    Run users virtual players at once, each playing rounds rounds or for
+    duration seconds, and return the LoadStats summary.
+    """
+    stats = LoadStats()
+    deadline = time.monotonic() + duration if duration else None
+    players = [VirtualPlayer(transport_factory(), stats) for _ in range(users)]
+    threads = [threading.Thread(target=player.run, args=(rounds, deadline)) for player in players]
+
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats.summary(time.perf_counter() - began)
@@ -0,0 +1,58 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from game.game_logic.benchmarks import (
+    BENCHMARKS, DEFAULT_THRESHOLD, run_benchmarks, load_baselines, write_baselines, regressions
+)
+
+
+class Command(BaseCommand):
+    help = "Benchmark the game logic hot paths and compare them with the stored baselines."
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', metavar='benchmark',
+                            help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per benchmark")
+        parser.add_argument('--min-time', type=float, default=0.2,
+                            help="Seconds each timed run should take")
+        parser.add_argument('--save', action='store_true', help="Store the results as the baselines")
+        parser.add_argument('--check', action='store_true',
+                            help="Fail if a benchmark is slower than its baseline by the threshold")
+        parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help="Allowed slowdown for --check, e.g. 0.25 for 25%%")
+        parser.add_argument('--json', action='store_true', help="Print the results as JSON")
+
+    def handle(self, *args, **options):
+        unknown = set(options['names']) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+        report = run_benchmarks(options['names'], options['repeat'], options['min_time'])
+        baselines = load_baselines()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.stdout.write(f"Calibration: {report['calibration'] * 1e6:.2f} us")
+            for name, result in report['results'].items():
+                line = f"  {name:<26}{result['seconds'] * 1e6:>10.2f} us"
+                baseline = baselines and baselines['results'].get(name)
+                if baseline:
+                    change = result['relative'] / baseline['relative'] - 1
+                    line += f"  {change:+8.1%} vs baseline"
+                self.stdout.write(line)
+
+        if options['save']:
+            if options['names'] and baselines:
+                baselines['results'].update(report['results'])
+                report = {'calibration': report['calibration'], 'results': baselines['results']}
+            write_baselines(report)
+            self.stdout.write("Baselines saved")
+
+        if options['check']:
+            if not baselines:
+                raise CommandError("No baselines stored; run with --save first")
+            slower = regressions(report, baselines, options['threshold'])
+            if slower:
+                details = ', '.join(f"{name} {slowdown:+.1%}" for name, slowdown in slower.items())
+                raise CommandError(f"Slower than baseline: {details}")
+            self.stdout.write("No regressions")
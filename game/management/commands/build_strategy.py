@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from game.game_logic.constants import DEFAULT_NUM_DECKS
+from game.game_logic.strategy import build_strategy_table, write_strategy_table, TABLE_PATH
+
+
+class Command(BaseCommand):
+    help = "Regenerate the basic strategy table from the game rules."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--decks', type=int, default=DEFAULT_NUM_DECKS)
+        parser.add_argument('--output', default=str(TABLE_PATH))
+
+    def handle(self, *args, **options):
+        table = build_strategy_table(options['decks'])
+        write_strategy_table(table, options['output'])
+        self.stdout.write(f"Wrote {options['decks']}-deck strategy table to {options['output']}")
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from game.game_store import get_game_store
+from game.history import get_history_writer
+from game.loadtest import ClientTransport, HTTPTransport, run_load
+from game.models import HandHistory, SavedGame
+
+
+class Command(BaseCommand):
+    help = ("Play concurrent game sessions against the views and report throughput, "
+            "latency per endpoint and session table growth.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=8, help="Concurrent virtual players")
+        parser.add_argument('--rounds', type=int, help="Rounds per player")
+        parser.add_argument('--duration', type=float, help="Seconds to run (default: 10 without --rounds)")
+        parser.add_argument('--base-url', help="Load a running server instead of playing in this process")
+        parser.add_argument('--json', action='store_true', help="Print the result as JSON")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError("--users must be at least 1")
+        rounds = options['rounds']
+        duration = options['duration'] or (None if rounds else 10.0)
+
+        if options['base_url']:
+            # Counts come from this project's database, which is the
+            # server's own when it runs locally with the same settings
+            report = self.measure(lambda: HTTPTransport(options['base_url']),
+                                  options['users'], rounds, duration)
+        else:
+            report = self.run_in_process(options['users'], rounds, duration)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.write_report(report)
+
+    def run_in_process(self, users, rounds, duration):
+        """Play through the test client against a throwaway copy of the database."""
+        old_name = connection.settings_dict['NAME']
+        temp_dir = None
+        if connection.vendor == 'sqlite':
+            # A file rather than the in-memory test database, so threads share it
+            temp_dir = tempfile.TemporaryDirectory()
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(
+                temp_dir.name, 'loadtest.sqlite3'
+            )
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            return self.measure(ClientTransport, users, rounds, duration)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if temp_dir:
+                temp_dir.cleanup()
+
+    def measure(self, transport_factory, users, rounds, duration):
+        """Run the load and add the database growth it caused."""
+        sessions, games = Session.objects.count(), SavedGame.objects.count()
+        hands = HandHistory.objects.count()
+        report = run_load(transport_factory, users, rounds, duration)
+        get_game_store().flush()
+        get_history_writer().shutdown()
+        report['database'] = {
+            'vendor': connection.vendor,
+            'new_sessions': Session.objects.count() - sessions,
+            'new_saved_games': SavedGame.objects.count() - games,
+            'new_hand_histories': HandHistory.objects.count() - hands,
+        }
+        return report
+
+    def write_report(self, report):
+        self.stdout.write(f"{report['rounds']:,} rounds, {report['requests']:,} requests in "
+                          f"{report['seconds']:.1f}s ({report['requests_per_second']:,.0f} req/s), "
+                          f"{report['errors']} errors")
+        self.stdout.write(f"  {'endpoint':<10}{'requests':>10}{'req/s':>9}{'mean':>9}"
+                          f"{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}")
+        for name, stats in report['endpoints'].items():
+            self.stdout.write(f"  {name:<10}{stats['requests']:>10,}{stats['per_second']:>9,.0f}"
+                              f"{stats['mean_ms']:>8.1f}ms{stats['p50_ms']:>7.1f}ms"
+                              f"{stats['p95_ms']:>7.1f}ms{stats['p99_ms']:>7.1f}ms{stats['errors']:>8}")
+        database = report['database']
+        self.stdout.write(f"Database ({database['vendor']}): {database['new_sessions']:,} new sessions, "
+                          f"{database['new_saved_games']:,} new saved games, "
+                          f"{database['new_hand_histories']:,} new hand histories")
@@ -0,0 +1,46 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from game.game_store import get_game_store
+from game.replay import replay_game, recorded_game_ids
+
+
+class Command(BaseCommand):
+    help = ("Replay stored games through the game logic, checking the cards dealt and "
+            "the recorded results of every round.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('game_ids', nargs='*', help="Games to replay")
+        parser.add_argument('--all', action='store_true', help="Replay every game with stored events")
+        parser.add_argument('--json', action='store_true', help="Print the rounds as JSON")
+
+    def handle(self, *args, **options):
+        # Replay what this process still has queued too
+        get_game_store().flush()
+        game_ids = options['game_ids']
+        if options['all']:
+            game_ids = recorded_game_ids()
+        elif not game_ids:
+            raise CommandError("Give game ids to replay or --all")
+
+        rounds = []
+        for game_id in game_ids:
+            replayed = replay_game(game_id)
+            if not replayed and not options['all']:
+                raise CommandError(f"No stored events for game {game_id}")
+            rounds.extend(replayed)
+
+        if options['json']:
+            self.stdout.write(json.dumps([replay.to_dict() for replay in rounds], indent=2))
+        else:
+            for replay in rounds:
+                status = 'ok' if replay.ok else 'MISMATCH'
+                self.stdout.write(f"{replay.game_id} v{replay.dealt_version}-{replay.version} "
+                                  f"{replay.actions or '-':<8}{replay.result or 'in play':<18}{status}")
+                for problem in replay.problems:
+                    self.stdout.write(f"    {problem}")
+
+        failed = sum(not replay.ok for replay in rounds)
+        if failed:
+            raise CommandError(f"{failed} of {len(rounds)} rounds did not replay")
+        if not options['json']:
+            self.stdout.write(f"{len(rounds)} rounds replayed")
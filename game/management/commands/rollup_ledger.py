@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from game import bankroll
+
+
+class Command(BaseCommand):
+    help = ("Snapshot account balances from the ledger entries since the last rollup. "
+            "Run it periodically (e.g. from cron) so ledger balances stay cheap to read.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delay', type=float, default=None,
+                            help="Leave entries newer than this many seconds for the next "
+                                 "rollup (default: the ROLLUP_DELAY setting)")
+        parser.add_argument('--verify', action='store_true',
+                            help="Check every account's balance against its ledger afterwards")
+
+    def handle(self, *args, **options):
+        written = bankroll.rollup(options['delay'])
+        self.stdout.write(f"{written} balance snapshots written")
+        if not options['verify']:
+            return
+
+        mismatched = bankroll.mismatched_accounts()
+        for account_id, balance, ledger in mismatched:
+            self.stdout.write(f"Account {account_id}: balance {balance}, ledger {ledger}")
+        if mismatched:
+            raise CommandError(f"{len(mismatched)} accounts don't match their ledger")
+        self.stdout.write("Every balance matches its ledger")
@@ -0,0 +1,79 @@
+import json
+import os
+import secrets
+import time
+from django.core.management.base import BaseCommand, CommandError
+from game.game_logic.constants import DEFAULT_NUM_DECKS, DEFAULT_PENETRATION
+from game.game_logic.simulation import simulate_parallel, dealer_strategy, Rules, CHUNK_HANDS
+from game.game_logic.strategy import basic_strategy
+
+
+STRATEGIES = {
+    'basic': basic_strategy,
+    'dealer': dealer_strategy,
+}
+
+SUFFIXES = {'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}
+
+
+def parse_count(value):
+    """Parse a hand count such as 500000, 500K or 10M."""
+    value = value.strip().upper()
+    multiplier = 1
+    if value and value[-1] in SUFFIXES:
+        multiplier = SUFFIXES[value[-1]]
+        value = value[:-1]
+    try:
+        count = int(float(value) * multiplier)
+    except ValueError:
+        raise CommandError(f"Invalid hand count: {value}")
+    if count < 1:
+        raise CommandError("Hand count must be positive")
+    return count
+
+
+class Command(BaseCommand):
+    help = "Simulate rounds of Blackjack with the game rules across worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hands', default='100K', help="Rounds to play, e.g. 500K or 10M")
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help="Worker processes (default: CPU count)")
+        parser.add_argument('--seed', type=int, help="Master seed; a random one is reported if omitted")
+        parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='basic')
+        parser.add_argument('--decks', type=int, default=DEFAULT_NUM_DECKS)
+        parser.add_argument('--penetration', type=float, default=DEFAULT_PENETRATION)
+        parser.add_argument('--blackjack-payout', type=float, default=1.5)
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_HANDS,
+                            help="Rounds per chunk; results depend on it, not on --workers")
+        parser.add_argument('--json', action='store_true', help="Print the result as JSON")
+
+    def handle(self, *args, **options):
+        n_hands = parse_count(options['hands'])
+        seed = options['seed'] if options['seed'] is not None else secrets.randbits(64)
+        try:
+            rules = Rules(options['decks'], options['penetration'], options['blackjack_payout'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        start = time.perf_counter()
+        result = simulate_parallel(
+            n_hands, STRATEGIES[options['strategy']], rules, seed,
+            workers=options['workers'], chunk_size=options['chunk_size']
+        )
+        elapsed = time.perf_counter() - start
+
+        report = result.to_dict()
+        report['seed'] = seed
+        report['seconds'] = round(elapsed, 3)
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"Hands: {result.hands:,} in {elapsed:.1f}s "
+                          f"({result.hands / elapsed:,.0f} hands/s)")
+        self.stdout.write(f"Seed: {seed}")
+        for outcome, count in result.outcomes.most_common():
+            self.stdout.write(f"  {outcome:<18}{count:>12,}  {count / result.hands:8.3%}")
+        self.stdout.write(f"Net units: {result.net_units:,.1f}")
+        self.stdout.write(f"House edge: {result.house_edge:.3%}")
@@ -0,0 +1,147 @@
+import cProfile
+import pstats
+import random
+import threading
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.deprecation import MiddlewareMixin
+from time import perf_counter
+from . import profiling
+from .game_logic import timing
+
+
+# Timings of every request served by this process, by URL name
+STATS = timing.TimingStats()
+
+
+class TimingMiddleware:
+    """
+    Collect phase timings and payload sizes for each request, report them
+    in a Server-Timing header and add them to STATS. Place it first so the
+    total covers the other middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token = timing.start()
+        began = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            timing.stop(token)
+        return self.finish(request, response, timings, perf_counter() - began)
+
+    async def __acall__(self, request):
+        timings, token = timing.start()
+        began = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timing.stop(token)
+        return self.finish(request, response, timings, perf_counter() - began)
+
+    def finish(self, request, response, timings, total):
+        """Add the total, record the request and set Server-Timing."""
+        timings.add('total', total)
+        if not response.streaming:
+            timings.size('response', len(response.content))
+        match = request.resolver_match
+        if match is not None and match.url_name:
+            STATS.record(match.url_name, timings)
+        response['Server-Timing'] = server_timing(timings)
+        return response
+
+
+def server_timing(timings):
+    """Format timings as a Server-Timing header value."""
+    metrics = [f'{phase};dur={seconds * 1000:.3f}' for phase, seconds in timings.phases.items()]
+    metrics += [f'{name}-bytes;desc="{nbytes}"' for name, nbytes in timings.sizes.items()]
+    return ', '.join(metrics)
+
+
+# Views the sampling profiler may profile, by URL name
+PROFILED_VIEWS = {'index', 'new_game', 'hit', 'stand', 'split', 'game_state', 'hint'}
+
+
+class SamplingProfilerMiddleware(MiddlewareMixin):
+    """
+    Profile the sample rate's fraction of game view calls with cProfile
+    while a staff member has profiling turned on (see game.profiling).
+    Place it last so the other middleware's process_view runs first. When
+    profiling is off a request costs one clock comparison, and with
+    BLACKJACK_PROFILING disabled the middleware is not loaded at all.
+
+    Under ASGI process_view is a coroutine, so Django doesn't run it in the
+    sync thread for every request; only a sampled sync view moves there to
+    be profiled. Async views are never profiled.
+    """
+
+    def __init__(self, get_response):
+        if not settings.BLACKJACK_PROFILING:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.rate = 0.0
+        self._next_check = 0.0
+        self._stats = None
+        self._lock = threading.Lock()
+        if iscoroutinefunction(self.get_response):
+            self.process_view = self.aprocess_view
+
+    def sampled(self, request, view_func):
+        """Check whether to profile a view call, rereading the rate when it is due."""
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + profiling.CHECK_INTERVAL
+            self.rate = profiling.get_rate()
+        if not self.rate or random.random() >= self.rate:
+            return False
+        return (request.resolver_match.url_name in PROFILED_VIEWS
+                and not iscoroutinefunction(view_func))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.sampled(request, view_func):
+            return None
+        return self.profile(request, view_func, view_args, view_kwargs)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if iscoroutinefunction(view_func) or not self.sampled(request, view_func):
+            return None
+        return await sync_to_async(self.profile)(request, view_func, view_args, view_kwargs)
+
+    def profile(self, request, view_func, view_args, view_kwargs):
+        """Call a sync view under cProfile and add its profile to the totals."""
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already running
+            return None
+        try:
+            response = view_func(request, *view_args, **view_kwargs)
+        finally:
+            profiler.disable()
+        self.add(profiler)
+        return response
+
+    def add(self, profiler):
+        """Add a request's profile to this worker's totals and dump them."""
+        with self._lock:
+            profiler.create_stats()
+            if self._stats is None or not profiling.dump_path().exists():
+                # Start over after the dumps were cleared
+                self._stats = pstats.Stats(profiler)
+            else:
+                self._stats.add(profiler)
+            profiling.profile_dir().mkdir(parents=True, exist_ok=True)
+            self._stats.dump_stats(profiling.dump_path())
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-17 23:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HandHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game_id', models.CharField(db_index=True, max_length=32)),
+                ('round', models.PositiveIntegerField(help_text='Game version when the round finished')),
+                ('player_cards', models.BinaryField(max_length=32)),
+                ('dealer_cards', models.BinaryField(max_length=32)),
+                ('split_cards', models.BinaryField(max_length=32, null=True)),
+                ('actions', models.CharField(blank=True, max_length=64)),
+                ('result', models.CharField(max_length=20)),
+                ('started_at', models.DateTimeField(null=True)),
+                ('finished_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'hand histories',
+            },
+        ),
+    ]
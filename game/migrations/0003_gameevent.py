@@ -0,0 +1,29 @@
+# Generated by Django 4.2.27 on 2026-10-17 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0002_handhistory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game_id', models.CharField(max_length=32)),
+                ('version', models.PositiveIntegerField()),
+                ('kind', models.CharField(choices=[('D', 'deal'), ('H', 'hit'), ('S', 'stand'), ('P', 'split'), ('R', 'dealer draw')], max_length=1)),
+                ('cards', models.BinaryField(max_length=32)),
+                ('snapshot', models.TextField(null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='gameevent',
+            constraint=models.UniqueConstraint(fields=('game_id', 'version', 'kind'), name='unique_game_event'),
+        ),
+    ]
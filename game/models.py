@@ -0,0 +1,142 @@
+from django.db import models
+
+
+class SavedGame(models.Model):
+    """Durable copy of a game, written behind the game state cache."""
+    game_id = models.CharField(max_length=32, unique=True)
+    state = models.TextField()
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.game_id} v{self.version}"
+
+
+class HandHistory(models.Model):
+    """
+    A finished round. Cards are stored as one Card.code byte each (see
+    codec.encode_cards) and actions as ACTION_CODES letters in order.
+    """
+    game_id = models.CharField(max_length=32, db_index=True)
+    round = models.PositiveIntegerField(help_text="Game version when the round finished")
+    player_cards = models.BinaryField(max_length=32)
+    dealer_cards = models.BinaryField(max_length=32)
+    split_cards = models.BinaryField(max_length=32, null=True)
+    actions = models.CharField(max_length=64, blank=True)
+    result = models.CharField(max_length=20)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = 'hand histories'
+
+    def __str__(self):
+        return f"{self.game_id} round {self.round}: {self.result}"
+
+
+class GameEvent(models.Model):
+    """
+    One event in a game's append-only log (see game_logic/events.py). The
+    events of a game version replay from the game at the previous version;
+    a deal also keeps the encoded game just after it, where replays start.
+    """
+    KIND_CHOICES = [
+        ('D', 'deal'),
+        ('H', 'hit'),
+        ('S', 'stand'),
+        ('P', 'split'),
+        ('R', 'dealer draw'),
+    ]
+
+    game_id = models.CharField(max_length=32)
+    version = models.PositiveIntegerField()
+    kind = models.CharField(max_length=1, choices=KIND_CHOICES)
+    cards = models.BinaryField(max_length=32)
+    snapshot = models.TextField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['game_id', 'version', 'kind'],
+                                    name='unique_game_event'),
+        ]
+
+    def __str__(self):
+        return f"{self.game_id} v{self.version} {self.get_kind_display()}"
+
+
+class Account(models.Model):
+    """
+    A player's chips. The balance only changes through a single conditional
+    UPDATE posted with its LedgerEntry (see bankroll.py), never by saving a
+    balance read earlier.
+    """
+    balance = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(check=models.Q(balance__gte=0), name='account_balance_gte_0'),
+        ]
+
+    def __str__(self):
+        return f"Account {self.pk}: {self.balance}"
+
+
+class LedgerEntry(models.Model):
+    """
+    One change to an account's balance, keyed by the round it belongs to.
+    An account's entries add up to its balance, and each round posts each
+    kind of entry at most once, so repeating a post changes nothing.
+    """
+    DEPOSIT = 'deposit'
+    BET = 'bet'
+    SPLIT = 'split'
+    PAYOUT = 'payout'
+    KIND_CHOICES = [
+        (DEPOSIT, 'deposit'),
+        (BET, 'bet'),
+        (SPLIT, 'split'),
+        (PAYOUT, 'payout'),
+    ]
+
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='entries')
+    round_id = models.CharField(max_length=48,
+                                help_text="Game id and the version the round was dealt at")
+    kind = models.CharField(max_length=8, choices=KIND_CHOICES)
+    amount = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name_plural = 'ledger entries'
+        constraints = [
+            models.UniqueConstraint(fields=['round_id', 'kind'], name='unique_round_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['account', 'id'], name='ledger_account_id'),
+        ]
+
+    def __str__(self):
+        return f"{self.round_id} {self.kind} {self.amount:+d}"
+
+
+class BalanceSnapshot(models.Model):
+    """
+    An account's balance after every ledger entry up to last_entry, written
+    by the periodic rollup so the ledger balance never sums more than the
+    entries since.
+    """
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='snapshots')
+    last_entry = models.PositiveBigIntegerField(db_index=True,
+                                                help_text="Id of the last LedgerEntry included")
+    balance = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'last_entry'], name='unique_balance_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} @{self.last_entry}: {self.balance}"
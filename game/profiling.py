@@ -0,0 +1,120 @@
+"""
+Sampled cProfile profiles of game views in live workers.
+
+A staff member sets a sample rate, which is written to a file in
+BLACKJACK_PROFILE_DIR so every worker on the node picks it up within
+CHECK_INTERVAL seconds. Each worker adds the profiles of its sampled
+requests together and dumps them to <pid>.prof in the same directory; a
+download merges the dumps of all workers, as pstats data or as collapsed
+stacks for flamegraph tools.
+"""
+import os
+import pstats
+from pathlib import Path
+from django.conf import settings
+
+
+RATE_FILE = 'rate'
+
+# Seconds between checks of the sample rate by each worker
+CHECK_INTERVAL = 5.0
+
+
+def profile_dir():
+    """Return the directory for the sample rate and profile dumps."""
+    return Path(settings.BLACKJACK_PROFILE_DIR)
+
+
+def get_rate():
+    """Return the fraction of requests to profile; 0 when profiling is off."""
+    try:
+        return float((profile_dir() / RATE_FILE).read_text())
+    except (OSError, ValueError):
+        return 0.0
+
+
+def set_rate(rate):
+    """Set the fraction of requests to profile; 0 turns profiling off."""
+    if not 0 <= rate <= 1:
+        raise ValueError("Sample rate must be between 0 and 1")
+    directory = profile_dir()
+    if not rate:
+        (directory / RATE_FILE).unlink(missing_ok=True)
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    temp = directory / f"{RATE_FILE}.{os.getpid()}"
+    temp.write_text(str(rate))
+    os.replace(temp, directory / RATE_FILE)
+
+
+def dump_path():
+    """Return the dump file of this worker."""
+    return profile_dir() / f"{os.getpid()}.prof"
+
+
+def dump_paths():
+    """Return the dump files of all workers."""
+    directory = profile_dir()
+    return sorted(directory.glob('*.prof')) if directory.is_dir() else []
+
+
+def clear_profiles():
+    """Delete the dumps of all workers."""
+    for path in dump_paths():
+        path.unlink(missing_ok=True)
+
+
+def merged_stats():
+    """Return pstats.Stats with every worker's dump, or None without any."""
+    paths = dump_paths()
+    if not paths:
+        return None
+    stats = pstats.Stats(str(paths[0]))
+    for path in paths[1:]:
+        stats.add(str(path))
+    return stats
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapsed_stacks(stats):
+    """
+    Return stats as collapsed stacks ("root;caller;function microseconds"
+    per line) for flamegraph tools. pstats only keeps caller/callee pairs,
+    so time in a function called from several places is split between the
+    paths in proportion to the time each caller spent in it.
+    """
+    children = {}
+    roots = []
+    for func, (cc, nc, tt, ct, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+
+    lines = {}
+
+    def walk(func, path, share):
+        cc, nc, tt, ct, callers = stats.stats[func]
+        path = path + (_label(func),)
+        micros = int(tt * share * 1e6)
+        if micros:
+            key = ';'.join(path)
+            lines[key] = lines.get(key, 0) + micros
+        for child, edge_time in children.get(func, ()):
+            child_total = stats.stats[child][3]
+            if _label(child) in path or not child_total:
+                continue
+            child_share = share * min(edge_time / child_total, 1.0)
+            # Leave out paths too small to show, which also bounds the walk
+            if child_total * child_share >= 1e-6:
+                walk(child, path, child_share)
+
+    for root in roots:
+        walk(root, (), 1.0)
+    return ''.join(f"{stack} {micros}\n" for stack, micros in sorted(lines.items()))
@@ -0,0 +1,121 @@
+"""
+Publish/subscribe for game state updates.
+
+Views publish each saved game state on a channel named by the game id, and
+the event stream view subscribes to it. The broker class is set by
+BLACKJACK_BROKER; the default InProcessBroker delivers to subscribers in
+the same process, which covers a single ASGI node. A broker for several
+nodes needs the same subscribe()/publish() interface.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+DEFAULT_BROKER = 'game.pubsub.InProcessBroker'
+
+# Messages a slow subscriber can fall behind before the oldest are dropped
+MAX_QUEUED = 16
+
+
+def state_event(state):
+    """Format a game state as a server-sent event."""
+    return f"id: {state['version']}\nevent: state\ndata: {json.dumps(state)}\n\n"
+
+
+class Subscription:
+    """Messages published on a channel since subscribing, read asynchronously."""
+
+    def __init__(self, broker, channel, max_queued=MAX_QUEUED):
+        self.broker = broker
+        self.channel = channel
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(max_queued)
+
+    def deliver(self, message):
+        """Queue a message; safe to call from any thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The subscriber's event loop has closed
+            self.close()
+
+    def _put(self, message):
+        if self._queue.full():
+            # Later states replace earlier ones, so drop the oldest
+            self._queue.get_nowait()
+        self._queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        """Return the next message, or None if none arrives within timeout."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        """Stop receiving messages."""
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Delivers published messages to subscribers in this process."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """Return a Subscription to a channel; call from a running event loop."""
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a subscription."""
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, channel, message):
+        """Send a message to every subscriber of a channel."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+
+    def subscriber_count(self, channel):
+        """Return the number of subscribers to a channel."""
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Return the process-wide broker built from settings."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(getattr(settings, 'BLACKJACK_BROKER', DEFAULT_BROKER))()
+    return _broker
+
+
+@receiver(setting_changed)
+def _reset_broker(setting, **kwargs):
+    """Rebuild the broker when tests change it."""
+    global _broker
+    if setting == 'BLACKJACK_BROKER':
+        _broker = None
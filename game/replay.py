@@ -0,0 +1,106 @@
+"""
+Replay of stored games for audits and disputed hands.
+
+Each round is re-run through game_logic from the snapshot stored with its
+deal, checking that every action deals the recorded cards, and the final
+state is checked against the round's HandHistory result and the latest
+SavedGame snapshot when they cover the same version.
+"""
+from .game_logic import events
+from .game_store import decode_game, event_order, row_events
+from .models import GameEvent, HandHistory, SavedGame
+
+
+class RoundReplay:
+    """The outcome of replaying one round of a game."""
+
+    def __init__(self, game_id, version):
+        self.game_id = game_id
+        self.dealt_version = version
+        self.version = version
+        self.actions = ''
+        self.result = None
+        self.recorded_result = None
+        self.problems = []
+
+    @property
+    def ok(self):
+        return not self.problems
+
+    def to_dict(self):
+        return {
+            'game_id': self.game_id,
+            'dealt_version': self.dealt_version,
+            'version': self.version,
+            'actions': self.actions,
+            'result': self.result,
+            'recorded_result': self.recorded_result,
+            'problems': self.problems,
+        }
+
+
+def _start_round(game_id, version, rows):
+    """Decode the snapshot stored with a deal and check it holds the dealt cards."""
+    replay = RoundReplay(game_id, version)
+    game = decode_game(rows[0].snapshot)
+    dealt = events.Event(events.DEAL, (game.player_hand.cards[0], game.dealer_hand.cards[0],
+                                       game.player_hand.cards[1], game.dealer_hand.cards[1]))
+    if game.version != version or row_events(rows) != [dealt]:
+        replay.problems.append(f"Snapshot at v{version} doesn't match its deal")
+    return replay, game
+
+
+def _finish_round(replay, game, saved):
+    """Compare a replayed round with the recorded result and latest snapshot."""
+    replay.version = game.version
+    replay.actions = game.actions
+    replay.result = game.result
+    if not replay.ok:
+        return replay
+    if game.game_over:
+        replay.recorded_result = (HandHistory.objects
+                                  .filter(game_id=replay.game_id, round=game.version)
+                                  .values_list('result', flat=True).first())
+        if replay.recorded_result is not None and replay.recorded_result != game.result:
+            replay.problems.append(
+                f"Recorded result {replay.recorded_result}, replayed {game.result}")
+    if saved is not None and saved.version == game.version:
+        if decode_game(saved.state).get_game_state() != game.get_game_state():
+            replay.problems.append(f"Saved game at v{game.version} differs from the replay")
+    return replay
+
+
+def replay_game(game_id):
+    """Replay every stored round of a game and return a RoundReplay for each."""
+    by_version = {}
+    for row in sorted(GameEvent.objects.filter(game_id=game_id), key=event_order):
+        by_version.setdefault(row.version, []).append(row)
+    saved = SavedGame.objects.filter(game_id=game_id).first()
+
+    rounds = []
+    replay = game = None
+    for version in sorted(by_version):
+        rows = by_version[version]
+        if rows[0].kind == events.DEAL:
+            if replay is not None:
+                rounds.append(_finish_round(replay, game, saved))
+            replay, game = _start_round(game_id, version, rows)
+            continue
+        if replay is None or not replay.ok:
+            # Nothing to replay from until the next deal
+            continue
+        if version != game.version + 1:
+            replay.problems.append(f"Missing events for v{game.version + 1}")
+            continue
+        try:
+            events.replay(game, row_events(rows))
+        except events.ReplayError as exc:
+            replay.problems.append(f"v{version}: {exc}")
+    if replay is not None:
+        rounds.append(_finish_round(replay, game, saved))
+    return rounds
+
+
+def recorded_game_ids():
+    """Return the ids of every game with stored events."""
+    return list(GameEvent.objects.order_by('game_id').values_list('game_id', flat=True).distinct())
@@ -0,0 +1,5 @@
+from game import async_views
+from game.urls import game_patterns
+
+
+urlpatterns = game_patterns(async_views)
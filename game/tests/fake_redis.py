@@ -0,0 +1,163 @@
+"""
+An in-process stand-in for the parts of redis-py the Redis cache uses.
+
+Connections to the same URL share one server, so two caches configured with
+the game.cache.RedisCache backend and the same LOCATION behave like two web
+workers talking to one Redis. Values are kept as bytes, and keys expire.
+"""
+import threading
+import time
+
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def reset():
+    """Forget every server's keys, keeping the servers open connections use."""
+    with _servers_lock:
+        servers = list(_servers.values())
+    for server in servers:
+        with server.lock:
+            server.data.clear()
+            server.expires.clear()
+
+
+class Server:
+    """Keys, values and expiry times of one fake Redis server."""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.lock = threading.Lock()
+
+    def live(self, key):
+        """Return whether a key exists, dropping it if it has expired."""
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+
+class ConnectionPool:
+    """A pool that only remembers which server it connects to."""
+
+    def __init__(self, server):
+        self.server = server
+
+    @classmethod
+    def from_url(cls, url, **options):
+        with _servers_lock:
+            server = _servers.setdefault(url, Server())
+        return cls(server)
+
+
+class connection:
+    """Namespace matching redis.connection."""
+
+    class DefaultParser:
+        pass
+
+
+def _encode(value):
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class Redis:
+    """Client for a fake server, with the commands the cache backend sends."""
+
+    def __init__(self, connection_pool):
+        self._server = connection_pool.server
+
+    def get(self, key):
+        server = self._server
+        with server.lock:
+            return server.data[key] if server.live(key) else None
+
+    def mget(self, keys):
+        server = self._server
+        with server.lock:
+            return [server.data[key] if server.live(key) else None for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        server = self._server
+        with server.lock:
+            if nx and server.live(key):
+                return None
+            server.data[key] = _encode(value)
+            server.expires.pop(key, None)
+            if ex is not None:
+                server.expires[key] = time.monotonic() + ex
+            return True
+
+    def mset(self, mapping):
+        for key, value in mapping.items():
+            self.set(key, value)
+        return True
+
+    def delete(self, *keys):
+        server = self._server
+        with server.lock:
+            deleted = sum(server.live(key) for key in keys)
+            for key in keys:
+                server.data.pop(key, None)
+                server.expires.pop(key, None)
+            return deleted
+
+    def exists(self, *keys):
+        server = self._server
+        with server.lock:
+            return sum(server.live(key) for key in keys)
+
+    def expire(self, key, seconds):
+        server = self._server
+        with server.lock:
+            if not server.live(key):
+                return False
+            server.expires[key] = time.monotonic() + seconds
+            return True
+
+    def persist(self, key):
+        server = self._server
+        with server.lock:
+            return server.live(key) and server.expires.pop(key, None) is not None
+
+    def incr(self, key, amount=1):
+        server = self._server
+        with server.lock:
+            value = int(server.data[key]) + amount if server.live(key) else amount
+            server.data[key] = _encode(value)
+            return value
+
+    def flushdb(self):
+        server = self._server
+        with server.lock:
+            server.data.clear()
+            server.expires.clear()
+        return True
+
+    def pipeline(self):
+        return Pipeline(self)
+
+
+class Pipeline:
+    """Commands queued on a client and run by execute()."""
+
+    def __init__(self, client):
+        self._client = client
+        self._commands = []
+
+    def __getattr__(self, name):
+        command = getattr(self._client, name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((command, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        commands, self._commands = self._commands, []
+        return [command(*args, **kwargs) for command, args, kwargs in commands]
@@ -0,0 +1,154 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.test import TestCase, AsyncClient, override_settings
+from django.urls import reverse
+from game import async_views
+from game.game_store import get_game_store
+from game.pubsub import get_broker
+
+
+@override_settings(ROOT_URLCONF='game.tests.async_urls', BLACKJACK_HISTORY={'ASYNC': False})
+class AsyncViewsTestCase(TestCase):
+    """Test cases for the async views."""
+
+    def setUp(self):
+        """Set up async test client."""
+        self.client = AsyncClient()
+
+    def tearDown(self):
+        """Write queued games while the test database still exists."""
+        get_game_store().flush()
+
+    async def start_playable_game(self):
+        """Start new games until one isn't decided by a natural."""
+        while True:
+            await self.client.post(reverse('new_game'))
+            state = (await self.client.get(reverse('game_state'))).json()
+            if not state['game_over']:
+                return state
+
+    def test_views_are_async(self):
+        """Test that the routed views are coroutine functions."""
+        for view in (async_views.index, async_views.hit, async_views.stand,
+                     async_views.split, async_views.game_state):
+            self.assertTrue(asyncio.iscoroutinefunction(view))
+
+    async def test_index_redirects_without_game(self):
+        """Test that index redirects to new_game when no game exists."""
+        response = await self.client.get(reverse('index'))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, reverse('new_game'))
+
+    async def test_index_displays_game(self):
+        """Test that index displays the game started by new_game."""
+        await self.client.post(reverse('new_game'))
+
+        response = await self.client.get(reverse('index'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('game_state', response.context)
+
+    async def test_stand_ends_game(self):
+        """Test that standing finishes the round."""
+        state = await self.start_playable_game()
+
+        response = await self.client.post(reverse('stand'))
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data['game_over'])
+        self.assertEqual(data['version'], state['version'] + 1)
+
+    async def test_hit_returns_delta(self):
+        """Test that hit responds with changes for the current version."""
+        state = await self.start_playable_game()
+
+        response = await self.client.post(reverse('hit'),
+                                           headers={'X-Game-Version': str(state['version'])})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['base_version'], state['version'])
+        self.assertEqual(len(data['changes']['player_hand']['append']), 1)
+
+    async def test_actions_reject_get(self):
+        """Test that actions only accept POST."""
+        response = await self.client.get(reverse('hit'))
+        self.assertEqual(response.status_code, 405)
+
+    async def test_hit_without_game(self):
+        """Test that hitting without a game returns error."""
+        response = await self.client.post(reverse('hit'))
+        self.assertEqual(response.status_code, 400)
+
+    async def test_conflicting_request_returns_current_state(self):
+        """Test that a request losing the race gets a 409 with the saved state."""
+        state = await self.start_playable_game()
+        store = get_game_store()
+        game_id = await sync_to_async(lambda: self.client.session['game_id'])()
+        # Another request already saved from this version
+        await store.cache.aadd(store._claim_key(game_id, state['version']), state['version'] + 1)
+
+        response = await self.client.post(reverse('stand'))
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['state']['version'], state['version'])
+
+    async def read_event(self, response):
+        """Read the next event from a streaming response."""
+        chunk = await anext(response.streaming_content)
+        chunk = chunk.decode()
+        self.assertTrue(chunk.startswith('id: '))
+        return json.loads(chunk.split('\n')[2][len('data: '):])
+
+    async def test_events_stream_current_then_new_states(self):
+        """Test that the event stream sends the state and then each change."""
+        state = await self.start_playable_game()
+
+        response = await self.client.get(reverse('game_events'))
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(await self.read_event(response), state)
+        await self.client.post(reverse('stand'))
+        changed = await self.read_event(response)
+        self.assertEqual(changed['version'], state['version'] + 1)
+        self.assertTrue(changed['game_over'])
+        response.close()
+
+    async def test_spectator_stream(self):
+        """Test that a spectator can watch a game by id."""
+        state = await self.start_playable_game()
+        game_id = await sync_to_async(lambda: self.client.session['game_id'])()
+
+        response = await AsyncClient().get(reverse('watch_game', args=[game_id]))
+
+        self.assertEqual(await self.read_event(response), state)
+        response.close()
+
+    async def test_events_without_game(self):
+        """Test that streaming without a game returns error."""
+        response = await self.client.get(reverse('game_events'))
+        self.assertEqual(response.status_code, 400)
+
+    async def test_stream_close_unsubscribes(self):
+        """Test that closing a stream removes its subscription."""
+        await self.start_playable_game()
+        game_id = await sync_to_async(lambda: self.client.session['game_id'])()
+        response = await self.client.get(reverse('game_events'))
+        await self.read_event(response)
+        self.assertEqual(get_broker().subscriber_count(game_id), 1)
+
+        response.close()
+
+        self.assertEqual(get_broker().subscriber_count(game_id), 0)
+
+    async def test_stream_ends_after_its_lifetime(self):
+        """Test that a stream nobody reads from ends and unsubscribes on its own."""
+        broker = get_broker()
+        stream = async_views.StateStream(broker.subscribe('abc'), {'version': 1}, lifetime=0.05)
+
+        events = [event async for event in stream]
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(broker.subscriber_count('abc'), 0)
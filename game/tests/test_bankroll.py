@@ -0,0 +1,262 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from game import bankroll
+from game.game_logic import events
+from game.game_logic.card import Card
+from game.game_logic.game import BlackjackGame
+from game.game_store import get_game_store
+from game.models import Account, BalanceSnapshot, LedgerEntry
+
+
+def split_game(bet):
+    """Return a game dealt a pair of eights against a dealer 17, with bet chips on it."""
+    game = BlackjackGame()
+    game.version = 1
+    game.bet = bet
+    game.player_hand.add_card(Card('Hearts', '8'))
+    game.player_hand.add_card(Card('Spades', '8'))
+    game.dealer_hand.add_card(Card('Diamonds', '10'))
+    game.dealer_hand.add_card(Card('Clubs', '7'))
+    game.deck.cards = [Card('Clubs', '2'), Card('Hearts', '3'), Card('Hearts', 'K')]
+    return game
+
+
+class LedgerTestCase(TestCase):
+    """Test cases for posting wagers to the ledger."""
+
+    def setUp(self):
+        self.account = bankroll.open_account()
+
+    def entries(self):
+        """Return the account's entries as (kind, amount) in order."""
+        return list(self.account.entries.order_by('id').values_list('kind', 'amount'))
+
+    def test_open_account_posts_deposit(self):
+        """Test that a new account's starting balance is its first entry."""
+        self.assertEqual(bankroll.balance(self.account.pk), 1000)
+        self.assertEqual(self.entries(), [('deposit', 1000)])
+
+    def test_post_is_one_conditional_update(self):
+        """Test that a post inserts its entry and moves the balance without reading it."""
+        with self.assertNumQueries(4):
+            # Savepoint, INSERT, UPDATE, release
+            self.assertTrue(bankroll.post(self.account.pk, 'abc:1', LedgerEntry.BET, -10))
+
+        self.assertEqual(bankroll.balance(self.account.pk), 990)
+
+    def test_post_is_idempotent(self):
+        """Test that posting the same kind of entry for a round again moves nothing."""
+        bankroll.post(self.account.pk, 'abc:1', LedgerEntry.PAYOUT, 20)
+
+        self.assertFalse(bankroll.post(self.account.pk, 'abc:1', LedgerEntry.PAYOUT, 20))
+        self.assertEqual(bankroll.balance(self.account.pk), 1020)
+        self.assertEqual(LedgerEntry.objects.filter(round_id='abc:1').count(), 1)
+
+    def test_debit_needs_funds(self):
+        """Test that a debit the balance can't cover posts nothing."""
+        with self.assertRaises(bankroll.InsufficientFunds):
+            bankroll.post(self.account.pk, 'abc:1', LedgerEntry.BET, -1001)
+
+        self.assertEqual(bankroll.balance(self.account.pk), 1000)
+        self.assertFalse(LedgerEntry.objects.filter(round_id='abc:1').exists())
+
+    def test_post_round_stakes_split_and_pays(self):
+        """Test that a split round posts the bet twice and pays both hands."""
+        game = split_game(10)
+        bankroll.post_round(self.account.pk, 'abc', game, [events.Event(events.DEAL)])
+        bankroll.post_round(self.account.pk, 'abc', game, events.play(game, events.SPLIT))
+        events.play(game, events.STAND)
+        bankroll.post_round(self.account.pk, 'abc', game, events.play(game, events.STAND))
+        # Saving the finished game again pays nothing more
+        bankroll.post_round(self.account.pk, 'abc', game)
+
+        self.assertEqual(game.result, 'win_and_lose')
+        self.assertEqual(self.entries(), [('deposit', 1000), ('bet', -10),
+                                          ('split', -10), ('payout', 20)])
+        self.assertEqual(set(LedgerEntry.objects.values_list('round_id', flat=True)),
+                         {f'account:{self.account.pk}', 'abc:1'})
+        self.assertEqual(bankroll.balance(self.account.pk), 1000)
+
+    def test_payout_needs_the_stake(self):
+        """Test that a round whose bet never posted is only paid with its stakes."""
+        game = split_game(10)
+        events.play(game, events.SPLIT)
+        events.play(game, events.STAND)
+        events.play(game, events.STAND)
+        Account.objects.filter(pk=self.account.pk).update(balance=15)
+
+        with self.assertLogs('game.bankroll', 'WARNING'):
+            bankroll.post_round(self.account.pk, 'abc', game)
+
+        self.assertEqual(self.entries(), [('deposit', 1000)])
+        self.assertEqual(bankroll.balance(self.account.pk), 15)
+
+        Account.objects.filter(pk=self.account.pk).update(balance=1000)
+        bankroll.post_round(self.account.pk, 'abc', game)
+        self.assertEqual(self.entries(), [('deposit', 1000), ('bet', -10),
+                                          ('split', -10), ('payout', 20)])
+
+    def test_rounds_without_bets_post_nothing(self):
+        """Test that a round dealt without a bet leaves the ledger alone."""
+        game = split_game(0)
+        bankroll.post_round(self.account.pk, 'abc', game, [events.Event(events.DEAL)])
+
+        self.assertEqual(len(self.entries()), 1)
+
+    def test_parse_bet(self):
+        """Test submitted bets, the default bet and bets out of range."""
+        self.assertEqual(bankroll.parse_bet('25', 1000), 25)
+        self.assertEqual(bankroll.parse_bet(None, 1000), 10)
+        self.assertEqual(bankroll.parse_bet('', 4), 4)
+        for value in ('-1', '501', 'ten'):
+            with self.assertRaises(ValueError):
+                bankroll.parse_bet(value, 1000)
+
+
+class RollupTestCase(TestCase):
+    """Test cases for rolling ledger entries up into balance snapshots."""
+
+    def setUp(self):
+        self.first = bankroll.open_account()
+        self.second = bankroll.open_account()
+
+    def test_rollup_snapshots_balances(self):
+        """Test that each account with new entries gets a snapshot of its balance."""
+        bankroll.post(self.first.pk, 'abc:1', LedgerEntry.BET, -10)
+
+        self.assertEqual(bankroll.rollup(delay=0), 2)
+
+        last = LedgerEntry.objects.latest('id').pk
+        self.assertEqual(dict(BalanceSnapshot.objects.values_list('account', 'balance')),
+                         {self.first.pk: 990, self.second.pk: 1000})
+        self.assertEqual(set(BalanceSnapshot.objects.values_list('last_entry', flat=True)), {last})
+        self.assertEqual(bankroll.rollup(delay=0), 0)
+
+    def test_rollup_builds_on_previous_snapshots(self):
+        """Test that a rollup adds only the entries since the last one."""
+        bankroll.rollup(delay=0)
+        bankroll.post(self.first.pk, 'abc:1', LedgerEntry.PAYOUT, 15)
+
+        self.assertEqual(bankroll.rollup(delay=0), 1)
+
+        latest = BalanceSnapshot.objects.filter(account=self.first).latest('last_entry')
+        self.assertEqual(latest.balance, 1015)
+        self.assertEqual(BalanceSnapshot.objects.count(), 3)
+
+    def test_rollup_leaves_recent_entries(self):
+        """Test that entries newer than the delay wait for the next rollup."""
+        self.assertEqual(bankroll.rollup(delay=60), 0)
+        self.assertFalse(BalanceSnapshot.objects.exists())
+
+    def test_ledger_balance_reads_from_snapshot(self):
+        """Test that the ledger balance sums only the entries after the latest snapshot."""
+        bankroll.post(self.first.pk, 'abc:1', LedgerEntry.BET, -10)
+        bankroll.rollup(delay=0)
+        bankroll.post(self.first.pk, 'abc:1', LedgerEntry.PAYOUT, 25)
+        # Older entries no longer count once they are rolled up
+        LedgerEntry.objects.filter(round_id=f'account:{self.first.pk}').update(amount=0)
+
+        self.assertEqual(bankroll.ledger_balance(self.first.pk), 1015)
+        self.assertEqual(bankroll.mismatched_accounts(), [])
+
+    def test_command_reports_mismatches(self):
+        """Test that rollup_ledger --verify fails when a balance drifts from its ledger."""
+        out = StringIO()
+        call_command('rollup_ledger', '--delay', '0', '--verify', stdout=out)
+        self.assertIn('2 balance snapshots written', out.getvalue())
+        self.assertIn('Every balance matches', out.getvalue())
+
+        Account.objects.filter(pk=self.second.pk).update(balance=5)
+        with self.assertRaises(CommandError):
+            call_command('rollup_ledger', '--verify', stdout=StringIO())
+
+
+@override_settings(BLACKJACK_HISTORY={'ASYNC': False})
+class WagerViewsTestCase(TestCase):
+    """Test cases for betting through the views."""
+
+    def tearDown(self):
+        """Write queued games while the test database still exists."""
+        get_game_store().flush()
+
+    def account_id(self):
+        return self.client.session[bankroll.ACCOUNT_SESSION_KEY]
+
+    def test_new_game_stakes_the_bet(self):
+        """Test that dealing posts the bet and a finished round pays out."""
+        self.client.post(reverse('new_game'), {'bet': '50'})
+        state = self.client.get(reverse('game_state')).json()
+        self.assertEqual(state['bet'], 50)
+        if not state['game_over']:
+            self.client.post(reverse('stand'))
+
+        game = get_game_store().load(self.client.session['game_id'])
+        entries = dict(LedgerEntry.objects.filter(account_id=self.account_id())
+                       .values_list('kind', 'amount'))
+        self.assertEqual(entries['bet'], -50)
+        self.assertEqual(entries['payout'], game.payout())
+        self.assertEqual(bankroll.balance(self.account_id()), 950 + game.payout())
+
+    def test_get_stakes_nothing(self):
+        """Test that a GET deals without a bet, skipping CSRF-free wagers."""
+        client = Client(enforce_csrf_checks=True)
+        client.get(reverse('new_game'))
+        client.get(reverse('new_game'))
+
+        self.assertEqual(client.get(reverse('account')).json()['balance'], 1000)
+        self.assertEqual(client.get(reverse('game_state')).json()['bet'], 0)
+        self.assertFalse(LedgerEntry.objects.filter(kind=LedgerEntry.BET).exists())
+
+    def test_get_leaves_staked_round_alone(self):
+        """Test that a GET to new_game doesn't forfeit a round in play."""
+        while True:
+            self.client.post(reverse('new_game'), {'bet': '10'})
+            state = self.client.get(reverse('game_state')).json()
+            if not state['game_over']:
+                break
+
+        self.client.get(reverse('new_game'))
+
+        self.assertEqual(self.client.get(reverse('game_state')).json(), state)
+
+    def test_rejected_bets(self):
+        """Test that bets out of range or over the balance aren't dealt."""
+        response = self.client.post(reverse('new_game'), {'bet': '-5'})
+        self.assertEqual(response.status_code, 400)
+
+        with override_settings(BLACKJACK_BANKROLL={'STARTING_BALANCE': 20}):
+            self.client.session.flush()
+            response = self.client.post(reverse('new_game'), {'bet': '30'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['balance'], 20)
+        self.assertNotIn('game_id', self.client.session)
+
+    def test_split_needs_funds(self):
+        """Test that a split the balance can't cover is refused."""
+        self.client.post(reverse('new_game'), {'bet': '0'})
+        store = get_game_store()
+        game_id = self.client.session['game_id']
+        game = split_game(10)
+        game.version = store.load(game_id).version
+        store.save(game_id, game)
+        Account.objects.filter(pk=self.account_id()).update(balance=5)
+
+        response = self.client.post(reverse('split'))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Insufficient balance')
+        self.assertIsNone(store.load(game_id).split_hand)
+
+    def test_account_endpoint(self):
+        """Test that the account view shows the balance and latest entries first."""
+        self.client.post(reverse('new_game'), {'bet': '10'})
+
+        data = self.client.get(reverse('account')).json()
+
+        self.assertEqual(data['balance'], bankroll.balance(self.account_id()))
+        self.assertEqual(data['entries'][-1]['kind'], 'deposit')
+        self.assertEqual(data['entries'][-2]['kind'], 'bet')
@@ -0,0 +1,98 @@
+import time
+from unittest import skipIf
+from django.test import TestCase
+from game.game_logic.game import BlackjackGame
+from game.game_logic.shoe import Shoe
+from game.game_logic.constants import RESULTS
+from game.game_logic.simulation import play_round
+
+try:
+    import numpy as np
+    from game.game_logic import batch
+except ImportError:
+    np = None
+
+
+def hit_below(threshold):
+    """Strategy that hits below a threshold and never splits."""
+    def strategy(hand, dealer_card, can_split):
+        return 'hit' if hand.get_value() < threshold else 'stand'
+    return strategy
+
+
+def play_rounds(count, seed):
+    """Play rounds with BlackjackGame and return card value arrays and results."""
+    game = BlackjackGame(Shoe(6))
+    game.deck.shuffle(seed)
+    strategies = [hit_below(threshold) for threshold in (12, 15, 17, 19)]
+    rounds = []
+    for index in range(count):
+        if game.deck.needs_shuffle():
+            game.deck.reset()
+            game.deck.shuffle(seed + index)
+        result = play_round(game, strategies[index % len(strategies)])
+        rounds.append(([card.value for card in game.player_hand.cards],
+                       [card.value for card in game.dealer_hand.cards],
+                       RESULTS.index(result)))
+
+    def pad(hands):
+        width = max(len(hand) for hand in hands)
+        return np.array([hand + [0] * (width - len(hand)) for hand in hands])
+
+    return (pad([player for player, _, _ in rounds]),
+            pad([dealer for _, dealer, _ in rounds]),
+            np.array([result for _, _, result in rounds]))
+
+
+@skipIf(np is None, "NumPy is not installed")
+class BatchTestCase(TestCase):
+    """Test cases for the vectorized round evaluator."""
+
+    def test_hand_totals(self):
+        """Test totals with soft and hard Aces."""
+        cards = [[11, 9, 0], [11, 10, 5], [11, 11, 9], [10, 10, 5]]
+        self.assertEqual(batch.hand_totals(cards).tolist(), [20, 16, 21, 25])
+
+    def test_dealer_draws_to_17(self):
+        """Test the dealer stops at the first total of 17 or more."""
+        dealer = [[5, 6, 6, 10], [10, 7, 10, 0], [11, 6, 10, 0], [10, 6, 10, 0]]
+        self.assertEqual(batch.dealer_totals(dealer).tolist(), [17, 17, 17, 26])
+
+    def test_dealer_runs_out_of_cards(self):
+        """Test that an unfinished dealer hand is rejected."""
+        with self.assertRaises(ValueError):
+            batch.dealer_totals([[2, 3, 4]])
+
+    def test_naturals(self):
+        """Test blackjack results are decided on the first two cards."""
+        player = [[11, 10], [11, 10], [10, 9]]
+        dealer = [[10, 11], [10, 7], [11, 10]]
+        self.assertEqual(batch.evaluate_rounds(player, dealer).tolist(), [
+            RESULTS.index('push'),
+            RESULTS.index('player_blackjack'),
+            RESULTS.index('dealer_blackjack')
+        ])
+
+    def test_matches_blackjack_game(self):
+        """Test results are identical to BlackjackGame on the same cards."""
+        player, dealer, expected = play_rounds(3000, seed=11)
+
+        results = batch.evaluate_rounds(player, dealer)
+
+        self.assertEqual(results.tolist(), expected.tolist())
+
+    def test_batch_throughput(self):
+        """Test the batch path is much faster per hand than the object model."""
+        player, dealer, _ = play_rounds(2000, seed=5)
+        player = np.tile(player, (100, 1))
+        dealer = np.tile(dealer, (100, 1))
+
+        start = time.perf_counter()
+        batch.evaluate_rounds(player, dealer)
+        batch_rate = len(player) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        play_rounds(2000, seed=5)
+        object_rate = 2000 / (time.perf_counter() - start)
+
+        self.assertGreater(batch_rate, object_rate * 10)
@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from game.game_logic.benchmarks import (
+    BENCHMARKS, load_baselines, write_baselines, regressions, run_benchmarks
+)
+
+
+def report(**relative):
+    """Build a benchmark report from relative times."""
+    return {'calibration': 1e-5,
+            'results': {name: {'seconds': value * 1e-5, 'relative': value}
+                        for name, value in relative.items()}}
+
+
+class BenchmarksTestCase(TestCase):
+    """Test cases for the game logic benchmarks."""
+
+    def test_benchmarks_run(self):
+        """Test that every benchmark callable runs."""
+        for name, setup in BENCHMARKS.items():
+            run = setup()
+            for _ in range(400):
+                run()
+
+    def test_run_benchmarks_reports_relative_times(self):
+        """Test that results are reported relative to the calibration loop."""
+        result = run_benchmarks(['hand_get_value'], repeat=1, min_time=0.001)
+
+        timing = result['results']['hand_get_value']
+        self.assertGreater(timing['seconds'], 0)
+        self.assertAlmostEqual(timing['relative'] * result['calibration'], timing['seconds'],
+                               delta=timing['seconds'])
+
+    def test_regressions_over_threshold(self):
+        """Test that only slowdowns beyond the threshold are reported."""
+        baselines = report(deck_deal=1.0, play_round=2.0, hand_get_value=1.0)
+        current = report(deck_deal=1.2, play_round=3.0, hand_get_value=0.5)
+
+        slower = regressions(current, baselines, threshold=0.25)
+
+        self.assertEqual(list(slower), ['play_round'])
+        self.assertAlmostEqual(slower['play_round'], 0.5)
+
+    def test_regressions_skip_new_benchmarks(self):
+        """Test that benchmarks without a baseline are not regressions."""
+        self.assertEqual(regressions(report(deck_deal=5.0), report()), {})
+
+    def test_baselines_round_trip(self):
+        """Test that stored baselines load back."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baselines.json')
+            self.assertIsNone(load_baselines(path))
+            write_baselines(report(deck_deal=1.5), path)
+            self.assertEqual(load_baselines(path), report(deck_deal=1.5))
+
+    def test_stored_baselines_cover_benchmarks(self):
+        """Test that the committed baselines include every benchmark."""
+        self.assertEqual(set(load_baselines()['results']), set(BENCHMARKS))
+
+
+class BenchmarkCommandTestCase(TestCase):
+    """Test cases for the benchmark management command."""
+
+    def test_command_json(self):
+        """Test the command runs the named benchmarks."""
+        out = StringIO()
+        call_command('benchmark', 'hand_get_value', repeat=1, min_time=0.001, json=True, stdout=out)
+
+        self.assertEqual(list(json.loads(out.getvalue())['results']), ['hand_get_value'])
+
+    def test_command_check_passes_with_large_threshold(self):
+        """Test that --check passes when within the threshold."""
+        out = StringIO()
+        call_command('benchmark', 'hand_get_value', repeat=1, min_time=0.001, check=True,
+                     threshold=1000, stdout=out)
+
+        self.assertIn('No regressions', out.getvalue())
+
+    def test_command_check_fails_on_regression(self):
+        """Test that --check fails when a benchmark is slower than allowed."""
+        with self.assertRaises(CommandError):
+            call_command('benchmark', 'hand_get_value', repeat=1, min_time=0.001, check=True,
+                         threshold=-1, stdout=StringIO())
+
+    def test_unknown_benchmark(self):
+        """Test that unknown benchmark names are rejected."""
+        with self.assertRaises(CommandError):
+            call_command('benchmark', 'nope', stdout=StringIO())
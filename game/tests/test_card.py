@@ -1,5 +1,7 @@
+import copy
+import pickle
 from django.test import TestCase
-from game.game_logic.card import Card
+from game.game_logic.card import Card, CARDS
  
  
 class CardTestCase(TestCase):
@@ -54,4 +56,42 @@ class CardTestCase(TestCase):
         restored_card = Card.from_dict(card_dict)
         self.assertEqual(restored_card.suit, 'Diamonds')
         self.assertEqual(restored_card.rank, 'K')
-        self.assertEqual(restored_card.value, 10)
\ No newline at end of file
+        self.assertEqual(restored_card.value, 10)
+
+    def test_cards_are_shared(self):
+        """Test that the same suit and rank always return the same instance."""
+        card = Card('Hearts', 'A')
+        self.assertIs(Card('Hearts', 'A'), card)
+        self.assertIs(Card.from_dict(card.to_dict()), card)
+        self.assertIs(Card.from_code(card.code), card)
+        self.assertIs(copy.copy(card), card)
+        self.assertIs(pickle.loads(pickle.dumps(card)), card)
+
+    def test_card_is_immutable(self):
+        """Test that card attributes cannot be changed."""
+        card = Card('Hearts', 'A')
+        with self.assertRaises(AttributeError):
+            card.rank = 'K'
+        with self.assertRaises(AttributeError):
+            card.extra = True
+
+    def test_card_codes(self):
+        """Test that every card has a unique code matching its position."""
+        self.assertEqual(len(CARDS), 52)
+        for code, card in enumerate(CARDS):
+            self.assertEqual(card.code, code)
+        with self.assertRaises(ValueError):
+            Card.from_code(52)
+
+    def test_invalid_card(self):
+        """Test that an unknown suit or rank raises an error."""
+        with self.assertRaises(ValueError):
+            Card('Stars', 'A')
+        with self.assertRaises(ValueError):
+            Card('Hearts', '1')
+
+    def test_cards_hashable_and_ordered(self):
+        """Test that cards can be used in sets and sorted."""
+        self.assertEqual(len({Card('Hearts', '2'), Card('Hearts', '2')}), 1)
+        self.assertEqual(sorted([Card('Spades', '2'), Card('Hearts', '3'), Card('Hearts', '2')]),
+                         [Card('Hearts', '2'), Card('Hearts', '3'), Card('Spades', '2')])
@@ -0,0 +1,232 @@
+import json
+from django.test import TestCase
+from game.game_logic.game import BlackjackGame
+from game.game_logic.card import Card
+from game.game_logic.shoe import Shoe
+from game.game_logic import codec
+
+
+class CodecTestCase(TestCase):
+    """Test cases for the binary game state codec."""
+
+    def test_card_code_round_trip(self):
+        """Test every card encodes to a unique byte and back."""
+        codes = set()
+        for code in range(52):
+            card = codec.decode_card(code)
+            self.assertEqual(codec.encode_card(card), code)
+            codes.add((card.suit, card.rank))
+        self.assertEqual(len(codes), 52)
+
+    def test_game_round_trip(self):
+        """Test a game survives to_bytes and from_bytes."""
+        game = BlackjackGame()
+        game.start_new_game()
+
+        restored = BlackjackGame.from_bytes(game.to_bytes())
+
+        self.assertEqual(restored.to_dict(), game.to_dict())
+
+    def test_split_game_round_trip(self):
+        """Test split hands and flags are preserved."""
+        game = BlackjackGame()
+        game.deck.shuffle()
+        game.player_hand.add_card(Card('Hearts', '8'))
+        game.player_hand.add_card(Card('Spades', '8'))
+        game.dealer_hand.add_card(Card('Diamonds', '7'))
+        game.dealer_hand.add_card(Card('Clubs', '6'))
+        game.player_split()
+        game.player_stand()
+
+        restored = BlackjackGame.from_bytes(game.to_bytes())
+
+        self.assertEqual(restored.active_hand, 'split')
+        self.assertEqual(restored.to_dict(), game.to_dict())
+
+    def test_finished_game_round_trip(self):
+        """Test result and game over flags are preserved."""
+        game = BlackjackGame()
+        game.start_new_game()
+        game.player_stand()
+
+        restored = BlackjackGame.from_bytes(game.to_bytes())
+
+        self.assertTrue(restored.game_over)
+        self.assertTrue(restored.dealer_turn)
+        self.assertEqual(restored.result, game.result)
+
+    def test_encoding_is_smaller_than_json(self):
+        """Test the session payload is much smaller than the JSON dict."""
+        game = BlackjackGame()
+        game.start_new_game()
+
+        # The dict format used to store every remaining card of the deck
+        legacy_state = game.to_dict()
+        legacy_state['deck'] = {'cards': [card.to_dict() for card in game.deck.cards]}
+        json_size = len(json.dumps(legacy_state))
+
+        self.assertLess(len(game.to_session()) * 20, json_size)
+
+    def test_from_session_accepts_dict(self):
+        """Test the legacy dict format is still readable."""
+        game = BlackjackGame()
+        game.start_new_game()
+
+        restored = BlackjackGame.from_session(game.to_dict())
+
+        self.assertEqual(restored.to_dict(), game.to_dict())
+
+    def test_rejects_unknown_version(self):
+        """Test that an unknown format version raises an error."""
+        game = BlackjackGame()
+        game.start_new_game()
+        data = bytearray(game.to_bytes())
+        data[0] = 99
+
+        with self.assertRaises(ValueError):
+            BlackjackGame.from_bytes(bytes(data))
+
+    def test_rejects_truncated_data(self):
+        """Test that truncated data raises an error."""
+        game = BlackjackGame()
+        game.start_new_game()
+
+        with self.assertRaises(ValueError):
+            BlackjackGame.from_bytes(game.to_bytes()[:-1])
+
+    def test_seeded_deck_round_trip(self):
+        """Test a seeded deck is stored as seed and position."""
+        game = BlackjackGame()
+        game.start_new_game()
+
+        restored = BlackjackGame.from_bytes(game.to_bytes())
+
+        self.assertEqual(restored.deck.seed, game.deck.seed)
+        self.assertEqual(restored.deck.position, 4)
+        self.assertEqual(str(restored.deck.deal()), str(game.deck.deal()))
+
+    def test_seeded_deck_keeps_counts(self):
+        """Test that rank counts and the running count are restored."""
+        game = BlackjackGame(Shoe())
+        game.start_new_game()
+
+        restored = BlackjackGame.from_bytes(game.to_bytes())
+
+        self.assertEqual(restored.deck.rank_counts, game.deck.rank_counts)
+        self.assertEqual(restored.deck.running_count, game.deck.running_count)
+
+    def version_5_bytes(self, game):
+        """Return a game's bytes without the bet."""
+        data = game.to_bytes()
+        bet = 3 + codec._GAME_VERSION.size + codec._STARTED_AT.size
+        return bytes([5]) + data[1:bet] + data[bet + codec._BET.size:]
+
+    def version_4_bytes(self, game):
+        """Return a game's bytes without the bet, round start and actions."""
+        data = self.version_5_bytes(game)
+        header = 3 + codec._GAME_VERSION.size
+        round_size = codec._STARTED_AT.size + 1 + len(game.actions)
+        return bytes([4]) + data[1:header] + data[header + round_size:]
+
+    def test_actions_round_trip(self):
+        """Test that the round's actions and start time are stored."""
+        game = BlackjackGame()
+        game.start_new_game()
+        game.actions = 'HS'
+
+        restored = BlackjackGame.from_bytes(game.to_bytes())
+
+        self.assertEqual(restored.actions, 'HS')
+        self.assertEqual(restored.started_at, game.started_at)
+
+    def test_bet_round_trip(self):
+        """Test that the bet on each hand is stored."""
+        game = BlackjackGame()
+        game.start_new_game(bet=25)
+
+        restored = BlackjackGame.from_bytes(game.to_bytes())
+
+        self.assertEqual(restored.bet, 25)
+
+    def test_reads_version_5(self):
+        """Test that states written before bets load with nothing staked."""
+        game = BlackjackGame(Shoe())
+        game.start_new_game(bet=25)
+        game.actions = 'H'
+
+        restored = BlackjackGame.from_bytes(self.version_5_bytes(game))
+
+        self.assertEqual(restored.bet, 0)
+        self.assertEqual(restored.actions, 'H')
+        self.assertEqual(restored.deck.rank_counts, game.deck.rank_counts)
+
+    def test_reads_version_4(self):
+        """Test that states written before the action history still load."""
+        game = BlackjackGame(Shoe())
+        game.start_new_game()
+
+        restored = BlackjackGame.from_bytes(self.version_4_bytes(game))
+
+        self.assertEqual(restored.actions, '')
+        self.assertIsNone(restored.started_at)
+        self.assertEqual(restored.version, game.version)
+        self.assertEqual(restored.deck.rank_counts, game.deck.rank_counts)
+
+    def test_reads_version_3(self):
+        """Test that states written before rank counts derive them on load."""
+        game = BlackjackGame(Shoe())
+        game.start_new_game()
+        data = self.version_4_bytes(game)
+        version_3 = bytes([3]) + data[1:-codec._RANK_COUNTS.size]
+
+        restored = BlackjackGame.from_bytes(version_3)
+
+        self.assertEqual(restored.deck.rank_counts, game.deck.rank_counts)
+        self.assertEqual(restored.deck.running_count, game.deck.running_count)
+
+    def test_rejects_mismatched_counts(self):
+        """Test that rank counts that don't add up to the deck are rejected."""
+        game = BlackjackGame(Shoe())
+        game.start_new_game()
+        data = bytearray(game.to_bytes())
+        data[-1] += 1
+
+        with self.assertRaises(ValueError):
+            BlackjackGame.from_bytes(bytes(data))
+
+    def test_unshuffled_deck_round_trip(self):
+        """Test a deck without a seed is stored card by card."""
+        game = BlackjackGame()
+        game.deck.deal()
+
+        restored = BlackjackGame.from_bytes(game.to_bytes())
+
+        self.assertIsNone(restored.deck.seed)
+        self.assertEqual([str(card) for card in restored.deck.cards],
+                         [str(card) for card in game.deck.cards])
+
+    def test_reads_version_1(self):
+        """Test that states written before the deck mode byte still load."""
+        # player: 2 of Hearts, dealer: 3 of Hearts, deck: 4 and 5 of Hearts
+        data = bytes([1, 0, 0, 1, 0, 1, 1, 0, 2, 2, 3])
+
+        restored = BlackjackGame.from_bytes(data)
+
+        self.assertEqual(str(restored.player_hand.cards[0]), '2 of Hearts')
+        self.assertEqual(str(restored.dealer_hand.cards[0]), '3 of Hearts')
+        self.assertEqual([str(card) for card in restored.deck.cards],
+                         ['4 of Hearts', '5 of Hearts'])
+
+    def test_shoe_round_trip(self):
+        """Test a shoe keeps its deck count, cut card and position."""
+        game = BlackjackGame(Shoe(8, penetration=0.7))
+        game.start_new_game()
+
+        restored = BlackjackGame.from_bytes(game.to_bytes())
+
+        self.assertIsInstance(restored.deck, Shoe)
+        self.assertEqual(restored.deck.num_decks, 8)
+        self.assertEqual(restored.deck.cut_card, game.deck.cut_card)
+        self.assertEqual(restored.deck.cards_remaining(), 412)
+        self.assertEqual(restored.deck.deal(), game.deck.deal())
+        self.assertLess(len(game.to_bytes()), 70)
@@ -95,8 +95,182 @@ class DeckTestCase(TestCase):
         deck.deal()  # Remove one card
        
         deck_dict = deck.to_dict()
-        self.assertEqual(len(deck_dict['cards']), 51)
+        self.assertEqual(deck_dict, {'seed': deck.seed, 'position': 1,
+                                     'rank_counts': deck.rank_counts})
+        self.assertEqual(sum(deck_dict['rank_counts']), 51)
        
         # Test deserialization
         restored_deck = Deck.from_dict(deck_dict)
-        self.assertEqual(len(restored_deck.cards), 51)
\ No newline at end of file
+        self.assertEqual(len(restored_deck.cards), 51)
+        self.assertEqual([str(card) for card in restored_deck.cards],
+                         [str(card) for card in deck.cards])
+
+    def test_unshuffled_deck_serialization(self):
+        """Test that an unshuffled deck is serialized card by card."""
+        deck = Deck()
+        deck.deal()
+
+        deck_dict = deck.to_dict()
+        self.assertEqual(len(deck_dict['cards']), 51)
+
+        restored_deck = Deck.from_dict(deck_dict)
+        self.assertEqual(len(restored_deck.cards), 51)
+
+    def test_seeded_shuffle_is_reproducible(self):
+        """Test that the same seed always produces the same order."""
+        deck1 = Deck()
+        deck2 = Deck()
+        deck1.shuffle(1234)
+        deck2.shuffle(1234)
+
+        self.assertEqual([str(deck1.deal()) for _ in range(52)],
+                         [str(deck2.deal()) for _ in range(52)])
+
+    def test_restored_deck_deals_same_cards(self):
+        """Test that a deck restored from seed and position deals the same cards."""
+        deck = Deck()
+        deck.shuffle()
+        for _ in range(10):
+            deck.deal()
+
+        restored_deck = Deck.from_dict(deck.to_dict())
+
+        self.assertEqual([str(restored_deck.deal()) for _ in range(42)],
+                         [str(deck.deal()) for _ in range(42)])
+
+    def test_dealt_cards_match_card_list(self):
+        """Test that dealing follows the order reported by cards."""
+        deck = Deck()
+        deck.shuffle(99)
+        expected = [str(card) for card in reversed(deck.cards)]
+
+        self.assertEqual([str(deck.deal()) for _ in range(52)], expected)
+
+    def test_shuffle_partially_dealt_deck(self):
+        """Test shuffling keeps only the cards left in the deck."""
+        deck = Deck()
+        deck.shuffle()
+        dealt = {str(deck.deal()) for _ in range(5)}
+
+        deck.shuffle()
+
+        self.assertEqual(len(deck.cards), 47)
+        self.assertFalse(dealt & {str(card) for card in deck.cards})
+
+    def test_from_dict_rejects_bad_position(self):
+        """Test that an out of range position is rejected."""
+        with self.assertRaises(ValueError):
+            Deck.from_dict({'seed': 1, 'position': 53})
+
+    def test_rank_counts_follow_deals(self):
+        """Test that rank counts match the cards left after each deal."""
+        deck = Deck()
+        deck.shuffle(7)
+
+        for _ in range(30):
+            deck.deal()
+            counts = [0] * 13
+            for card in deck.cards:
+                counts[card.code % 13] += 1
+            self.assertEqual(deck.rank_counts, counts)
+
+    def test_running_count(self):
+        """Test the Hi-Lo running count of the dealt cards."""
+        deck = Deck()
+        deck.cards = [Card('Hearts', 'K'), Card('Hearts', '8'), Card('Hearts', '5'), Card('Hearts', '2')]
+        # Cards not in the deck count as dealt
+        start = deck.running_count
+
+        deck.deal()  # 2
+        deck.deal()  # 5
+        deck.deal()  # 8
+
+        self.assertEqual(deck.running_count, start + 2)
+        deck.deal()  # K
+        self.assertEqual(deck.running_count, start + 1)
+
+    def test_full_deck_count_is_zero(self):
+        """Test that a fresh or reshuffled deck has a zero count."""
+        deck = Deck()
+        deck.shuffle(3)
+        self.assertEqual(deck.running_count, 0)
+        for _ in range(52):
+            deck.deal()
+        self.assertEqual(deck.running_count, 0)
+
+    def test_true_count(self):
+        """Test the running count is divided by the decks left."""
+        deck = Deck()
+        deck.shuffle(5)
+        for _ in range(26):
+            deck.deal()
+
+        self.assertAlmostEqual(deck.true_count(), deck.running_count * 2)
+
+    def test_composition(self):
+        """Test the composition groups ten-valued cards."""
+        deck = Deck()
+        deck.shuffle(1)
+        self.assertEqual(deck.composition(), (4, 4, 4, 4, 4, 4, 4, 4, 4, 16))
+
+    def test_restore_derives_counts(self):
+        """Test that restoring without counts derives them from the dealt cards."""
+        deck = Deck()
+        deck.shuffle(11)
+        for _ in range(20):
+            deck.deal()
+
+        restored = Deck()
+        restored.restore(11, 20)
+
+        self.assertEqual(restored.rank_counts, deck.rank_counts)
+        self.assertEqual(restored.running_count, deck.running_count)
+
+    def test_restore_dealt_deck(self):
+        """Test that restoring a deck that has already dealt restores the seeded order."""
+        deck = Deck()
+        deck.shuffle(11)
+        for _ in range(5):
+            deck.deal()
+        counts = list(deck.rank_counts)
+
+        restored = Deck()
+        restored.shuffle(3)
+        restored.deal()
+        restored.restore(11, 5, counts)
+
+        self.assertEqual(restored.rank_counts, counts)
+        self.assertEqual([str(restored.deal()) for _ in range(47)],
+                         [str(deck.deal()) for _ in range(47)])
+
+    def test_restore_rejects_bad_counts(self):
+        """Test that counts that don't fit the deck are rejected."""
+        with self.assertRaises(ValueError):
+            Deck().restore(11, 1, [4] * 13)
+        with self.assertRaises(ValueError):
+            Deck().restore(11, 0, [5] * 12 + [-8])
+
+    def test_shuffle_partially_dealt_deck_keeps_count(self):
+        """Test that reshuffling the rest of a deck keeps its count."""
+        deck = Deck()
+        deck.shuffle(2)
+        for _ in range(10):
+            deck.deal()
+        counts, running = list(deck.rank_counts), deck.running_count
+
+        deck.shuffle()
+
+        self.assertEqual(deck.rank_counts, counts)
+        self.assertEqual(deck.running_count, running)
+
+    def test_dealt_since(self):
+        """Test that the cards dealt since a position are returned in deal order."""
+        deck = Deck()
+        deck.shuffle(4)
+        deck.deal()
+        position = deck.position
+
+        dealt = [deck.deal(), deck.deal()]
+
+        self.assertEqual(deck.dealt_since(position), dealt)
+        self.assertEqual(deck.dealt_since(deck.position), [])
@@ -0,0 +1,55 @@
+from django.test import TestCase
+from game.game_logic.game import BlackjackGame
+from game.game_logic.card import Card
+from game.game_logic.delta import diff_states, apply_delta
+
+
+class DeltaTestCase(TestCase):
+    """Test cases for game state deltas."""
+
+    def setUp(self):
+        """Set up a game with a pair and no naturals."""
+        self.game = BlackjackGame()
+        self.game.deck.shuffle(5)
+        self.game.player_hand.add_card(Card('Hearts', '8'))
+        self.game.player_hand.add_card(Card('Spades', '8'))
+        self.game.dealer_hand.add_card(Card('Diamonds', '7'))
+        self.game.dealer_hand.add_card(Card('Clubs', '6'))
+
+    def test_unchanged_state(self):
+        """Test that identical states have no changes."""
+        state = self.game.get_game_state()
+        self.assertEqual(diff_states(state, state), {})
+
+    def test_hit_appends_card(self):
+        """Test that a hit sends only the new card and changed fields."""
+        before = self.game.get_game_state()
+        self.game.player_hit()
+        after = self.game.get_game_state()
+
+        changes = diff_states(before, after)
+
+        self.assertEqual(changes['player_hand']['append'], [after['player_hand']['cards'][-1]])
+        self.assertNotIn('replace', changes['player_hand'])
+        self.assertEqual(changes['version'], before['version'] + 1)
+        self.assertEqual(apply_delta(before, changes), after)
+
+    def test_split_replaces_hands(self):
+        """Test that a hand losing a card is sent in full."""
+        before = self.game.get_game_state()
+        self.game.player_split()
+        after = self.game.get_game_state()
+
+        changes = diff_states(before, after)
+
+        self.assertEqual(changes['player_hand'], {'replace': after['player_hand']})
+        self.assertEqual(changes['split_hand'], {'replace': after['split_hand']})
+        self.assertEqual(apply_delta(before, changes), after)
+
+    def test_stand_round_trip(self):
+        """Test that the dealer's turn can be rebuilt from a delta."""
+        before = self.game.get_game_state()
+        self.game.player_stand()
+        after = self.game.get_game_state()
+
+        self.assertEqual(apply_delta(before, diff_states(before, after)), after)
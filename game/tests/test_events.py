@@ -0,0 +1,98 @@
+from django.test import TestCase
+from game.game_logic import events
+from game.game_logic.card import Card
+from game.game_logic.game import BlackjackGame
+from game.game_logic.shoe import Shoe
+
+
+class EventsTestCase(TestCase):
+    """Test cases for game events and their replay."""
+
+    def setUp(self):
+        """Set up a game with a pair of eights against a dealer six."""
+        self.game = BlackjackGame()
+        self.game.deck.shuffle(5)
+        self.game.player_hand.add_card(Card('Hearts', '8'))
+        self.game.player_hand.add_card(Card('Spades', '8'))
+        self.game.dealer_hand.add_card(Card('Diamonds', '10'))
+        self.game.dealer_hand.add_card(Card('Clubs', '6'))
+
+    def test_hit_records_its_card(self):
+        """Test that a hit records the card it dealt."""
+        recorded = events.play(self.game, events.HIT)
+
+        self.assertEqual(recorded, [events.Event(events.HIT, [self.game.player_hand.cards[-1]])])
+
+    def test_stand_records_dealer_draws(self):
+        """Test that standing records the dealer's draws as a separate event."""
+        recorded = events.play(self.game, events.STAND)
+
+        self.assertEqual(recorded[0], events.Event(events.STAND))
+        self.assertEqual(recorded[1].kind, events.DEALER_DRAW)
+        self.assertEqual(list(recorded[1].cards), self.game.dealer_hand.cards[2:])
+
+    def test_split_records_both_cards(self):
+        """Test that a split records the card dealt to each hand."""
+        recorded = events.play(self.game, events.SPLIT)
+
+        self.assertEqual(recorded, [events.Event(events.SPLIT, [
+            self.game.player_hand.cards[1], self.game.split_hand.cards[1]
+        ])])
+
+    def test_disallowed_action(self):
+        """Test that an action that isn't allowed records nothing."""
+        events.play(self.game, events.STAND)
+
+        self.assertIsNone(events.play(self.game, events.HIT))
+
+    def test_deal_records_initial_cards(self):
+        """Test that a deal records the four cards in deal order."""
+        game = BlackjackGame(Shoe())
+
+        (recorded,) = events.deal(game)
+
+        self.assertEqual(recorded.kind, events.DEAL)
+        self.assertEqual(list(recorded.cards), [game.player_hand.cards[0], game.dealer_hand.cards[0],
+                                               game.player_hand.cards[1], game.dealer_hand.cards[1]])
+
+    def test_encoding_round_trip(self):
+        """Test that events survive encoding in a few bytes."""
+        recorded = events.play(self.game, events.STAND)
+
+        data = events.encode_events(recorded)
+
+        self.assertEqual(events.decode_events(data), recorded)
+        self.assertEqual(len(data), 4 + len(recorded[1].cards))
+
+    def test_rejects_malformed_events(self):
+        """Test that truncated or unknown events are rejected."""
+        data = events.encode_events([events.Event(events.HIT, [Card('Hearts', '2')])])
+
+        for malformed in (data[:-1], b'X\x00', 5):
+            with self.assertRaises(ValueError):
+                events.decode_events(malformed)
+
+    def test_replay_reproduces_game(self):
+        """Test that replaying recorded actions on a copy reaches the same state."""
+        copy = BlackjackGame.from_dict(self.game.to_dict())
+        log = [events.play(self.game, kind) for kind in (events.SPLIT, events.HIT, events.STAND,
+                                                         events.STAND)]
+
+        for recorded in log:
+            events.replay(copy, recorded)
+
+        self.assertEqual(copy.get_game_state(), self.game.get_game_state())
+
+    def test_replay_detects_different_cards(self):
+        """Test that replay fails when the deck deals other cards than recorded."""
+        recorded = [events.Event(events.HIT, [Card('Hearts', 'A')])]
+        if self.game.deck.cards[-1] == Card('Hearts', 'A'):
+            recorded = [events.Event(events.HIT, [Card('Hearts', '2')])]
+
+        with self.assertRaises(events.ReplayError):
+            events.replay(self.game, recorded)
+
+    def test_deals_are_not_replayed(self):
+        """Test that a deal can't be replayed, as it may reshuffle."""
+        with self.assertRaises(events.ReplayError):
+            events.replay(self.game, events.deal(BlackjackGame()))
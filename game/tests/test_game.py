@@ -1,6 +1,8 @@
+import json
 from django.test import TestCase
 from game.game_logic.game import BlackjackGame
 from game.game_logic.card import Card
+from game.game_logic.shoe import Shoe
  
  
 class BlackjackGameTestCase(TestCase):
@@ -220,4 +222,157 @@ class BlackjackGameTestCase(TestCase):
         self.assertIn('game_over', state)
         self.assertIn('result', state)
         self.assertIn('can_split', state)
-        
\ No newline at end of file
+        
+    def test_game_state_hides_deck_seed(self):
+        """Test the client facing state never includes the deck seed."""
+        game = BlackjackGame()
+        game.start_new_game()
+
+        state = game.get_game_state()
+
+        self.assertNotIn('deck', state)
+        self.assertNotIn(str(game.deck.seed), json.dumps(state))
+
+    def test_shoe_persists_across_rounds(self):
+        """Test a shoe is dealt from until the cut card is reached."""
+        game = BlackjackGame(Shoe(6))
+        game.start_new_game()
+        seed = game.deck.seed
+
+        game.start_new_game()
+
+        self.assertEqual(game.deck.seed, seed)
+        self.assertEqual(game.deck.cards_remaining(), 304)
+
+    def test_shoe_reshuffles_at_cut_card(self):
+        """Test a new round reshuffles once the cut card is reached."""
+        game = BlackjackGame(Shoe(1, penetration=0.5))
+        game.start_new_game()
+        while not game.deck.needs_shuffle():
+            game.deck.deal()
+
+        game.start_new_game()
+
+        self.assertEqual(game.deck.cards_remaining(), 48)
+
+    def test_game_state_hint(self):
+        """Test the game state includes a hint only while the player can act."""
+        game = BlackjackGame()
+        game.player_hand.add_card(Card('Hearts', '8'))
+        game.player_hand.add_card(Card('Spades', '8'))
+        game.dealer_hand.add_card(Card('Diamonds', '10'))
+        game.dealer_hand.add_card(Card('Clubs', '6'))
+
+        self.assertEqual(game.get_game_state()['hint'], 'split')
+
+        game.player_stand()
+        self.assertIsNone(game.get_game_state()['hint'])
+
+    def test_version_increases_with_actions(self):
+        """Test that every successful action increases the version."""
+        game = BlackjackGame()
+        game.player_hand.add_card(Card('Hearts', '8'))
+        game.player_hand.add_card(Card('Spades', '8'))
+        game.dealer_hand.add_card(Card('Diamonds', '7'))
+        game.dealer_hand.add_card(Card('Clubs', '6'))
+        game.deck.shuffle(1)
+
+        game.player_split()
+        self.assertEqual(game.version, 1)
+        game.player_stand()
+        self.assertEqual(game.version, 2)
+        game.player_stand()
+        self.assertEqual(game.version, 3)
+
+        self.assertFalse(game.player_hit())
+        self.assertEqual(game.version, 3)
+        self.assertEqual(BlackjackGame.from_dict(game.to_dict()).version, 3)
+        self.assertEqual(BlackjackGame.from_bytes(game.to_bytes()).version, 3)
+
+    def test_actions_are_recorded(self):
+        """Test that the round's actions are kept and reset by a new deal."""
+        game = BlackjackGame()
+        game.player_hand.add_card(Card('Hearts', '8'))
+        game.player_hand.add_card(Card('Spades', '8'))
+        game.dealer_hand.add_card(Card('Diamonds', '7'))
+        game.dealer_hand.add_card(Card('Clubs', '6'))
+        game.deck.shuffle(1)
+
+        game.player_split()
+        game.player_stand()
+        game.player_stand()
+
+        self.assertEqual(game.actions, 'PSS')
+        self.assertEqual(BlackjackGame.from_dict(game.to_dict()).actions, 'PSS')
+        game.start_new_game()
+        self.assertEqual(game.actions, '')
+        self.assertIsNotNone(game.started_at)
+
+    def test_game_state_bust_probability(self):
+        """Test the bust chance counts the unseen cards, including the hole card."""
+        game = BlackjackGame(Shoe())
+        while True:
+            game.start_new_game()
+            if not game.game_over and not game.player_hand.is_soft():
+                break
+
+        unseen = game.deck.cards + [game.dealer_hand.cards[1]]
+        margin = 21 - game.player_hand.get_value()
+        expected = sum(1 for card in unseen if (1 if card.is_ace() else card.value) > margin) / len(unseen)
+
+        self.assertAlmostEqual(game.get_game_state()['bust_probability'], expected)
+
+        game.player_stand()
+        self.assertIsNone(game.get_game_state()['bust_probability'])
+
+    def test_split_doubles_the_stake(self):
+        """Test that splitting stakes the bet again on the new hand and pays both."""
+        game = BlackjackGame()
+        game.bet = 10
+        game.player_hand.add_card(Card('Hearts', '8'))
+        game.player_hand.add_card(Card('Spades', '8'))
+        game.dealer_hand.add_card(Card('Diamonds', '10'))
+        game.dealer_hand.add_card(Card('Clubs', '7'))
+        game.deck.cards = [Card('Clubs', '2'), Card('Hearts', '3'), Card('Hearts', 'K')]
+
+        self.assertEqual(game.stake, 10)
+        game.player_split()
+        self.assertEqual(game.stake, 20)
+        self.assertEqual(game.payout(), 0)
+        game.player_stand()
+        game.player_stand()
+
+        # 18 beats 17 and 11 loses: one bet back plus one bet won
+        self.assertEqual(game.result, 'win_and_lose')
+        self.assertEqual(game.payout(), 20)
+        self.assertEqual(game.get_game_state()['stake'], 20)
+
+    def test_bet_is_kept_for_the_round(self):
+        """Test that a new deal stakes its bet and the dealt version is tracked."""
+        game = BlackjackGame(Shoe())
+        game.start_new_game(bet=25)
+        dealt = game.version
+
+        self.assertEqual(game.bet, 25)
+        self.assertEqual(BlackjackGame.from_dict(game.to_dict()).bet, 25)
+        if not game.game_over:
+            game.player_stand()
+        self.assertEqual(game.dealt_version, dealt)
+
+    def test_game_state_hides_hole_card(self):
+        """Test that the state shows only the dealer's upcard until the dealer's turn."""
+        game = BlackjackGame()
+        game.player_hand.add_card(Card('Hearts', '10'))
+        game.player_hand.add_card(Card('Spades', '2'))
+        game.dealer_hand.add_card(Card('Diamonds', '10'))
+        game.dealer_hand.add_card(Card('Clubs', '9'))
+
+        dealer = game.get_game_state()['dealer_hand']
+        self.assertEqual(dealer['cards'], [Card('Diamonds', '10').to_dict()])
+        self.assertIsNone(dealer['value'])
+        self.assertNotIn('Clubs', json.dumps(game.get_game_state()))
+
+        game.player_stand()
+        dealer = game.get_game_state()['dealer_hand']
+        self.assertEqual(len(dealer['cards']), 2)
+        self.assertEqual(dealer['value'], 19)
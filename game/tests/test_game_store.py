@@ -0,0 +1,376 @@
+from unittest import mock
+from django.core.cache import caches
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from game.game_logic import events
+from game.game_logic.card import Card
+from game.game_logic.game import BlackjackGame
+from game.game_store import GameStore, GameConflict, get_game_store
+from game.models import GameEvent, SavedGame
+from game.tests import fake_redis
+
+
+class GameStoreTestCase(TestCase):
+    """Test cases for the cache-backed game store."""
+
+    def setUp(self):
+        """Set up a store on a cleared cache."""
+        caches['game_state'].clear()
+        self.store = GameStore('game_state', flush_interval=60, max_pending=10)
+        self.game = BlackjackGame()
+        self.game.start_new_game()
+
+    def test_save_and_load(self):
+        """Test that a saved game loads back from the cache."""
+        self.store.save('abc', self.game)
+
+        loaded = self.store.load('abc')
+
+        self.assertEqual(loaded.get_game_state(), self.game.get_game_state())
+
+    def test_load_missing_game(self):
+        """Test that an unknown id loads as None."""
+        self.assertIsNone(self.store.load('missing'))
+
+    def test_save_does_not_touch_database(self):
+        """Test that saving only queues the game for the database."""
+        with self.assertNumQueries(0):
+            self.store.save('abc', self.game)
+            self.store.load('abc')
+        self.assertEqual(self.store.pending_count(), 1)
+
+    def test_flush_writes_games(self):
+        """Test that flushing writes queued games in one statement."""
+        self.store.save('abc', self.game)
+        self.store.save('def', self.game)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.store.flush(), 2)
+
+        self.assertEqual(SavedGame.objects.count(), 2)
+        self.assertEqual(self.store.pending_count(), 0)
+
+    def test_failed_flush_keeps_queue(self):
+        """Test that games queued for a flush the database rejects are written by the next."""
+        game = self.pair_game()
+        self.play(events.SPLIT)
+
+        with mock.patch.object(GameEvent.objects, 'bulk_create', side_effect=OperationalError):
+            with self.assertRaises(OperationalError):
+                self.store.flush()
+        self.assertEqual(self.store.pending_count(), 2)
+
+        self.assertEqual(self.store.flush(), 2)
+        self.assertEqual(SavedGame.objects.get().version, game.version)
+        self.assertEqual(GameEvent.objects.get().kind, events.SPLIT)
+
+    def test_flush_after_request_logs_database_errors(self):
+        """Test that a failed write behind is logged rather than raised from the request."""
+        self.store.save('abc', self.game)
+        self.store.flush_interval = 0
+
+        with mock.patch.object(SavedGame.objects, 'bulk_create', side_effect=OperationalError):
+            with self.assertLogs('game.game_store', 'ERROR'):
+                self.store.flush_if_due()
+
+        self.assertEqual(self.store.pending_count(), 1)
+
+    def test_flush_updates_existing_game(self):
+        """Test that flushing a game again updates its row."""
+        self.store.save('abc', self.game)
+        self.store.flush()
+        self.game.player_stand()
+        self.store.save('abc', self.game)
+        self.store.flush()
+
+        saved = SavedGame.objects.get(game_id='abc')
+        self.assertEqual(saved.version, self.game.version)
+        self.assertEqual(saved.state, self.game.to_session())
+
+    def test_load_falls_back_to_database(self):
+        """Test that a game missing from the cache is read from the database."""
+        self.store.save('abc', self.game)
+        self.store.flush()
+        caches['game_state'].clear()
+
+        loaded = self.store.load('abc')
+
+        self.assertEqual(loaded.get_game_state(), self.game.get_game_state())
+
+    def test_load_falls_back_to_pending(self):
+        """Test that a game evicted before it was flushed is still found."""
+        self.store.save('abc', self.game)
+        caches['game_state'].clear()
+
+        with self.assertNumQueries(0):
+            loaded = self.store.load('abc')
+
+        self.assertEqual(loaded.get_game_state(), self.game.get_game_state())
+
+    def test_max_pending_flushes(self):
+        """Test that reaching the queue limit flushes immediately."""
+        store = GameStore('game_state', flush_interval=60, max_pending=2)
+        store.save('abc', self.game)
+        store.save('def', self.game)
+
+        self.assertEqual(SavedGame.objects.count(), 2)
+        self.assertEqual(store.pending_count(), 0)
+
+    def test_flush_if_due_waits_for_interval(self):
+        """Test that nothing is written before the flush interval passes."""
+        self.store.save('abc', self.game)
+        self.store.flush_if_due()
+        self.assertEqual(SavedGame.objects.count(), 0)
+
+        self.store.flush_interval = 0
+        self.store.flush_if_due()
+        self.assertEqual(SavedGame.objects.count(), 1)
+
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                       'LOCATION': 'shared-test'},
+        },
+        BLACKJACK_GAME_STORE={'CACHE': 'shared'},
+    )
+    def test_store_uses_configured_cache(self):
+        """Test that the store uses the cache named in settings."""
+        store = get_game_store()
+        store.save('abc', self.game)
+
+        self.assertIsNotNone(caches['shared'].get('game:abc'))
+
+    def test_save_from_same_version_conflicts(self):
+        """Test that only the first save from a loaded version succeeds."""
+        self.store.save('abc', self.game)
+        first = self.store.load('abc')
+        second = self.store.load('abc')
+        base_version = first.version
+
+        first.player_stand()
+        self.store.save('abc', first, base_version)
+        second.player_hit()
+
+        with self.assertRaises(GameConflict):
+            self.store.save('abc', second, base_version)
+        self.assertEqual(self.store.load('abc').get_game_state(), first.get_game_state())
+
+    def test_save_from_new_version_succeeds(self):
+        """Test that a game loaded after a save can be saved again."""
+        while self.game.game_over:
+            # A natural leaves nothing to stand on
+            self.game.start_new_game()
+        self.store.save('abc', self.game)
+        game = self.store.load('abc')
+        base_version = game.version
+        game.player_stand()
+        self.store.save('abc', game, base_version)
+
+        reloaded = self.store.load('abc')
+        base_version = reloaded.version
+        reloaded.start_new_game()
+        self.store.save('abc', reloaded, base_version)
+
+        self.assertEqual(self.store.load('abc').version, base_version + 1)
+
+    def pair_game(self):
+        """Save a game with a pair of eights against a dealer six and return it."""
+        game = pair_game()
+        self.store.save('abc', game)
+        return game
+
+    def play(self, kind):
+        """Load the game, apply an action and save its events."""
+        game = self.store.load('abc')
+        base_version = game.version
+        self.store.save('abc', game, base_version, events.play(game, kind))
+        return game
+
+    def test_action_appends_events(self):
+        """Test that an action within a round stores its events, not the game."""
+        self.pair_game()
+        snapshot = caches['game_state'].get('game:abc')
+
+        game = self.play(events.SPLIT)
+
+        self.assertEqual(caches['game_state'].get('game:abc'), snapshot)
+        self.assertLess(len(caches['game_state'].get('game:abc:events:1')), len(snapshot))
+        self.assertEqual(self.store.load('abc').get_game_state(), game.get_game_state())
+
+    def test_load_replays_events_in_one_read(self):
+        """Test that a load fetches the events after the snapshot together."""
+        self.pair_game()
+        self.play(events.SPLIT)
+        game = self.play(events.STAND)
+
+        with mock.patch.object(self.store.cache, 'get_many',
+                               wraps=self.store.cache.get_many) as get_many:
+            loaded = self.store.load('abc')
+
+        get_many.assert_called_once()
+        self.assertEqual(loaded.get_game_state(), game.get_game_state())
+
+    def test_snapshots_are_periodic(self):
+        """Test that every SNAPSHOT_EVERY versions the whole game is stored again."""
+        game = self.pair_game()
+        game.version = self.store.snapshot_every - 1
+        self.store.save('abc', game)
+
+        self.play(events.SPLIT)
+
+        snapshot = BlackjackGame.from_session(caches['game_state'].get('game:abc'))
+        self.assertEqual(snapshot.version, self.store.snapshot_every)
+
+    def test_deal_stores_snapshot(self):
+        """Test that a deal stores the whole game and keeps it with the deal event."""
+        self.store.save('abc', self.game)
+        game = self.store.load('abc')
+        base_version = game.version
+
+        self.store.save('abc', game, base_version, events.deal(game))
+        self.store.flush()
+
+        self.assertEqual(caches['game_state'].get('game:abc'), game.to_session())
+        deal = GameEvent.objects.get(kind=events.DEAL)
+        self.assertEqual(deal.version, game.version)
+        self.assertEqual(deal.snapshot, game.to_session())
+
+    def test_missing_event_rebuilds_from_queue(self):
+        """Test that a gap in the cached events falls back to the queued events."""
+        self.pair_game()
+        self.play(events.SPLIT)
+        game = self.play(events.STAND)
+        caches['game_state'].delete('game:abc:events:1')
+
+        with self.assertNumQueries(0):
+            loaded = self.store.load('abc')
+
+        self.assertEqual(loaded.get_game_state(), game.get_game_state())
+
+    def test_load_rebuilds_from_database(self):
+        """Test that a game missing from the cache is replayed from stored events."""
+        self.pair_game()
+        self.play(events.SPLIT)
+        game = self.play(events.STAND)
+        self.store.flush()
+        caches['game_state'].clear()
+
+        loaded = self.store.load('abc')
+
+        self.assertEqual(loaded.get_game_state(), game.get_game_state())
+        self.assertEqual(SavedGame.objects.get().version, 0)
+        self.assertEqual(GameEvent.objects.count(), 2)
+        # The rebuilt game is cached as a new snapshot
+        self.assertEqual(caches['game_state'].get('game:abc'), game.to_session())
+
+
+def pair_game():
+    """Return a game with a pair of eights against a dealer six."""
+    game = BlackjackGame()
+    game.deck.shuffle(5)
+    game.player_hand.add_card(Card('Hearts', '8'))
+    game.player_hand.add_card(Card('Spades', '8'))
+    game.dealer_hand.add_card(Card('Diamonds', '10'))
+    game.dealer_hand.add_card(Card('Clubs', '6'))
+    return game
+
+
+class DatabaseGameStoreTestCase(TestCase):
+    """Test cases for a game store without a cache, as run by several workers."""
+
+    def setUp(self):
+        self.store = GameStore(None)
+        self.game = pair_game()
+        self.store.save('abc', self.game)
+
+    def test_save_writes_through(self):
+        """Test that a save is in the database before it returns."""
+        game = self.store.load('abc')
+        base_version = game.version
+        self.store.save('abc', game, base_version, events.play(game, events.SPLIT))
+
+        self.assertEqual(self.store.pending_count(), 0)
+        saved = SavedGame.objects.get(game_id='abc')
+        self.assertEqual((saved.state, saved.version), (game.to_session(), game.version))
+        self.assertEqual(GameEvent.objects.get().kind, events.SPLIT)
+
+    def test_other_store_loads_latest_save(self):
+        """Test that a store in another process loads the game just saved."""
+        game = self.store.load('abc')
+        base_version = game.version
+        self.store.save('abc', game, base_version, events.play(game, events.STAND))
+
+        loaded = GameStore(None).load('abc')
+
+        self.assertEqual(loaded.get_game_state(), game.get_game_state())
+
+    def test_stale_save_from_other_store_conflicts(self):
+        """Test that a save from a version another process replaced is rejected."""
+        first = self.store.load('abc')
+        second = GameStore(None).load('abc')
+        base_version = first.version
+        self.store.save('abc', first, base_version, events.play(first, events.STAND))
+
+        with self.assertRaises(GameConflict):
+            GameStore(None).save('abc', second, base_version, events.play(second, events.HIT))
+        self.assertEqual(self.store.load('abc').get_game_state(), first.get_game_state())
+        self.assertFalse(GameEvent.objects.filter(kind=events.HIT).exists())
+
+    def test_deal_keeps_snapshot(self):
+        """Test that a deal keeps the whole game with its event for replays."""
+        game = self.store.load('abc')
+        base_version = game.version
+        self.store.save('abc', game, base_version, events.deal(game))
+
+        self.assertEqual(GameEvent.objects.get(kind=events.DEAL).snapshot, game.to_session())
+
+    def test_load_missing_game(self):
+        """Test that an unknown id loads as None."""
+        self.assertIsNone(self.store.load('missing'))
+
+
+SHARED_CACHE = {
+    'BACKEND': 'game.cache.RedisCache',
+    'LOCATION': 'redis://shared-test/0',
+    'OPTIONS': {'library': 'game.tests.fake_redis'},
+}
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'worker_a': SHARED_CACHE,
+    'worker_b': SHARED_CACHE,
+})
+class SharedCacheTestCase(TestCase):
+    """Test cases for stores in two workers sharing a Redis-compatible cache."""
+
+    def setUp(self):
+        fake_redis.reset()
+        self.first = GameStore('worker_a', flush_interval=60)
+        self.second = GameStore('worker_b', flush_interval=60)
+        self.game = pair_game()
+        self.first.save('abc', self.game)
+
+    def test_worker_loads_unflushed_save(self):
+        """Test that a save waiting to be written behind is seen by another worker."""
+        game = self.first.load('abc')
+        base_version = game.version
+        self.first.save('abc', game, base_version, events.play(game, events.SPLIT))
+
+        loaded = self.second.load('abc')
+
+        self.assertEqual(self.first.pending_count(), 2)
+        self.assertEqual(loaded.get_game_state(), game.get_game_state())
+        self.assertIsNot(caches['worker_a'], caches['worker_b'])
+
+    def test_stale_save_from_other_worker_conflicts(self):
+        """Test that a worker can't save from a version another worker replaced."""
+        first = self.first.load('abc')
+        second = self.second.load('abc')
+        base_version = first.version
+        self.first.save('abc', first, base_version, events.play(first, events.STAND))
+
+        with self.assertRaises(GameConflict):
+            self.second.save('abc', second, base_version, events.play(second, events.HIT))
+        self.assertEqual(self.second.load('abc').get_game_state(), first.get_game_state())
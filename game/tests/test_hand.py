@@ -1,6 +1,7 @@
+import random
 from django.test import TestCase
 from game.game_logic.hand import Hand
-from game.game_logic.card import Card
+from game.game_logic.card import Card, CARDS
 
 class HandTestCase(TestCase):
     """Test cases for the Hand class."""
@@ -141,4 +142,55 @@ class HandTestCase(TestCase):
         restored_hand = Hand.from_dict(hand_dict)
         self.assertEqual(len(restored_hand.cards), 2)
         self.assertEqual(restored_hand.get_value(), 21)
- 
\ No newline at end of file
+
+    def test_is_soft(self):
+        """Test soft hand detection."""
+        hand = Hand()
+        hand.add_card(Card('Hearts', 'A'))
+        hand.add_card(Card('Spades', '6'))
+        self.assertTrue(hand.is_soft())
+
+        hand.add_card(Card('Diamonds', '9'))
+        self.assertFalse(hand.is_soft())
+        self.assertEqual(hand.get_value(), 16)
+
+    def test_pop_card_updates_value(self):
+        """Test that removing a card updates the hand value."""
+        hand = Hand()
+        hand.add_card(Card('Hearts', 'A'))
+        hand.add_card(Card('Spades', 'A'))
+        self.assertEqual(hand.get_value(), 12)
+
+        card = hand.pop_card()
+
+        self.assertEqual(card, Card('Spades', 'A'))
+        self.assertEqual(hand.get_value(), 11)
+        self.assertTrue(hand.is_soft())
+
+    def test_assigning_cards_updates_value(self):
+        """Test that replacing the card list recalculates the value."""
+        hand = Hand()
+        hand.add_card(Card('Hearts', 'K'))
+
+        hand.cards = [Card('Hearts', '3'), Card('Spades', '5')]
+
+        self.assertEqual(hand.get_value(), 8)
+        hand.clear()
+        self.assertEqual(hand.get_value(), 0)
+        self.assertEqual(len(hand), 0)
+
+    def test_value_matches_full_rescan(self):
+        """Test the running value against a full recount of random hands."""
+        rng = random.Random(7)
+        for _ in range(500):
+            hand = Hand()
+            for card in rng.sample(CARDS, rng.randint(1, 8)):
+                hand.add_card(card)
+
+            value = sum(card.value for card in hand.cards)
+            aces = sum(1 for card in hand.cards if card.is_ace())
+            while value > 21 and aces:
+                value -= 10
+                aces -= 1
+
+            self.assertEqual(hand.get_value(), value)
@@ -0,0 +1,147 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.db import DatabaseError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from game.game_logic import codec
+from game.game_logic.card import Card
+from game.game_logic.game import BlackjackGame
+from game.game_store import get_game_store
+from game.history import HistoryWriter, hand_history
+from game.models import HandHistory
+
+
+def finished_game():
+    """Return a game the player lost by standing on 12."""
+    game = BlackjackGame()
+    game.started_at = 1700000000
+    game.player_hand.add_card(Card('Hearts', '10'))
+    game.player_hand.add_card(Card('Spades', '2'))
+    game.dealer_hand.add_card(Card('Diamonds', '10'))
+    game.dealer_hand.add_card(Card('Clubs', '9'))
+    game.player_stand()
+    return game
+
+
+@override_settings(BLACKJACK_HISTORY={'ASYNC': False})
+class HandHistoryTestCase(TestCase):
+    """Test cases for recording finished rounds."""
+
+    def tearDown(self):
+        """Write queued games while the test database still exists."""
+        get_game_store().flush()
+
+    def test_row_encodes_round(self):
+        """Test that a row stores card codes, actions, result and times."""
+        row = hand_history('abc', finished_game())
+
+        self.assertEqual(codec.decode_cards(row.player_cards),
+                         [Card('Hearts', '10'), Card('Spades', '2')])
+        self.assertEqual(len(row.dealer_cards), 2)
+        self.assertIsNone(row.split_cards)
+        self.assertEqual(row.actions, 'S')
+        self.assertEqual(row.result, 'dealer_wins')
+        self.assertEqual(row.round, 1)
+        self.assertEqual(row.started_at.timestamp(), 1700000000)
+
+    def test_synchronous_writer_inserts(self):
+        """Test that a synchronous writer inserts each round as it is recorded."""
+        writer = HistoryWriter(asynchronous=False)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(writer.record('abc', finished_game()))
+
+        self.assertEqual(HandHistory.objects.get().game_id, 'abc')
+        self.assertEqual(writer.metrics()['written'], 1)
+
+    def test_full_queue_drops_rounds(self):
+        """Test that rounds are dropped and counted once the queue is full."""
+        writer = HistoryWriter(max_queue=1)
+        with mock.patch.object(writer, '_ensure_thread'):
+            self.assertTrue(writer.record('abc', finished_game()))
+            self.assertFalse(writer.record('def', finished_game()))
+
+        metrics = writer.metrics()
+        self.assertEqual(metrics['queue_depth'], 1)
+        self.assertEqual(metrics['enqueued'], 1)
+        self.assertEqual(metrics['dropped'], 1)
+
+    def test_failed_writes_are_counted(self):
+        """Test that a failed insert is counted instead of raised."""
+        writer = HistoryWriter(asynchronous=False)
+        with mock.patch.object(HandHistory.objects, 'bulk_create', side_effect=DatabaseError):
+            with self.assertLogs('game.history', 'ERROR'):
+                writer.record('abc', finished_game())
+
+        self.assertEqual(writer.metrics()['failed'], 1)
+        self.assertFalse(HandHistory.objects.exists())
+
+    def test_finished_round_is_recorded(self):
+        """Test that the action that ends a round records it."""
+        while True:
+            self.client.post(reverse('new_game'))
+            if not self.client.get(reverse('game_state')).json()['game_over']:
+                break
+        finished = HandHistory.objects.count()
+
+        self.client.post(reverse('stand'))
+
+        self.assertEqual(HandHistory.objects.count(), finished + 1)
+        row = HandHistory.objects.latest('id')
+        self.assertEqual(row.game_id, self.client.session['game_id'])
+        self.assertTrue(row.actions.endswith('S'))
+
+    def test_unfinished_round_is_not_recorded(self):
+        """Test that saves during a round write no history."""
+        while True:
+            HandHistory.objects.all().delete()
+            self.client.post(reverse('new_game'))
+            if not self.client.get(reverse('game_state')).json()['game_over']:
+                break
+
+        self.assertFalse(HandHistory.objects.exists())
+
+    def test_metrics_endpoint(self):
+        """Test that staff can read the writer metrics."""
+        User.objects.create_user('staff', password='secret', is_staff=True)
+        self.client.login(username='staff', password='secret')
+
+        data = self.client.get(reverse('history_metrics')).json()
+
+        self.assertIn('queue_depth', data)
+        self.assertIn('dropped', data)
+
+    def test_metrics_endpoint_requires_staff(self):
+        """Test that writer metrics are hidden from players."""
+        response = self.client.get(reverse('history_metrics'))
+        self.assertEqual(response.status_code, 302)
+
+
+class HistoryWriterThreadTestCase(TransactionTestCase):
+    """Test cases for the background writer thread."""
+
+    def test_rows_are_batched_and_drained_on_shutdown(self):
+        """Test that queued rounds are bulk inserted and drained at shutdown."""
+        writer = HistoryWriter(batch_size=10, flush_interval=5)
+        for game_id in ('a', 'b', 'c'):
+            writer.record(game_id, finished_game())
+
+        writer.shutdown()
+
+        self.assertEqual(sorted(HandHistory.objects.values_list('game_id', flat=True)),
+                         ['a', 'b', 'c'])
+        metrics = writer.metrics()
+        self.assertEqual(metrics['written'], 3)
+        self.assertEqual(metrics['batches'], 1)
+        self.assertEqual(metrics['queue_depth'], 0)
+
+    def test_full_batches_are_written_without_waiting(self):
+        """Test that a full batch is inserted before the flush interval."""
+        writer = HistoryWriter(batch_size=2, flush_interval=60)
+        writer.record('a', finished_game())
+        writer.record('b', finished_game())
+
+        writer.shutdown(timeout=5)
+
+        self.assertEqual(HandHistory.objects.count(), 2)
+        self.assertFalse(writer._thread.is_alive())
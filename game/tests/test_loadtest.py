@@ -0,0 +1,69 @@
+from django.test import TestCase, TransactionTestCase, override_settings
+from game.game_store import get_game_store
+from game.loadtest import ClientTransport, LoadStats, VirtualPlayer, percentile, run_load
+
+
+class LoadStatsTestCase(TestCase):
+    """Test cases for the load test statistics."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertIsNone(percentile([], 50))
+
+    def test_summary_per_endpoint(self):
+        """Test that requests and errors are summarized per endpoint."""
+        stats = LoadStats()
+        stats.record('hit', 0.002)
+        stats.record('hit', 0.004, error=True)
+        stats.record('stand', 0.001)
+
+        summary = stats.summary(2.0)
+
+        self.assertEqual(summary['requests'], 3)
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['endpoints']['hit']['requests'], 2)
+        self.assertEqual(summary['endpoints']['hit']['errors'], 1)
+        self.assertEqual(summary['endpoints']['hit']['p99_ms'], 4.0)
+        self.assertEqual(summary['requests_per_second'], 1.5)
+
+
+@override_settings(BLACKJACK_HISTORY={'ASYNC': False})
+class VirtualPlayerTestCase(TestCase):
+    """Test cases for the virtual player."""
+
+    def tearDown(self):
+        """Write queued games while the test database still exists."""
+        get_game_store().flush()
+
+    def test_play_round(self):
+        """Test that a player finishes a round without errors."""
+        stats = LoadStats()
+        player = VirtualPlayer(ClientTransport(), stats)
+
+        for _ in range(5):
+            player.play_round()
+
+        self.assertEqual(stats.rounds, 5)
+        self.assertEqual(stats.errors, {})
+        self.assertTrue(player.state['game_over'])
+        self.assertEqual(len(stats.latencies['new_game']), 5)
+        self.assertEqual(len(stats.latencies['index']), 5)
+
+
+@override_settings(BLACKJACK_HISTORY={'ASYNC': False})
+class RunLoadTestCase(TransactionTestCase):
+    """Test cases for running concurrent players."""
+
+    def test_run_load(self):
+        """Test that concurrent players complete their rounds."""
+        report = run_load(ClientTransport, users=2, rounds=3)
+        get_game_store().flush()
+
+        self.assertEqual(report['rounds'], 6)
+        self.assertEqual(report['errors'], 0)
+        # Each player lands on the page twice before playing
+        self.assertEqual(report['endpoints']['new_game']['requests'], 8)
@@ -0,0 +1,116 @@
+from fractions import Fraction
+from itertools import permutations
+from django.test import TestCase
+from game.game_logic.card import Card
+from game.game_logic.deck import Deck
+from game.game_logic.hand import Hand
+from game.game_logic.probability import (
+    dealer_probabilities, deck_probabilities, composition, bust_probability, DEALER_OUTCOMES
+)
+
+
+def brute_force(upcard, cards, no_blackjack=False):
+    """Play the dealer out for every ordering of the unseen cards."""
+    totals = dict.fromkeys(DEALER_OUTCOMES, 0)
+    orderings = 0
+    for order in set(permutations(cards)):
+        hand = Hand()
+        hand.add_card(upcard)
+        hand.add_card(order[0])
+        if no_blackjack and hand.is_blackjack():
+            continue
+        drawn = 1
+        while hand.get_value() < 17:
+            hand.add_card(order[drawn])
+            drawn += 1
+        totals['bust' if hand.is_bust() else hand.get_value()] += 1
+        orderings += 1
+    return {outcome: Fraction(count, orderings) for outcome, count in totals.items()}
+
+
+class ProbabilityTestCase(TestCase):
+    """Test cases for the exact dealer outcome calculator."""
+
+    def test_composition(self):
+        """Test cards are counted by hard value."""
+        cards = [Card('Hearts', 'A'), Card('Spades', 'K'), Card('Clubs', '10'), Card('Hearts', '2')]
+        self.assertEqual(composition(cards), (1, 1, 0, 0, 0, 0, 0, 0, 0, 2))
+
+    def test_probabilities_sum_to_one(self):
+        """Test the distribution is complete for every upcard."""
+        counts = composition(Deck().cards)
+        for rank in ('2', '6', '10', 'A'):
+            probabilities = dealer_probabilities(Card('Hearts', rank), counts)
+            self.assertAlmostEqual(sum(probabilities.values()), 1.0)
+
+    def test_matches_brute_force(self):
+        """Test exact results against playing out every ordering of a small shoe."""
+        ranks = ['A', '2', '5', '6', '9', 'K', 'K']
+        cards = [Card('Spades', rank) for rank in ranks]
+        for upcard in (Card('Hearts', '6'), Card('Hearts', 'A'), Card('Hearts', 'K')):
+            for no_blackjack in (False, True):
+                expected = brute_force(upcard, cards, no_blackjack)
+                actual = dealer_probabilities(upcard, composition(cards), no_blackjack)
+                for outcome in DEALER_OUTCOMES:
+                    self.assertAlmostEqual(actual[outcome], float(expected[outcome]))
+
+    def test_known_six_deck_bust_rate(self):
+        """Test the well known dealer bust rate with a 6 showing."""
+        counts = (24,) * 9 + (96,)
+        probabilities = dealer_probabilities(Card('Hearts', '6'), counts)
+        self.assertAlmostEqual(probabilities['bust'], 0.4229, places=3)
+
+    def test_no_blackjack_excludes_naturals(self):
+        """Test that conditioning on no natural removes the Ace hole card under a ten."""
+        counts = (4,) * 9 + (16,)
+        with_natural = dealer_probabilities(Card('Hearts', 'K'), counts)
+        without_natural = dealer_probabilities(Card('Hearts', 'K'), counts, no_blackjack=True)
+        self.assertLess(without_natural[21], with_natural[21])
+
+    def test_deck_probabilities_counts_hidden_cards(self):
+        """Test that a hidden hole card is added back to the unseen cards."""
+        deck = Deck()
+        upcard = deck.deal()
+        hole_card = deck.deal()
+
+        probabilities = deck_probabilities(upcard, deck, hidden_cards=[hole_card])
+
+        expected = dealer_probabilities(upcard, composition(deck.cards + [hole_card]))
+        self.assertEqual(probabilities, expected)
+
+    def test_empty_shoe(self):
+        """Test that an empty shoe raises an error."""
+        with self.assertRaises(ValueError):
+            dealer_probabilities(Card('Hearts', '6'), (0,) * 10)
+
+    def test_bust_probability_hard_hand(self):
+        """Test the bust chance counts cards worth more than the margin."""
+        hand = Hand()
+        hand.add_card(Card('Hearts', '10'))
+        hand.add_card(Card('Spades', '6'))
+        counts = (4,) * 9 + (16,)
+
+        # 6 through 10 bust a hard 16
+        self.assertEqual(bust_probability(hand, counts), (4 * 4 + 16) / 52)
+
+    def test_bust_probability_low_and_soft_hands(self):
+        """Test that hands that can't bust on one card have no bust chance."""
+        low = Hand()
+        low.add_card(Card('Hearts', '5'))
+        low.add_card(Card('Spades', '6'))
+        soft = Hand()
+        soft.add_card(Card('Hearts', 'A'))
+        soft.add_card(Card('Spades', '9'))
+        counts = (4,) * 9 + (16,)
+
+        self.assertEqual(bust_probability(low, counts), 0.0)
+        self.assertEqual(bust_probability(soft, counts), 0.0)
+
+    def test_bust_probability_uses_composition(self):
+        """Test the bust chance follows the cards left."""
+        hand = Hand()
+        hand.add_card(Card('Hearts', '10'))
+        hand.add_card(Card('Spades', '9'))
+        # Only Aces and twos left: neither busts a hard 19
+        self.assertEqual(bust_probability(hand, (3, 5) + (0,) * 8), 0.0)
+        self.assertIsNone(bust_probability(hand, (0,) * 10))
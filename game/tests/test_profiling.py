@@ -0,0 +1,137 @@
+import cProfile
+import marshal
+import pstats
+import shutil
+import tempfile
+from unittest import mock
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.handlers.base import BaseHandler
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+from game import profiling
+from game.middleware import SamplingProfilerMiddleware
+
+
+@override_settings(BLACKJACK_HISTORY={'ASYNC': False})
+class ProfilingTestCase(TestCase):
+    """Test cases for the sampling profiler."""
+
+    def setUp(self):
+        """Use a fresh profile directory and log in as staff."""
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        settings_override = override_settings(BLACKJACK_PROFILE_DIR=self.directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Read the sample rate on every request
+        patcher = mock.patch.object(profiling, 'CHECK_INTERVAL', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        User.objects.create_user('staff', password='secret', is_staff=True)
+        self.client.login(username='staff', password='secret')
+
+    def test_rate_round_trip(self):
+        """Test that the sample rate is stored and turned off."""
+        self.assertEqual(profiling.get_rate(), 0.0)
+        profiling.set_rate(0.25)
+        self.assertEqual(profiling.get_rate(), 0.25)
+        profiling.set_rate(0)
+        self.assertEqual(profiling.get_rate(), 0.0)
+
+    def test_invalid_rate(self):
+        """Test that a rate outside 0-1 is rejected."""
+        with self.assertRaises(ValueError):
+            profiling.set_rate(2)
+
+    def test_no_profiles_when_off(self):
+        """Test that nothing is profiled until a rate is set."""
+        self.client.post(reverse('new_game'))
+        self.client.get(reverse('game_state'))
+
+        self.assertEqual(profiling.dump_paths(), [])
+
+    def test_sampled_requests_are_profiled(self):
+        """Test that profiled views are dumped and can be downloaded."""
+        response = self.client.post(reverse('profile'), {'rate': '1'})
+        self.assertEqual(response.json()['rate'], 1.0)
+
+        self.client.post(reverse('new_game'))
+        self.client.get(reverse('game_state'))
+
+        self.assertEqual(len(profiling.dump_paths()), 1)
+        download = self.client.get(reverse('profile_download'))
+        self.assertEqual(download.status_code, 200)
+        functions = {func[2] for func in marshal.loads(download.content)}
+        self.assertIn('game_state', functions)
+        self.assertIn('from_session', functions)
+
+    def test_collapsed_stacks(self):
+        """Test the flamegraph output lists stacks with microsecond counts."""
+        profiling.set_rate(1)
+        self.client.post(reverse('new_game'))
+
+        response = self.client.get(reverse('profile_download'), {'format': 'collapsed'})
+
+        lines = response.content.decode().splitlines()
+        self.assertTrue(lines)
+        stack, micros = lines[0].rsplit(' ', 1)
+        self.assertGreater(int(micros), 0)
+        self.assertTrue(any('new_game' in line for line in lines))
+
+    def test_clear_profiles(self):
+        """Test that clearing removes the collected dumps."""
+        profiling.set_rate(1)
+        self.client.post(reverse('new_game'))
+
+        self.client.post(reverse('profile'), {'rate': '0', 'clear': '1'})
+
+        self.assertEqual(profiling.dump_paths(), [])
+        self.assertEqual(self.client.get(reverse('profile_download')).status_code, 404)
+
+    def test_merged_stats_combine_workers(self):
+        """Test that dumps from several workers are merged."""
+        for worker in (1, 2):
+            profiler = cProfile.Profile()
+            profiler.runcall(sum, range(10))
+            pstats.Stats(profiler).dump_stats(f"{self.directory}/{worker}.prof")
+
+        stats = profiling.merged_stats()
+
+        calls = [value[1] for func, value in stats.stats.items()
+                 if func[2] == '<built-in method builtins.sum>']
+        self.assertEqual(calls, [2])
+
+    def test_endpoints_require_staff(self):
+        """Test that players can't change profiling."""
+        self.client.logout()
+        response = self.client.post(reverse('profile'), {'rate': '1'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(profiling.get_rate(), 0.0)
+
+    def test_async_process_view_stays_on_event_loop(self):
+        """Test that under ASGI process_view runs as a coroutine and only profiles sync views."""
+        async def get_response(request):
+            return HttpResponse()
+
+        async def view(request):
+            return HttpResponse()
+
+        middleware = SamplingProfilerMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware.process_view))
+        # Django would otherwise wrap it in sync_to_async for every request
+        self.assertIs(BaseHandler().adapt_method_mode(True, middleware.process_view),
+                      middleware.process_view)
+
+        profiling.set_rate(1)
+        request = RequestFactory().get(reverse('game_state'))
+        request.resolver_match = resolve(reverse('game_state'))
+        self.assertIsNone(async_to_sync(middleware.process_view)(request, view, (), {}))
+        self.assertEqual(profiling.dump_paths(), [])
+
+        # A sampled sync view is still profiled, in the sync thread
+        response = async_to_sync(middleware.process_view)(
+            request, lambda request: HttpResponse('profiled'), (), {})
+        self.assertEqual(response.content, b'profiled')
+        self.assertEqual(len(profiling.dump_paths()), 1)
@@ -0,0 +1,74 @@
+import json
+from django.test import TestCase, override_settings
+from game.pubsub import InProcessBroker, get_broker, state_event
+
+
+class InProcessBrokerTestCase(TestCase):
+    """Test cases for the in-process broker."""
+
+    def setUp(self):
+        """Set up a broker."""
+        self.broker = InProcessBroker()
+
+    async def test_publish_reaches_subscribers(self):
+        """Test that every subscriber of a channel gets a published message."""
+        first = self.broker.subscribe('game')
+        second = self.broker.subscribe('game')
+
+        self.broker.publish('game', 'hello')
+
+        self.assertEqual(await first.get(1), 'hello')
+        self.assertEqual(await second.get(1), 'hello')
+
+    async def test_publish_only_reaches_channel(self):
+        """Test that subscribers don't get messages for other channels."""
+        subscription = self.broker.subscribe('game')
+
+        self.broker.publish('other', 'hello')
+
+        self.assertIsNone(await subscription.get(0.01))
+
+    async def test_close_unsubscribes(self):
+        """Test that a closed subscription is removed from its channel."""
+        subscription = self.broker.subscribe('game')
+        self.assertEqual(self.broker.subscriber_count('game'), 1)
+
+        subscription.close()
+
+        self.assertEqual(self.broker.subscriber_count('game'), 0)
+
+    async def test_slow_subscriber_keeps_latest(self):
+        """Test that a full queue drops its oldest messages."""
+        subscription = self.broker.subscribe('game')
+
+        for number in range(20):
+            self.broker.publish('game', number)
+        received = []
+        while (message := await subscription.get(0.01)) is not None:
+            received.append(message)
+
+        self.assertEqual(received, list(range(4, 20)))
+
+    def test_publish_without_subscribers(self):
+        """Test that publishing to an empty channel does nothing."""
+        self.broker.publish('game', 'hello')
+        self.assertEqual(self.broker.subscriber_count('game'), 0)
+
+    def test_state_event_format(self):
+        """Test that a state is formatted as a server-sent event."""
+        event = state_event({'version': 3, 'game_over': False})
+
+        lines = event.split('\n')
+        self.assertEqual(lines[0], 'id: 3')
+        self.assertEqual(lines[1], 'event: state')
+        self.assertEqual(json.loads(lines[2][len('data: '):]), {'version': 3, 'game_over': False})
+        self.assertTrue(event.endswith('\n\n'))
+
+    @override_settings(BLACKJACK_BROKER='game.tests.test_pubsub.RecordingBroker')
+    def test_broker_is_configurable(self):
+        """Test that the broker class comes from settings."""
+        self.assertIsInstance(get_broker(), RecordingBroker)
+
+
+class RecordingBroker(InProcessBroker):
+    """Broker used to check the broker setting."""
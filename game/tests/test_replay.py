@@ -0,0 +1,90 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from game.game_logic import codec, events
+from game.game_logic.card import Card
+from game.game_store import get_game_store
+from game.models import GameEvent, HandHistory
+from game.replay import replay_game
+
+
+@override_settings(BLACKJACK_HISTORY={'ASYNC': False})
+class ReplayTestCase(TestCase):
+    """Test cases for replaying stored games."""
+
+    def play_rounds(self, count):
+        """Play rounds through the views, standing on every hand, and return the game id."""
+        for _ in range(count):
+            self.client.post(reverse('new_game'))
+            while not self.client.get(reverse('game_state')).json()['game_over']:
+                self.client.post(reverse('stand'))
+        get_game_store().flush()
+        return self.client.session['game_id']
+
+    def test_rounds_replay_to_recorded_results(self):
+        """Test that every played round replays to its recorded result."""
+        game_id = self.play_rounds(3)
+
+        rounds = replay_game(game_id)
+
+        self.assertEqual(len(rounds), 3)
+        for replay in rounds:
+            self.assertTrue(replay.ok, replay.problems)
+            self.assertIsNotNone(replay.result)
+            self.assertEqual(replay.result, replay.recorded_result)
+        self.assertEqual(HandHistory.objects.filter(game_id=game_id).count(), 3)
+
+    def test_tampered_card_is_reported(self):
+        """Test that a recorded card the deck wouldn't deal is reported."""
+        game_id = None
+        while not GameEvent.objects.exclude(kind=events.DEAL).exists():
+            GameEvent.objects.all().delete()
+            game_id = self.play_rounds(1)
+        row = GameEvent.objects.exclude(kind=events.DEAL).first()
+        cards = codec.decode_cards(bytes(row.cards))
+        replacement = Card('Hearts', '2') if cards != [Card('Hearts', '2')] else Card('Hearts', '3')
+        row.cards = codec.encode_cards([replacement])
+        row.save()
+
+        (replay,) = replay_game(game_id)
+
+        self.assertFalse(replay.ok)
+        self.assertIn(f"v{row.version}", replay.problems[0])
+
+    def test_tampered_result_is_reported(self):
+        """Test that a hand history that disagrees with the replay is reported."""
+        game_id = self.play_rounds(1)
+        HandHistory.objects.update(result='player_blackjack' if HandHistory.objects.get().result
+                                   != 'player_blackjack' else 'push')
+
+        (replay,) = replay_game(game_id)
+
+        self.assertFalse(replay.ok)
+        self.assertIn('Recorded result', replay.problems[0])
+
+    def test_command_reports_rounds(self):
+        """Test that the command replays every game and lists its rounds."""
+        self.play_rounds(2)
+        out = StringIO()
+
+        call_command('replay_game', '--all', '--json', stdout=out)
+
+        rounds = json.loads(out.getvalue())
+        self.assertEqual(len(rounds), 2)
+        self.assertTrue(all(not replay['problems'] for replay in rounds))
+
+    def test_command_fails_on_mismatch(self):
+        """Test that the command exits with an error when a round doesn't replay."""
+        game_id = self.play_rounds(1)
+        HandHistory.objects.update(result='not_a_result')
+
+        with self.assertRaises(CommandError):
+            call_command('replay_game', game_id, stdout=StringIO())
+
+    def test_command_rejects_unknown_game(self):
+        """Test that replaying a game without events is an error."""
+        with self.assertRaises(CommandError):
+            call_command('replay_game', 'missing', stdout=StringIO())
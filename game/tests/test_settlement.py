@@ -0,0 +1,92 @@
+from django.test import TestCase
+from game.game_logic import settlement
+from game.game_logic.card import Card
+from game.game_logic.constants import RESULTS
+from game.game_logic.game import BlackjackGame
+
+
+class SettlementTestCase(TestCase):
+    """Test cases for settling rounds with outcome codes."""
+
+    def test_hand_outcomes(self):
+        """Test that a hand is compared with the dealer in the game's order."""
+        self.assertEqual(settlement.hand_outcome(22, 23, True, True), settlement.PLAYER_BUST)
+        self.assertEqual(settlement.hand_outcome(12, 23, False, True), settlement.DEALER_BUST)
+        self.assertEqual(settlement.hand_outcome(20, 18, False, False), settlement.PLAYER_WINS)
+        self.assertEqual(settlement.hand_outcome(17, 18, False, False), settlement.DEALER_WINS)
+        self.assertEqual(settlement.hand_outcome(18, 18, False, False), settlement.PUSH)
+
+    def test_natural_outcomes(self):
+        """Test that naturals on the deal settle the round."""
+        self.assertEqual(settlement.natural_outcome(True, True), settlement.PUSH)
+        self.assertEqual(settlement.natural_outcome(True, False), settlement.PLAYER_BLACKJACK)
+        self.assertEqual(settlement.natural_outcome(False, True), settlement.DEALER_BLACKJACK)
+        self.assertEqual(settlement.natural_outcome(False, False), settlement.NO_RESULT)
+
+    def test_single_hand_round(self):
+        """Test that a round with one hand has that hand's result."""
+        self.assertEqual(settlement.round_result([settlement.DEALER_BUST]), settlement.DEALER_BUST)
+
+    def test_split_combinations(self):
+        """Test every combination of two hands, including two dealer wins."""
+        cases = {
+            (settlement.PLAYER_WINS, settlement.DEALER_BUST): 'both_win',
+            (settlement.DEALER_WINS, settlement.DEALER_WINS): 'both_lose',
+            (settlement.DEALER_WINS, settlement.PLAYER_BUST): 'both_lose',
+            (settlement.PUSH, settlement.PUSH): 'both_push',
+            (settlement.DEALER_WINS, settlement.PLAYER_WINS): 'win_and_lose',
+            (settlement.PUSH, settlement.PLAYER_WINS): 'win_and_push',
+            (settlement.DEALER_WINS, settlement.PUSH): 'lose_and_push',
+        }
+        for outcomes, result in cases.items():
+            self.assertEqual(RESULTS[settlement.round_result(outcomes)], result)
+            self.assertEqual(RESULTS[settlement.round_result(outcomes[::-1])], result)
+
+    def test_any_number_of_hands(self):
+        """Test that more hands combine with the same table."""
+        outcomes = [settlement.PLAYER_WINS, settlement.PUSH, settlement.DEALER_BUST]
+
+        self.assertEqual(settlement.round_result(outcomes), settlement.WIN_AND_PUSH)
+        self.assertEqual(settlement.net_units(outcomes), 2)
+
+    def test_payouts(self):
+        """Test even money, 3:2 blackjack and pushes, with a custom blackjack payout."""
+        self.assertEqual(settlement.PAYOUTS[settlement.PLAYER_WINS], 1)
+        self.assertEqual(settlement.PAYOUTS[settlement.PLAYER_BLACKJACK], 1.5)
+        self.assertEqual(settlement.PAYOUTS[settlement.PUSH], 0)
+        self.assertEqual(settlement.PAYOUTS[settlement.DEALER_BLACKJACK], -1)
+        self.assertIsNone(settlement.PAYOUTS[settlement.BOTH_WIN])
+        self.assertEqual(settlement.payout_table(1.2)[settlement.PLAYER_BLACKJACK], 1.2)
+
+    def test_round_payouts(self):
+        """Test that split results pay the sum of their hands."""
+        self.assertEqual(settlement.ROUND_PAYOUTS[settlement.BOTH_WIN], 2)
+        self.assertEqual(settlement.ROUND_PAYOUTS[settlement.BOTH_LOSE], -2)
+        self.assertEqual(settlement.ROUND_PAYOUTS[settlement.WIN_AND_LOSE], 0)
+        self.assertEqual(settlement.ROUND_PAYOUTS[settlement.LOSE_AND_PUSH], -1)
+        self.assertIsNone(settlement.ROUND_PAYOUTS[settlement.NO_RESULT])
+
+    def test_chips_returned(self):
+        """Test that stakes come back with winnings and half chips round down."""
+        self.assertEqual(settlement.chips_returned(settlement.PLAYER_WINS, 10), 20)
+        self.assertEqual(settlement.chips_returned(settlement.PUSH, 10), 10)
+        self.assertEqual(settlement.chips_returned(settlement.DEALER_WINS, 10), 0)
+        self.assertEqual(settlement.chips_returned(settlement.PLAYER_BLACKJACK, 5), 12)
+        self.assertEqual(settlement.chips_returned(settlement.WIN_AND_PUSH, 10, hands=2), 30)
+        self.assertEqual(settlement.chips_returned(settlement.BOTH_LOSE, 10, hands=2), 0)
+
+    def test_game_split_hands_both_losing(self):
+        """Test that a split where the dealer beats both hands is both_lose."""
+        game = BlackjackGame()
+        game.player_hand.add_card(Card('Hearts', '8'))
+        game.player_hand.add_card(Card('Spades', '8'))
+        game.dealer_hand.add_card(Card('Diamonds', '10'))
+        game.dealer_hand.add_card(Card('Clubs', '10'))
+        game.deck.cards = [Card('Clubs', '2'), Card('Hearts', '3')]
+
+        game.player_split()
+        game.player_stand()
+        game.player_stand()
+
+        self.assertEqual(game.result, 'both_lose')
+        self.assertEqual(game.get_game_state()['result_message'], 'You lost both hands.')
@@ -0,0 +1,82 @@
+from collections import Counter
+from django.test import TestCase
+from game.game_logic.shoe import Shoe
+from game.game_logic.card import CARDS
+
+
+class ShoeTestCase(TestCase):
+    """Test cases for the Shoe class."""
+
+    def test_shoe_initialization(self):
+        """Test that a shoe holds every card once per deck."""
+        shoe = Shoe(6)
+        self.assertEqual(len(shoe.cards), 312)
+        self.assertEqual(Counter(shoe.cards), Counter({card: 6 for card in CARDS}))
+
+    def test_cut_card_position(self):
+        """Test the cut card is placed by penetration."""
+        shoe = Shoe(8, penetration=0.75)
+        self.assertEqual(shoe.cut_card, 312)
+
+    def test_invalid_configuration(self):
+        """Test that bad deck counts and penetration are rejected."""
+        with self.assertRaises(ValueError):
+            Shoe(0)
+        with self.assertRaises(ValueError):
+            Shoe(6, penetration=1.5)
+
+    def test_needs_shuffle_at_cut_card(self):
+        """Test that the shoe only needs a shuffle once the cut card is reached."""
+        shoe = Shoe(2, penetration=0.5)
+        self.assertTrue(shoe.needs_shuffle())
+
+        shoe.shuffle()
+        for _ in range(51):
+            shoe.deal()
+        self.assertFalse(shoe.needs_shuffle())
+
+        shoe.deal()
+        self.assertTrue(shoe.needs_shuffle())
+
+    def test_round_cards_needed(self):
+        """Test the most cards a round could take from a full deck and a low one."""
+        self.assertEqual(Shoe(1).round_cards_needed(), 22)
+
+        shoe = Shoe(1)
+        shoe.cards = [card for card in CARDS if card.rank in ('K', 'A')]
+        # Four aces and four kings: 4 + 4 cards, within the hard total
+        self.assertEqual(shoe.round_cards_needed(), 11)
+
+    def test_needs_shuffle_before_cards_run_short(self):
+        """Test that a deep cut card still leaves enough cards to finish a round."""
+        shoe = Shoe(1, penetration=0.95)
+        shoe.shuffle(7)
+        while shoe.cards_remaining() >= shoe.round_cards_needed():
+            self.assertFalse(shoe.needs_shuffle())
+            shoe.deal()
+
+        self.assertLess(shoe.size - shoe.cards_remaining(), shoe.cut_card)
+        self.assertTrue(shoe.needs_shuffle())
+
+    def test_shuffled_shoe_has_all_cards(self):
+        """Test that shuffling keeps the full multi-deck composition."""
+        shoe = Shoe(6)
+        shoe.shuffle()
+        dealt = Counter(shoe.deal() for _ in range(312))
+        self.assertEqual(dealt, Counter({card: 6 for card in CARDS}))
+
+    def test_shoe_serialization(self):
+        """Test shoe serialization and deserialization."""
+        shoe = Shoe(6, penetration=0.8)
+        shoe.shuffle()
+        for _ in range(100):
+            shoe.deal()
+
+        shoe_dict = shoe.to_dict()
+        restored_shoe = Shoe.from_dict(shoe_dict)
+
+        self.assertEqual(restored_shoe.num_decks, 6)
+        self.assertEqual(restored_shoe.cut_card, shoe.cut_card)
+        self.assertEqual(restored_shoe.cards_remaining(), 212)
+        self.assertEqual([restored_shoe.deal() for _ in range(212)],
+                         [shoe.deal() for _ in range(212)])
@@ -0,0 +1,134 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from game.game_logic.simulation import (
+    simulate, simulate_parallel, play_round, chunk_seed, Rules, PAYOUTS
+)
+from game.management.commands.simulate import parse_count
+from game.game_logic.game import BlackjackGame
+from game.game_logic.shoe import Shoe
+
+
+def always_split_strategy(hand, dealer_card, can_split):
+    """Split every pair, otherwise stand on 12 or more."""
+    if can_split:
+        return 'split'
+    return 'hit' if hand.get_value() < 12 else 'stand'
+
+
+class SimulationTestCase(TestCase):
+    """Test cases for the headless simulator."""
+
+    def test_simulate_counts_every_hand(self):
+        """Test that every round is recorded once."""
+        result = simulate(500, seed=1)
+
+        self.assertEqual(result.hands, 500)
+        self.assertEqual(sum(result.outcomes.values()), 500)
+
+    def test_simulate_with_deep_single_deck(self):
+        """Test that a single deck dealt nearly to the end never runs out mid-round."""
+        result = simulate(5000, strategy=always_split_strategy, seed=3, rules=Rules(1, 0.95))
+
+        self.assertEqual(result.hands, 5000)
+
+    def test_simulate_is_reproducible(self):
+        """Test that the same seed produces the same results."""
+        first = simulate(300, strategy=always_split_strategy, seed=42)
+        second = simulate(300, strategy=always_split_strategy, seed=42)
+
+        self.assertEqual(first.to_dict(), second.to_dict())
+
+    def test_net_units_match_payouts(self):
+        """Test that net units are the sum of payouts for each outcome."""
+        rules = Rules(num_decks=2, blackjack_payout=1.2)
+        result = simulate(1000, strategy=always_split_strategy, rules=rules, seed=3)
+
+        expected = sum(rules.payout(outcome) * count
+                       for outcome, count in result.outcomes.items())
+        self.assertAlmostEqual(result.net_units, expected)
+        self.assertAlmostEqual(result.house_edge, -expected / 1000)
+
+    def test_split_outcomes_are_recorded(self):
+        """Test that split results show up when the strategy splits."""
+        result = simulate(2000, strategy=always_split_strategy, seed=5)
+
+        split_results = {'both_win', 'both_lose', 'both_push',
+                         'win_and_lose', 'win_and_push', 'lose_and_push'}
+        self.assertTrue(split_results & set(result.outcomes))
+        self.assertTrue(set(result.outcomes) <= set(PAYOUTS))
+
+    def test_play_round_finishes_game(self):
+        """Test that a played round always ends with a result."""
+        game = BlackjackGame(Shoe(6))
+        result = play_round(game, lambda hand, dealer_card, can_split: 'stand')
+
+        self.assertTrue(game.game_over)
+        self.assertEqual(result, game.result)
+
+    def test_invalid_action_raises(self):
+        """Test that an unknown action is rejected."""
+        game = BlackjackGame(Shoe(6))
+        with self.assertRaises(ValueError):
+            while True:
+                play_round(game, lambda hand, dealer_card, can_split: 'double')
+
+    def test_merge_results(self):
+        """Test that merging adds the totals of two results."""
+        first = simulate(200, seed=1)
+        second = simulate(300, seed=2)
+
+        merged = simulate(200, seed=1).merge(second)
+
+        self.assertEqual(merged.hands, 500)
+        self.assertEqual(merged.outcomes, first.outcomes + second.outcomes)
+        self.assertAlmostEqual(merged.net_units, first.net_units + second.net_units)
+
+    def test_parallel_result_independent_of_workers(self):
+        """Test that a seeded parallel run is identical for any worker count."""
+        serial = simulate_parallel(1000, seed=9, workers=1, chunk_size=150)
+        parallel = simulate_parallel(1000, seed=9, workers=3, chunk_size=150)
+
+        self.assertEqual(serial.hands, 1000)
+        self.assertEqual(serial.to_dict(), parallel.to_dict())
+
+    def test_parallel_chunks_use_derived_seeds(self):
+        """Test that a parallel run is the merge of its seeded chunks."""
+        result = simulate_parallel(250, seed=4, workers=1, chunk_size=100)
+
+        expected = simulate(100, seed=chunk_seed(4, 0))
+        expected.merge(simulate(100, seed=chunk_seed(4, 1)))
+        expected.merge(simulate(50, seed=chunk_seed(4, 2)))
+        self.assertEqual(result.to_dict(), expected.to_dict())
+
+
+class SimulateCommandTestCase(TestCase):
+    """Test cases for the simulate management command."""
+
+    def test_parse_count(self):
+        """Test hand counts with suffixes."""
+        self.assertEqual(parse_count('500'), 500)
+        self.assertEqual(parse_count('10M'), 10_000_000)
+        self.assertEqual(parse_count('2.5k'), 2500)
+        with self.assertRaises(CommandError):
+            parse_count('lots')
+
+    def test_command_reports_json(self):
+        """Test the command runs a seeded simulation and prints JSON."""
+        out = StringIO()
+        call_command('simulate', hands='2K', workers=1, seed=3, strategy='dealer',
+                     json=True, stdout=out)
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['hands'], 2000)
+        self.assertEqual(report['seed'], 3)
+        self.assertEqual(report['outcomes'],
+                         simulate_parallel(2000, seed=3, workers=1).to_dict()['outcomes'])
+
+    def test_command_rejects_bad_rules(self):
+        """Test that impossible table rules are a command error, not a worker traceback."""
+        for options in ({'decks': 0}, {'penetration': 1.5}, {'blackjack_payout': -1}):
+            with self.assertRaises(CommandError):
+                call_command('simulate', hands='10', workers=1, stdout=StringIO(), **options)
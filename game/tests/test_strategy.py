@@ -0,0 +1,57 @@
+import json
+from django.test import TestCase
+from game.game_logic.card import Card
+from game.game_logic.hand import Hand
+from game.game_logic import strategy
+
+
+def make_hand(*ranks):
+    """Build a hand from ranks."""
+    hand = Hand()
+    for rank in ranks:
+        hand.add_card(Card('Spades', rank))
+    return hand
+
+
+class StrategyTestCase(TestCase):
+    """Test cases for the basic strategy table."""
+
+    def test_stored_table_matches_rules(self):
+        """Test the stored table is what build_strategy_table produces."""
+        with open(strategy.TABLE_PATH) as handle:
+            stored = json.load(handle)
+
+        self.assertEqual(stored, strategy.build_strategy_table(stored['num_decks']))
+
+    def test_table_shape(self):
+        """Test every row has one action per dealer upcard."""
+        for total in range(4, 22):
+            self.assertEqual(len(strategy.HARD[total]), 10)
+        for total in range(12, 22):
+            self.assertEqual(len(strategy.SOFT[total]), 10)
+        self.assertEqual(len(strategy.PAIRS), 10)
+
+    def test_hard_hints(self):
+        """Test well known hard total decisions."""
+        self.assertEqual(strategy.hint(make_hand('10', '6'), Card('Hearts', '6')), 'stand')
+        self.assertEqual(strategy.hint(make_hand('10', '6'), Card('Hearts', '10')), 'hit')
+        self.assertEqual(strategy.hint(make_hand('10', '2'), Card('Hearts', '2')), 'hit')
+        self.assertEqual(strategy.hint(make_hand('10', '7'), Card('Hearts', 'A')), 'stand')
+
+    def test_soft_hints(self):
+        """Test well known soft total decisions."""
+        self.assertEqual(strategy.hint(make_hand('A', '7'), Card('Hearts', '8')), 'stand')
+        self.assertEqual(strategy.hint(make_hand('A', '7'), Card('Hearts', '9')), 'hit')
+        self.assertEqual(strategy.hint(make_hand('A', '6'), Card('Hearts', '6')), 'hit')
+
+    def test_pair_hints(self):
+        """Test pairs are split only when allowed and recommended."""
+        self.assertEqual(strategy.hint(make_hand('8', '8'), Card('Hearts', '10'), True), 'split')
+        self.assertEqual(strategy.hint(make_hand('A', 'A'), Card('Hearts', '6'), True), 'split')
+        self.assertEqual(strategy.hint(make_hand('K', 'K'), Card('Hearts', '6'), True), 'stand')
+        self.assertEqual(strategy.hint(make_hand('8', '8'), Card('Hearts', '10'), False), 'hit')
+
+    def test_finished_hands(self):
+        """Test 21 stands and a bust hand has no hint."""
+        self.assertEqual(strategy.hint(make_hand('10', '5', '6'), Card('Hearts', '6')), 'stand')
+        self.assertIsNone(strategy.hint(make_hand('10', '5', '8'), Card('Hearts', '6')))
@@ -0,0 +1,111 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from game.game_logic import timing
+from game.game_logic.game import BlackjackGame
+from game.middleware import STATS, server_timing
+
+
+class TimingTestCase(TestCase):
+    """Test cases for the timing hooks."""
+
+    def test_hooks_do_nothing_outside_request(self):
+        """Test that timed blocks run without a collector."""
+        with timing.timed('phase'):
+            value = 1
+        timing.record_size('state', 10)
+        self.assertEqual(value, 1)
+
+    def test_hooks_record_into_collector(self):
+        """Test that phases and sizes are recorded while collecting."""
+        timings, token = timing.start()
+        try:
+            game = BlackjackGame()
+            game.start_new_game()
+            BlackjackGame.from_session(game.to_session())
+        finally:
+            timing.stop(token)
+
+        self.assertIn('encode', timings.phases)
+        self.assertIn('decode', timings.phases)
+        self.assertEqual(timings.sizes['state'], len(game.to_session()))
+
+    def test_repeated_phase_accumulates(self):
+        """Test that a phase timed twice adds up."""
+        timings = timing.Timings()
+        timings.add('load', 0.25)
+        timings.add('load', 0.5)
+        self.assertEqual(timings.phases['load'], 0.75)
+
+    def test_server_timing_header(self):
+        """Test the Server-Timing header format."""
+        timings = timing.Timings()
+        timings.add('load', 0.0015)
+        timings.size('state', 120)
+
+        self.assertEqual(server_timing(timings), 'load;dur=1.500, state-bytes;desc="120"')
+
+
+class HistogramTestCase(TestCase):
+    """Test cases for the latency histogram."""
+
+    def test_percentiles_within_bucket(self):
+        """Test that percentiles are within one bucket of the true value."""
+        histogram = timing.Histogram(1e-6, 60)
+        for millis in range(1, 101):
+            histogram.add(millis / 1000)
+
+        self.assertAlmostEqual(histogram.percentile(50), 0.050, delta=0.050 * 0.2)
+        self.assertAlmostEqual(histogram.percentile(95), 0.095, delta=0.095 * 0.2)
+        self.assertAlmostEqual(histogram.percentile(99), 0.099, delta=0.099 * 0.2)
+        self.assertEqual(histogram.count, 100)
+
+    def test_percentile_never_exceeds_max(self):
+        """Test that a percentile is capped at the largest value seen."""
+        histogram = timing.Histogram(1e-6, 60)
+        histogram.add(0.0101)
+        self.assertEqual(histogram.percentile(99), 0.0101)
+
+    def test_empty_histogram(self):
+        """Test that an empty histogram has no percentiles."""
+        histogram = timing.Histogram(1e-6, 60)
+        self.assertIsNone(histogram.percentile(50))
+        self.assertIsNone(histogram.summary()['mean'])
+
+
+@override_settings(BLACKJACK_HISTORY={'ASYNC': False})
+class TimingMiddlewareTestCase(TestCase):
+    """Test cases for the timing middleware and endpoint."""
+
+    def setUp(self):
+        """Start from empty statistics."""
+        STATS.reset()
+
+    def test_response_has_server_timing(self):
+        """Test that responses report phase timings and sizes."""
+        self.client.post(reverse('new_game'))
+
+        response = self.client.get(reverse('game_state'))
+
+        header = response['Server-Timing']
+        for metric in ('session;dur=', 'load;dur=', 'decode;dur=', 'total;dur=', 'state-bytes'):
+            self.assertIn(metric, header)
+
+    def test_requests_are_aggregated_per_view(self):
+        """Test that the endpoint reports timings by view."""
+        User.objects.create_user('staff', password='secret', is_staff=True)
+        self.client.login(username='staff', password='secret')
+        self.client.post(reverse('new_game'))
+        self.client.get(reverse('game_state'))
+        self.client.get(reverse('game_state'))
+
+        data = self.client.get(reverse('timings')).json()
+
+        self.assertEqual(data['game_state']['ms']['total']['count'], 2)
+        self.assertIn('p99', data['game_state']['ms']['decode'])
+        self.assertIn('state', data['new_game']['bytes'])
+
+    def test_endpoint_requires_staff(self):
+        """Test that timings are hidden from players."""
+        response = self.client.get(reverse('timings'))
+        self.assertEqual(response.status_code, 302)
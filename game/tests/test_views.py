@@ -1,13 +1,32 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
+from game.game_logic.game import BlackjackGame
+from game.game_store import get_game_store, GameConflict
  
  
+@override_settings(BLACKJACK_HISTORY={'ASYNC': False})
 class ViewsTestCase(TestCase):
     """Test cases for Django views."""
    
     def setUp(self):
         """Set up test client."""
         self.client = Client()
+
+    def tearDown(self):
+        """Write queued games while the test database still exists."""
+        get_game_store().flush()
+
+    def start_playable_game(self):
+        """Start new games until one isn't decided by a natural."""
+        while True:
+            self.client.post(reverse('new_game'))
+            state = self.client.get(reverse('game_state')).json()
+            if not state['game_over']:
+                return state
+
+    def stored_game(self):
+        """Load the session's game from the game store."""
+        return get_game_store().load(self.client.session['game_id'])
    
     def test_index_redirects_without_game(self):
         """Test that index redirects to new_game when no game exists."""
@@ -21,8 +40,9 @@ class ViewsTestCase(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertRedirects(response, reverse('index'))
        
-        # Check session has game state
-        self.assertIn('game_state', self.client.session)
+        # Check session has a stored game
+        self.assertIn('game_id', self.client.session)
+        self.assertIsNotNone(self.stored_game())
    
     def test_index_displays_game(self):
         """Test that index displays game after creation."""
@@ -96,3 +116,169 @@ class ViewsTestCase(TestCase):
         data = response.json()
         self.assertIn('player_hand', data)
         self.assertIn('dealer_hand', data)
+
+    def test_index_reads_legacy_dict_state(self):
+        """Test that a game stored in the older dict format still loads."""
+        game = BlackjackGame()
+        game.start_new_game()
+        session = self.client.session
+        session['game_state'] = game.to_dict()
+        session.save()
+
+        response = self.client.get(reverse('index'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['game_state'], game.get_game_state())
+
+    def test_legacy_state_moves_to_store(self):
+        """Test that saving a legacy session game moves it into the store."""
+        game = BlackjackGame()
+        game.start_new_game()
+        session = self.client.session
+        session['game_state'] = game.to_dict()
+        session.save()
+
+        self.client.post(reverse('new_game'))
+
+        self.assertNotIn('game_state', self.client.session)
+        self.assertIsNotNone(self.stored_game())
+
+    def legacy_playable_game(self):
+        """Store a game that can still be hit or stood on in the older session format."""
+        game = BlackjackGame()
+        game.start_new_game()
+        while game.game_over:
+            game.start_new_game()
+        session = self.client.session
+        session['game_state'] = game.to_session()
+        session.save()
+        return game
+
+    def test_legacy_game_survives_first_action(self):
+        """Test that a legacy game hit or stood on loads back from the store."""
+        for action in ('hit', 'stand'):
+            with self.subTest(action=action):
+                self.client = Client()
+                self.legacy_playable_game()
+
+                self.assertEqual(self.client.post(reverse(action)).status_code, 200)
+
+                response = self.client.get(reverse('game_state'))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['version'], self.stored_game().version)
+
+    @override_settings(BLACKJACK_GAME_STORE={'CACHE': None},
+                       SESSION_ENGINE='django.contrib.sessions.backends.db')
+    def test_legacy_game_moves_to_database(self):
+        """Test that a legacy game's first action is saved without a cache."""
+        game = self.legacy_playable_game()
+
+        response = self.client.post(reverse('stand'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stored_game().version, game.version + 1)
+
+    def test_new_game_keeps_shoe(self):
+        """Test that consecutive games deal from the same shoe."""
+        self.client.post(reverse('new_game'))
+        first = self.stored_game()
+
+        self.client.post(reverse('new_game'))
+        second = self.stored_game()
+
+        self.assertEqual(second.deck.num_decks, 6)
+        self.assertEqual(second.deck.seed, first.deck.seed)
+        self.assertLess(second.deck.cards_remaining(), first.deck.cards_remaining())
+
+    def test_hint_endpoint(self):
+        """Test the hint endpoint matches the game state hint."""
+        self.client.post(reverse('new_game'))
+
+        response = self.client.get(reverse('hint'))
+
+        self.assertEqual(response.status_code, 200)
+        game = self.stored_game()
+        self.assertEqual(response.json(), {'hint': game.get_hint()})
+
+    def test_hint_without_game(self):
+        """Test that asking for a hint without a game returns error."""
+        response = self.client.get(reverse('hint'))
+        self.assertEqual(response.status_code, 400)
+
+    def test_action_returns_delta_for_current_version(self):
+        """Test that sending the current version gets only the changes back."""
+        state = self.start_playable_game()
+
+        response = self.client.post(reverse('stand'), HTTP_X_GAME_VERSION=str(state['version']))
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['base_version'], state['version'])
+        self.assertEqual(data['version'], state['version'] + 1)
+        self.assertTrue(data['changes']['game_over'])
+        self.assertNotIn('player_hand', data['changes'])
+
+    def test_action_returns_full_state_for_stale_version(self):
+        """Test that a mismatched version falls back to the full state."""
+        state = self.start_playable_game()
+
+        response = self.client.post(reverse('stand'), HTTP_X_GAME_VERSION='0')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('player_hand', response.json())
+
+    def test_concurrent_action_conflicts(self):
+        """Test that an action on a game changed since it was loaded is rejected."""
+        self.start_playable_game()
+        store = get_game_store()
+        game_id = self.client.session['game_id']
+        stale = store.load(game_id)
+
+        self.client.post(reverse('stand'))
+        base_version = stale.version
+        stale.player_hit()
+
+        with self.assertRaises(GameConflict):
+            store.save(game_id, stale, base_version)
+
+    @override_settings(BLACKJACK_GAME_STORE={'CACHE': None},
+                       SESSION_ENGINE='django.contrib.sessions.backends.db')
+    def test_play_without_cache(self):
+        """Test that a round plays with games and sessions kept in the database."""
+        self.start_playable_game()
+
+        response = self.client.post(reverse('stand'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.stored_game().game_over)
+        self.assertEqual(get_game_store().pending_count(), 0)
+
+    def test_conflicting_request_returns_current_state(self):
+        """Test that a request losing the race gets a 409 with the saved state."""
+        self.start_playable_game()
+        store = get_game_store()
+        game_id = self.client.session['game_id']
+        version = store.load(game_id).version
+        # Another request already saved from this version
+        store.cache.add(store._claim_key(game_id, version), version + 1)
+
+        response = self.client.post(reverse('hit'))
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['state']['version'], version)
+
+    def test_events_need_asgi(self):
+        """Test that the event stream refuses to run under WSGI."""
+        self.client.post(reverse('new_game'))
+
+        response = self.client.get(reverse('game_events'))
+
+        self.assertEqual(response.status_code, 501)
+
+    def test_index_sets_csrf_cookie(self):
+        """Test that the page sets the CSRF cookie its actions post with."""
+        self.start_playable_game()
+
+        response = self.client.get(reverse('index'))
+
+        self.assertIn('csrftoken', response.cookies)
@@ -1,11 +1,26 @@
+from django.conf import settings
 from django.urls import path
-from . import views
- 
-urlpatterns = [
-    path('', views.index, name='index'),
-    path('new/', views.new_game, name='new_game'),
-    path('hit/', views.hit, name='hit'),
-    path('stand/', views.stand, name='stand'),
-    path('split/', views.split, name='split'),
-    path('state/', views.game_state, name='game_state'),
-]
\ No newline at end of file
+from . import views, async_views
+
+
+def game_patterns(actions):
+    """URL patterns taking the index, action and state views from actions."""
+    return [
+        path('', actions.index, name='index'),
+        path('new/', views.new_game, name='new_game'),
+        path('hit/', actions.hit, name='hit'),
+        path('stand/', actions.stand, name='stand'),
+        path('split/', actions.split, name='split'),
+        path('state/', actions.game_state, name='game_state'),
+        path('hint/', views.hint, name='hint'),
+        path('account/', views.account, name='account'),
+        path('events/', async_views.events, name='game_events'),
+        path('games/<str:game_id>/events/', async_views.events, name='watch_game'),
+        path('metrics/timings/', views.timings, name='timings'),
+        path('metrics/history/', views.history, name='history_metrics'),
+        path('metrics/profile/', views.profile, name='profile'),
+        path('metrics/profile/download/', views.profile_download, name='profile_download'),
+    ]
+
+
+urlpatterns = game_patterns(async_views if settings.BLACKJACK_ASYNC_VIEWS else views)
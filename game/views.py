@@ -1,32 +1,135 @@
+from django.conf import settings
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse
 from django.views.decorators.http import require_http_methods
+from django.views.decorators.csrf import ensure_csrf_cookie
+from django.contrib.admin.views.decorators import staff_member_required
 from .game_logic.game import BlackjackGame
+from .game_logic.shoe import Shoe
+from .game_logic.delta import diff_states
+from .game_logic import events
+from .game_store import (get_game_store, decode_game, GameConflict, SESSION_KEY,
+                         LEGACY_SESSION_KEY)
+from .pubsub import get_broker, state_event
+from .history import get_history_writer
+from .game_logic.timing import timed
+from .middleware import STATS
+from .models import LedgerEntry
+from . import bankroll, profiling
+import tempfile
 import json
  
  
 def get_or_create_game(request):
-    """Retrieve or create a game from session data."""
-    game_data = request.session.get('game_state')
-   
-    if game_data:
-        try:
-            return BlackjackGame.from_dict(game_data)
-        except Exception:
-            game = BlackjackGame()
-            game.start_new_game()
-            save_game(request, game)
-            return game
-   
-    return None
+    """Retrieve or create a game from the game store."""
+    with timed('session'):
+        game_id = request.session.get(SESSION_KEY)
+    try:
+        if game_id:
+            with timed('load'):
+                return get_game_store().load(game_id)
+        game_data = request.session.get(LEGACY_SESSION_KEY)
+        return decode_game(game_data) if game_data else None
+    except ValueError:
+        # Start over under a new id
+        request.session.pop(SESSION_KEY, None)
+        game = BlackjackGame(new_shoe())
+        save_game(request, game, game_events=events.deal(game))
+        return game
+ 
+ 
+def new_shoe():
+    """Create a shoe with this table's deck count and penetration."""
+    return Shoe(settings.BLACKJACK_NUM_DECKS, settings.BLACKJACK_PENETRATION)
+ 
  
+def get_account_id(request):
+    """Return the session's account id, opening an account if it has none."""
+    account_id = request.session.get(bankroll.ACCOUNT_SESSION_KEY)
+    if account_id is None:
+        account_id = bankroll.open_account().pk
+        request.session[bankroll.ACCOUNT_SESSION_KEY] = account_id
+    return account_id
+
+
+def account_balance(request):
+    """Return the session's account id and balance, reopening a closed account."""
+    account_id = get_account_id(request)
+    balance = bankroll.balance(account_id)
+    if balance is None:
+        request.session.pop(bankroll.ACCOUNT_SESSION_KEY)
+        account_id = get_account_id(request)
+        balance = bankroll.balance(account_id)
+    return account_id, balance
+
+
+def save_game(request, game, base_version=None, game_events=()):
+    """
+    Save game state to the game store, keeping only its id in the session,
+    publish it to the game's event stream, post the round's wagers and
+    record the round if it just finished. Pass the version the game was
+    loaded at to raise GameConflict if another request saved it first, and
+    the events of the change so only they need storing.
+    """
+    store = get_game_store()
+    game_id = request.session.get(SESSION_KEY)
+    if not game_id:
+        game_id = store.new_id()
+        request.session[SESSION_KEY] = game_id
+        request.session.pop(LEGACY_SESSION_KEY, None)
+        # Nothing is stored under a new id yet, so store the whole game
+        base_version = None
+    with timed('save'):
+        store.save(game_id, game, base_version, game_events)
+    with timed('publish'):
+        get_broker().publish(game_id, state_event(game.get_game_state()))
+    if game.bet:
+        with timed('ledger'):
+            bankroll.post_round(get_account_id(request), game_id, game, game_events)
+    if game.game_over:
+        with timed('history'):
+            get_history_writer().record(game_id, game)
+
+
+def insufficient_funds_response(balance):
+    """Respond to a wager the player's balance can't cover."""
+    return JsonResponse({'error': 'Insufficient balance', 'balance': balance}, status=400)
+
+
+def client_base_state(request, game):
+    """
+    Return the game state the client already holds, if it sent the current
+    version in the X-Game-Version header, so the response can be a delta.
+    """
+    if request.headers.get('X-Game-Version') == str(game.version):
+        return game.get_game_state()
+    return None
+
+
+def conflict_response(request):
+    """Respond to a conflicting action with the game state that won."""
+    game = get_or_create_game(request)
+    return JsonResponse({
+        'error': 'Game changed by another request',
+        'state': game.get_game_state() if game else None
+    }, status=409)
+
+
+def state_response(game, base_state=None):
+    """Respond with the changes since base_state, or the full state without one."""
+    with timed('respond'):
+        state = game.get_game_state()
+        if base_state is None:
+            return JsonResponse(state)
+        return JsonResponse({
+            'version': state['version'],
+            'base_version': base_state['version'],
+            'changes': diff_states(base_state, state)
+        })
  
-def save_game(request, game):
-    """Save game state to session."""
-    request.session['game_state'] = game.to_dict()
-    request.session.modified = True
  
 @require_http_methods(["GET"])
+@ensure_csrf_cookie
 def index(request):
     """Main game view."""
     game = get_or_create_game(request)
@@ -38,17 +141,48 @@ def index(request):
 
     context = {
         'game_state': game_state,
+        'balance': account_balance(request)[1],
     }
    
-    return render(request, 'game.html', context)
+    with timed('render'):
+        return render(request, 'game.html', context)
  
  
 @require_http_methods(["GET","POST"])
 def new_game(request):
-    """Start a new game."""
-    game = BlackjackGame()
-    game.start_new_game()
-    save_game(request, game)
+    """
+    Start a new game, dealing from the session's shoe, with the bet posted
+    or the default bet. Only the page's POST form, which is CSRF checked,
+    stakes chips: a GET (the index redirect, or a link or image elsewhere)
+    deals for nothing and leaves a round still in play alone.
+    """
+    game = get_or_create_game(request)
+    if request.method == 'GET':
+        if game and not game.game_over:
+            return redirect('index')
+        bet = 0
+    else:
+        balance = account_balance(request)[1]
+        try:
+            bet = bankroll.parse_bet(request.POST.get('bet'), balance)
+        except ValueError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        if bet > balance:
+            return insufficient_funds_response(balance)
+
+    base_version = game.version if game else None
+    if (not game or not isinstance(game.deck, Shoe)
+            or game.deck.num_decks != settings.BLACKJACK_NUM_DECKS):
+        game = BlackjackGame(new_shoe())
+        # Carry the version on so claims made for the old game still apply
+        game.version = base_version or 0
+    with timed('action'):
+        game_events = events.deal(game, bet)
+    try:
+        save_game(request, game, base_version, game_events)
+    except GameConflict:
+        # Another request already started the next game
+        pass
    
     return redirect('index')
  
@@ -61,14 +195,20 @@ def hit(request):
     if not game:
         return JsonResponse({'error': 'No active game'}, status=400)
    
-    success = game.player_hit()
+    base_state = client_base_state(request, game)
+    base_version = game.version
+    with timed('action'):
+        game_events = events.play(game, events.HIT)
    
-    if not success:
+    if game_events is None:
         return JsonResponse({'error': 'Cannot hit'}, status=400)
    
-    save_game(request, game)
+    try:
+        save_game(request, game, base_version, game_events)
+    except GameConflict:
+        return conflict_response(request)
 
-    return JsonResponse(game.get_game_state())
+    return state_response(game, base_state)
  
  
 @require_http_methods(["POST"])
@@ -79,14 +219,20 @@ def stand(request):
     if not game:
         return JsonResponse({'error': 'No active game'}, status=400)
    
-    success = game.player_stand()
+    base_state = client_base_state(request, game)
+    base_version = game.version
+    with timed('action'):
+        game_events = events.play(game, events.STAND)
    
-    if not success:
+    if game_events is None:
         return JsonResponse({'error': 'Cannot stand'}, status=400)
    
-    save_game(request, game)
+    try:
+        save_game(request, game, base_version, game_events)
+    except GameConflict:
+        return conflict_response(request)
    
-    return JsonResponse(game.get_game_state())
+    return state_response(game, base_state)
 
 @require_http_methods(["POST"])
 def split(request):
@@ -96,14 +242,26 @@ def split(request):
     if not game:
         return JsonResponse({'error': 'No active game'}, status=400)
 
-    success = game.player_split()
+    base_state = client_base_state(request, game)
+    base_version = game.version
+    with timed('action'):
+        game_events = events.play(game, events.SPLIT)
 
-    if not success:
+    if game_events is None:
         return JsonResponse({'error': 'Cannot split'}, status=400)
 
-    save_game(request, game)
+    if game.bet:
+        # The split hand is staked with the same bet again
+        balance = account_balance(request)[1]
+        if game.bet > balance:
+            return insufficient_funds_response(balance)
 
-    return JsonResponse(game.get_game_state())
+    try:
+        save_game(request, game, base_version, game_events)
+    except GameConflict:
+        return conflict_response(request)
+
+    return state_response(game, base_state)
  
  
 @require_http_methods(["GET"])
@@ -114,4 +272,82 @@ def game_state(request):
     if not game:
         return JsonResponse({'error': 'No active game'}, status=400)
    
-    return JsonResponse(game.get_game_state())
\ No newline at end of file
+    return JsonResponse(game.get_game_state())
+ 
+ 
+@require_http_methods(["GET"])
+def account(request):
+    """Get the session's balance and its most recent ledger entries."""
+    account_id, balance = account_balance(request)
+    entries = (LedgerEntry.objects.filter(account_id=account_id)
+               .order_by('-id').values('round_id', 'kind', 'amount', 'created_at')
+               [:bankroll.RECENT_ENTRIES])
+    return JsonResponse({'balance': balance, 'entries': list(entries)})
+
+
+@require_http_methods(["GET"])
+def hint(request):
+    """Get the basic strategy action for the current hand."""
+    game = get_or_create_game(request)
+   
+    if not game:
+        return JsonResponse({'error': 'No active game'}, status=400)
+   
+    return JsonResponse({'hint': game.get_hint()})
+
+
+@staff_member_required
+@require_http_methods(["GET"])
+def timings(request):
+    """Get p50/p95/p99 phase timings and payload sizes per view for this process."""
+    return JsonResponse(STATS.summary())
+
+
+@staff_member_required
+@require_http_methods(["GET"])
+def history(request):
+    """Get the hand history writer's queue depth and write counters."""
+    return JsonResponse(get_history_writer().metrics())
+
+
+@staff_member_required
+@require_http_methods(["GET", "POST"])
+def profile(request):
+    """
+    Get the profiling sample rate and dump count, or POST a new rate
+    (0 turns profiling off) and clear=1 to discard collected profiles.
+    """
+    if request.method == 'POST':
+        try:
+            rate = float(request.POST.get('rate', profiling.get_rate()))
+            profiling.set_rate(rate)
+        except ValueError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        if request.POST.get('clear'):
+            profiling.clear_profiles()
+
+    return JsonResponse({
+        'rate': profiling.get_rate(),
+        'workers': len(profiling.dump_paths()),
+    })
+
+
+@staff_member_required
+@require_http_methods(["GET"])
+def profile_download(request):
+    """Download the merged profiles as pstats data, or ?format=collapsed for flamegraphs."""
+    stats = profiling.merged_stats()
+    if stats is None:
+        return JsonResponse({'error': 'No profiles collected'}, status=404)
+
+    if request.GET.get('format') == 'collapsed':
+        response = HttpResponse(profiling.collapsed_stacks(stats), content_type='text/plain')
+        response['Content-Disposition'] = 'attachment; filename="blackjack.collapsed"'
+        return response
+
+    with tempfile.NamedTemporaryFile(suffix='.prof') as handle:
+        stats.dump_stats(handle.name)
+        data = handle.read()
+    response = HttpResponse(data, content_type='application/octet-stream')
+    response['Content-Disposition'] = 'attachment; filename="blackjack.prof"'
+    return response
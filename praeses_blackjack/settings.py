@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os 
+import tempfile
 
 import dj_database_url
 
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'game.middleware.TimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -52,6 +54,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'game.middleware.SamplingProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'praeses_blackjack.urls'
@@ -90,6 +93,95 @@ if 'DATABASE_URL' in os.environ:
         conn_health_checks=True,
     )
 
+# Caches
+# Game state is kept in its own cache so it can be sized apart from other
+# cached data. Set REDIS_URL to share both between several web nodes.
+# Local memory caches belong to one process, so when gunicorn runs several
+# WEB_CONCURRENCY workers without REDIS_URL, sessions and games are kept in
+# the database instead, where every worker sees the latest of each.
+
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'game_state': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'game-state',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+if 'REDIS_URL' in os.environ:
+    CACHES['default'] = {
+        'BACKEND': 'game.cache.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+    CACHES['game_state'] = {
+        'BACKEND': 'game.cache.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+        'KEY_PREFIX': 'blackjack',
+    }
+
+# Every worker sees the same cache: Redis, or a single worker's own memory
+SHARED_CACHE = 'REDIS_URL' in os.environ or WEB_CONCURRENCY == 1
+
+SESSION_ENGINE = ('django.contrib.sessions.backends.cached_db' if SHARED_CACHE
+                  else 'django.contrib.sessions.backends.db')
+
+# Games are written behind to the database every FLUSH_INTERVAL seconds,
+# or sooner once MAX_PENDING snapshots and events are waiting. Between deals
+# the whole game is stored again every SNAPSHOT_EVERY versions. Without a
+# shared cache (CACHE None) every save goes straight to the database.
+BLACKJACK_GAME_STORE = {
+    'CACHE': 'game_state' if SHARED_CACHE else None,
+    'FLUSH_INTERVAL': float(os.environ.get('BLACKJACK_GAME_FLUSH_INTERVAL', 5.0)),
+    'MAX_PENDING': 500,
+    'SNAPSHOT_EVERY': 8,
+}
+
+# Finished rounds are queued and bulk inserted into HandHistory from a
+# background thread (ASYNC False writes them inline, as the tests do).
+# Rounds are dropped once MAX_QUEUE are waiting.
+BLACKJACK_HISTORY = {
+    'ASYNC': True,
+    'MAX_QUEUE': 10000,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 1.0,
+}
+
+# Chips each player starts with and the bets they can place. Ledger entries
+# newer than ROLLUP_DELAY seconds are left for the next rollup_ledger run.
+BLACKJACK_BANKROLL = {
+    'STARTING_BALANCE': 1000,
+    'DEFAULT_BET': 10,
+    'MAX_BET': 500,
+    'ROLLUP_DELAY': 60,
+}
+
+# Delivers game state updates to event streams; replace with a broker shared
+# between nodes when running more than one
+BLACKJACK_BROKER = 'game.pubsub.InProcessBroker'
+
+# Staff can turn on sampled profiling of the game views from
+# /metrics/profile/; set BLACKJACK_PROFILING=0 to leave the profiler out
+BLACKJACK_PROFILING = os.environ.get('BLACKJACK_PROFILING', '1') == '1'
+BLACKJACK_PROFILE_DIR = os.environ.get(
+    'BLACKJACK_PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'blackjack-profiles')
+)
+
+# Blackjack table
+
+# Serve the index, action and state views with their async versions; for
+# ASGI deployments (see README)
+BLACKJACK_ASYNC_VIEWS = os.environ.get('BLACKJACK_ASYNC_VIEWS', '') == '1'
+
+BLACKJACK_NUM_DECKS = int(os.environ.get('BLACKJACK_NUM_DECKS', 6))
+
+# Fraction of the shoe dealt before the cut card forces a reshuffle
+BLACKJACK_PENETRATION = float(os.environ.get('BLACKJACK_PENETRATION', 0.75))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 